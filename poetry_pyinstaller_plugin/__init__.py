@@ -1,10 +1,10 @@
 # SPDX-FileCopyrightText: Copyright 2024-2025 Thomas Mahé <oss@tmahe.fr>
 # SPDX-License-Identifier: MIT
 
-from poetry_pyinstaller_plugin.hooks import PluginHook
+from poetry_pyinstaller_plugin.hooks import PluginHook, memoize
 from poetry_pyinstaller_plugin.target import Target
 
 __author__ = "Thomas Mahé <oss@tmahe.fr>"
 __version__ = "0.0.0"
 
-__all__ = ["__version__", "PluginHook", "Target"]
+__all__ = ["__version__", "PluginHook", "Target", "memoize"]
@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import lzma
+import os
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Optional, Sequence
+
+ARCHIVE_FORMATS = ["tar.gz", "tar.xz", "tar.zst", "zip"]
+
+
+def check_archive_format(archive_format: str) -> str:
+    """
+    Raise ValueError when archive format can't be written in Poetry's environment.
+    """
+    if archive_format == "tar.zst":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ValueError("ValueError: 'tar.zst' archives require 'zstandard' package in Poetry's environment, "
+                             "run 'poetry self add zstandard'.")
+    return archive_format
+
+
+class HashingWriter:
+    """
+    Write-only stream computing SHA-256 of written data, not seekable so writers stream their output
+    """
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        return self._fileobj.write(data)
+
+    def flush(self) -> None:
+        self._fileobj.flush()
+
+
+class BlockCompressor:
+    """
+    Compress stream in fixed-size blocks on a thread pool, each block being an independent member of
+    the output format (concatenated gzip members or xz streams are valid archives). Blocks are written
+    in order and in-flight blocks are bounded to keep memory usage constant.
+    """
+
+    def __init__(self, fileobj, compress: Callable[[bytes], bytes], block_size: int, threads: Optional[int] = None):
+        self._fileobj = fileobj
+        self._compress = compress
+        self._block_size = block_size
+        self._threads = threads or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self._threads)
+        self._pending: Deque[Future] = deque()
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            self._submit(bytes(self._buffer[:self._block_size]))
+            del self._buffer[:self._block_size]
+        return len(data)
+
+    def _submit(self, block: bytes) -> None:
+        self._pending.append(self._executor.submit(self._compress, block))
+        while len(self._pending) > self._threads * 2:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def close(self) -> None:
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._fileobj.write(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown()
+
+
+def _open_compressor(fileobj, archive_format: str, threads: Optional[int]):
+    if archive_format == "tar.gz":
+        return BlockCompressor(fileobj, lambda block: gzip.compress(block, mtime=0), 4 * 1024 ** 2, threads)
+    if archive_format == "tar.xz":
+        return BlockCompressor(fileobj, lambda block: lzma.compress(block, preset=6), 24 * 1024 ** 2, threads)
+    if archive_format == "tar.zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("'tar.zst' archives require 'zstandard' package in Poetry's environment.")
+        return zstandard.ZstdCompressor(threads=threads or -1).stream_writer(fileobj, closefd=False)
+    raise ValueError(f"ValueError: Unsupported archive format '{archive_format}', not in {ARCHIVE_FORMATS}.")
+
+
+def create_archive(source: Path, destination: Path, archive_format: str, threads: Optional[int] = None,
+                   extras: Sequence[Path] = ()) -> str:
+    """
+    Stream source file or folder into archive, written atomically, along with '<archive>.sha256' checksum file.
+    Extra files or folders are archived next to source. Return SHA-256 of archive.
+    """
+    tmp = destination.with_name(f".{destination.name}.{os.getpid()}")
+    try:
+        with open(tmp, "wb") as fileobj:
+            writer = HashingWriter(fileobj)
+            if archive_format == "zip":
+                _write_zip([source, *extras], writer)
+            else:
+                compressor = _open_compressor(writer, archive_format, threads)
+                try:
+                    with tarfile.open(fileobj=compressor, mode="w|") as tar:
+                        for path in (source, *extras):
+                            tar.add(path, arcname=path.name)
+                finally:
+                    compressor.close()
+        os.replace(tmp, destination)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    checksum = writer.sha256.hexdigest()
+    destination.with_name(f"{destination.name}.sha256").write_text(f"{checksum}  {destination.name}\n")
+    return checksum
+
+
+def _write_zip(sources: Sequence[Path], fileobj) -> None:
+    # Deflate is single threaded, zipfile does not accept compressed members from other threads
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as archive:
+        for source in sources:
+            if source.is_file():
+                archive.write(source, arcname=source.name)
+                continue
+            for root, dirs, files in os.walk(source):
+                dirs.sort()
+                for name in sorted(files):
+                    path = Path(root, name)
+                    archive.write(path, arcname=Path(source.name, path.relative_to(source)).as_posix())
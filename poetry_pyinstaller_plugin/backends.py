@@ -0,0 +1,166 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import abc
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+
+from poetry.utils.env import Env
+
+if TYPE_CHECKING:  # pragma: nocover
+    from poetry_pyinstaller_plugin.target import Target
+
+
+class Backend(abc.ABC):
+    """
+    Freezer used by 'Target.build' to produce target's output ('Target.output_path')
+    """
+    name: str
+    # Backends requiring build environment get dependencies installed & certificates deployed
+    requires_environment: bool = True
+    # Target options backend can't honour, rejected by plugin configuration
+    unsupported: Tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def command(self, target: Target) -> List[str]:
+        """
+        Command run to build target
+        """
+
+    @abc.abstractmethod
+    def build(self, target: Target, venv: Optional[Env]) -> None:
+        """
+        Build target to 'Target.build_output_path'
+        """
+
+
+class PyInstallerBackend(Backend):
+    name = "pyinstaller"
+
+    def command(self, target: Target) -> List[str]:
+        return target.pyinstaller_command
+
+    def build(self, target: Target, venv: Optional[Env]) -> None:
+        target._run_pyinstaller(venv)  # noqa
+
+
+class NuitkaBackend(Backend):
+    """
+    Nuitka compiles target to C, output is moved from work path to PyInstaller's output layout
+    """
+    name = "nuitka"
+    unsupported = ("arch", "strip", "runtime-hooks", "python-options", "copy-metadata", "recursive-copy-metadata",
+                   "package", "resources")
+
+    def output_dir(self, target: Target) -> Path:
+        return target.build_work_path / target.prog / "nuitka"
+
+    def command(self, target: Target) -> List[str]:
+        args: List[Any] = [
+            "python", "-m", "nuitka",
+            "--onefile" if target.type == "onefile" else "--standalone",
+            f"--output-dir={self.output_dir(target)}",
+            f"--output-filename={target.executable_path.name}",
+            "--assume-yes-for-downloads",
+            "--remove-output",
+        ]
+
+        if "win" in target.platform:
+            if not target.console or target.windowed:
+                args.append("--windows-console-mode=disable")
+            if target.icon:
+                args.append(f"--windows-icon-from-ico={target.resolve_path(target.icon)}")
+            if target.uac_admin:
+                args.append("--windows-uac-admin")
+            if target.uac_uiaccess:
+                args.append("--windows-uac-uiaccess")
+        elif "macosx" in target.platform and target.icon:
+            args.append(f"--macos-app-icon={target.resolve_path(target.icon)}")
+        elif target.icon:
+            args.append(f"--linux-icon={target.resolve_path(target.icon)}")
+
+        hidden_imports = target.hidden_import or []
+        for module in [hidden_imports] if isinstance(hidden_imports, str) else hidden_imports:
+            args.append(f"--include-module={module}")
+
+        for collect_type, modules in target.collect_config.items():
+            for module in modules:
+                if collect_type in ["submodules", "all"]:
+                    args.append(f"--include-package={module}")
+                if collect_type in ["data", "all"]:
+                    args.append(f"--include-package-data={module}")
+
+        for source, destination in target.include_config.items():
+            path = target.resolve_path(source)
+            option = "--include-data-dir" if path.is_dir() else "--include-data-files"
+            args.append(f"{option}={path}={destination}")
+
+        args.append(target.source)
+        return list(map(str, args))
+
+    def build(self, target: Target, venv: Optional[Env]) -> None:
+        output_dir = self.output_dir(target)
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+
+        args = self.command(target)
+        target.debug(f"run '{' '.join(args)}'")
+        target._run_measured(venv, *args)  # noqa
+
+        if target.type == "onefile":
+            built = output_dir / target.executable_path.name
+        else:
+            built = output_dir / f"{target.source.stem}.dist"
+
+        if target.build_output_path.is_dir():
+            shutil.rmtree(target.build_output_path)
+        elif target.build_output_path.exists():
+            target.build_output_path.unlink()
+        target.build_output_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(built, target.build_output_path)
+
+
+class SimulatedBackend(Backend):
+    """
+    Placeholder artifacts written instantly, content only depends on target's source and options.
+    Executable is a shell script printing target's name.
+    """
+    name = "simulated"
+    requires_environment = False
+
+    def command(self, target: Target) -> List[str]:
+        return ["simulated", str(target.source), f"--{target.type}", "--name", target.prog]
+
+    def build(self, target: Target, venv: Optional[Env]) -> None:
+        digest = hashlib.sha256(target.source.read_bytes() if target.source.exists() else b"")
+        digest.update(f"{target.type} {target.prog}".encode())
+
+        if target.build_output_path.is_dir():
+            shutil.rmtree(target.build_output_path)
+        target.build_executable_path.parent.mkdir(parents=True, exist_ok=True)
+        target.build_executable_path.write_text(f"#!/bin/sh\necho '{target.prog} {digest.hexdigest()[:12]}'\n")
+        os.chmod(target.build_executable_path, 0o755)
+
+        if target.type == "onedir":
+            contents = target.build_output_path / target.contents_directory_name
+            contents.mkdir()
+            # Same source gives identical runtime files, as PyInstaller outputs of similar targets
+            (contents / "base_library.zip").write_text(f"simulated {target.source.name}\n")
+            (contents / f"{target.prog}.pyz").write_text(f"simulated {digest.hexdigest()}\n")
+        target.peak_rss = None
+
+
+BACKENDS: Dict[str, Type[Backend]] = {
+    backend.name: backend for backend in (PyInstallerBackend, NuitkaBackend, SimulatedBackend)
+}
+
+
+def get_backend(name: str) -> Backend:
+    if name not in BACKENDS:
+        raise ValueError(f"ValueError: Unsupported backend '{name}', not in {list(BACKENDS)}.")
+    return BACKENDS[name]()
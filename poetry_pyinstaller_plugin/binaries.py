@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from poetry_pyinstaller_plugin.delta import sha256sum
+
+# ELF, PE and Mach-O (32/64 bits, both endianness, universal) headers
+BINARY_MAGICS = (
+    b"\x7fELF", b"MZ",
+    b"\xfe\xed\xfa\xce", b"\xfe\xed\xfa\xcf", b"\xce\xfa\xed\xfe", b"\xcf\xfa\xed\xfe", b"\xca\xfe\xba\xbe",
+)
+
+# DOS header of PE files holds offset of 'PE\0\0' signature ('e_lfanew')
+PE_OFFSET = struct.Struct("<I")
+PE_OFFSET_POSITION = 0x3C
+PE_SIGNATURE = b"PE\0\0"
+
+# Binaries PyInstaller never compresses with UPX: UPX breaks Control Flow Guard of VC runtime and Qt plugins
+# metadata, which Qt reads before loading them. Matched case-insensitively against path relative to output.
+UPX_EXCLUDE = ("*vcruntime*.dll", "*qt*/plugins/*", "*pyside*/plugins/*")
+
+
+def is_binary(path: Path) -> bool:
+    try:
+        with open(path, "rb") as f:
+            header = f.read(PE_OFFSET_POSITION + PE_OFFSET.size)
+            if not header.startswith(b"MZ"):
+                return header.startswith(BINARY_MAGICS)
+            # 'MZ' alone is too weak, text files may start with it
+            if len(header) < PE_OFFSET_POSITION + PE_OFFSET.size:
+                return False
+            f.seek(PE_OFFSET.unpack_from(header, PE_OFFSET_POSITION)[0])
+            return f.read(len(PE_SIGNATURE)) == PE_SIGNATURE
+    except OSError:
+        return False
+
+
+def find_binaries(root: Path) -> List[Path]:
+    """
+    Shared libraries & extension modules collected in onedir output, executable is left aside as
+    PyInstaller archive is appended to it
+    """
+    binaries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath, name)
+            if Path(dirpath) == root or path.is_symlink():
+                continue
+            if is_binary(path):
+                binaries.append(path)
+    return sorted(binaries)
+
+
+def get_commands(platform: str, strip: bool, upx: bool) -> Dict[str, List[str]]:
+    """
+    Commands applied to binaries, following PyInstaller behavior: no strip on Windows & no UPX on macOS
+    """
+    commands = {}
+    if strip and "win" not in platform:
+        commands["strip"] = ["strip", "-S"] if "macosx" in platform else ["strip"]
+    if upx and "macosx" not in platform and (upx_path := shutil.which("upx")):
+        commands["upx"] = [upx_path, "-q"]
+    if commands and "macosx" in platform:
+        # Signature of modified binaries must be replaced
+        commands["codesign"] = ["codesign", "--force", "--sign", "-"]
+    return commands
+
+
+def process_binary(path: Path, cache_path: Path, commands: Sequence[Sequence[str]]) -> Tuple[bool, int, int, str]:
+    """
+    Apply commands to binary, processed output is cached by input hash and commands.
+    Executed in worker processes, return whether output was cached, size before & after, and cache key.
+    """
+    key = hashlib.sha256(sha256sum(path).encode())
+    for command in commands:
+        key.update(" ".join([Path(command[0]).name, *command[1:]]).encode())
+    cached = cache_path / key.hexdigest()
+    before = path.stat().st_size
+
+    hit = cached.exists()
+    if not hit:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_name(f".{cached.name}.{os.getpid()}")
+        try:
+            shutil.copyfile(path, tmp)
+            for command in commands:
+                out = subprocess.run([*command, str(tmp)], capture_output=True, text=True)
+                if out.returncode != 0 and Path(command[0]).name.startswith("upx"):
+                    # Some libraries can't be packed by UPX, keep them uncompressed
+                    continue
+                if out.returncode != 0:
+                    raise RuntimeError(f"'{' '.join(command)}' failed for {path.name}: {out.stderr.strip()}")
+            os.replace(tmp, cached)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    mode = path.stat().st_mode
+    shutil.copyfile(cached, path)
+    os.chmod(path, mode)
+    return hit, before, path.stat().st_size, cached.name
+
+
+def optimize_binaries(root: Path, cache_path: Path, commands: Dict[str, List[str]],
+                      upx_exclude: Sequence[str] = (), jobs: Optional[int] = None,
+                      manifest_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Strip and/or compress binaries of onedir output in a process pool, UPX is not applied to binaries
+    matching exclude patterns (file name or path relative to output), nor to binaries PyInstaller excludes
+    by default. Cache keys of binaries are written to manifest, if any, to predict cache hits of next build.
+    """
+    binaries = find_binaries(root)
+
+    stats = {"binaries": len(binaries), "cached": 0, "before": 0, "after": 0}
+    if not binaries or not commands:
+        return stats
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        futures = []
+        for path in binaries:
+            rel = path.relative_to(root).as_posix()
+            excluded = any(fnmatch.fnmatch(path.name, p) or fnmatch.fnmatch(rel, p) for p in upx_exclude)
+            excluded = excluded or any(fnmatch.fnmatch(rel.lower(), p) for p in UPX_EXCLUDE)
+            binary_commands = [cmd for name, cmd in commands.items() if not (name == "upx" and excluded)]
+            futures.append(executor.submit(process_binary, path, cache_path, binary_commands))
+
+        keys = []
+        for future in futures:
+            hit, before, after, key = future.result()
+            keys.append(key)
+            stats["cached"] += hit
+            stats["before"] += before
+            stats["after"] += after
+
+    if manifest_path is not None:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}")
+        tmp.write_text(json.dumps({"keys": sorted(keys)}))
+        os.replace(tmp, manifest_path)
+    return stats
+
+
+def get_cached_binaries(cache_path: Path, manifest_path: Path) -> Optional[Tuple[int, int]]:
+    """
+    Binaries of previous build still in cache & total, outputs are served from cache while binaries are unchanged
+    """
+    try:
+        keys = json.loads(manifest_path.read_text())["keys"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return sum((cache_path / key).exists() for key in keys), len(keys)
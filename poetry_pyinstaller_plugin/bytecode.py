@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+import os
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from poetry.utils.env import Env
+
+# Compile sources of given roots in a process pool with interpreter of build environment. Bytecode is written to
+# '__pycache__' as checked hash-based '.pyc' files, keyed by source hash & optimization level, unchanged sources are
+# not compiled again. PyInstaller compiles sources itself, bytecode is fed to it by 'CODE_CACHE_SCRIPT'.
+COMPILE_SCRIPT = textwrap.dedent("""
+import importlib.util, json, os, py_compile, sys
+from concurrent.futures import ProcessPoolExecutor
+
+CHECKED_HASH = 0b11
+
+
+def is_cached(path, source_hash, level):
+    try:
+        with open(importlib.util.cache_from_source(path, optimization=level or ""), "rb") as pyc:
+            header = pyc.read(16)
+    except OSError:
+        return False
+    return (header[:4] == importlib.util.MAGIC_NUMBER
+            and int.from_bytes(header[4:8], "little") == CHECKED_HASH and header[8:16] == source_hash)
+
+
+def compile_source(path, levels):
+    try:
+        with open(path, "rb") as source:
+            source_hash = importlib.util.source_hash(source.read())
+        status = "cached"
+        for level in levels:
+            if not is_cached(path, source_hash, level):
+                py_compile.compile(path, doraise=True, optimize=level,
+                                   invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+                status = "compiled"
+        return status
+    except (OSError, SyntaxError, ValueError, py_compile.PyCompileError):
+        return "failed"
+
+
+def iter_sources(roots):
+    for root in roots:
+        for path, dirs, files in os.walk(root):
+            dirs[:] = [name for name in dirs if name != "__pycache__"]
+            yield from (os.path.join(path, name) for name in files if name.endswith(".py"))
+
+
+if __name__ == "__main__":
+    config = json.loads(sys.argv[1])
+    stats = {"compiled": 0, "cached": 0, "failed": 0}
+    sources = sorted(set(iter_sources(config["roots"])))
+    with ProcessPoolExecutor(max_workers=config.get("jobs")) as executor:
+        levels = [config["levels"]] * len(sources)
+        for status in executor.map(compile_source, sources, levels, chunksize=64):
+            stats[status] += 1
+    print(json.dumps(stats))
+""")
+
+
+# Prologue of scripts running PyInstaller in-process. Module graph analysis and 'compile_pymodule' compile sources with
+# builtin 'compile', replaced in their namespace by a lookup of precompiled '.pyc' matching source hash, optimization
+# level and file name. Sources without matching bytecode are compiled as usual.
+CODE_CACHE_SCRIPT = textwrap.dedent("""
+import builtins, importlib, importlib.util, marshal, sys
+
+CHECKED_HASH = 0b11
+
+
+def _load_bytecode(source, filename, level):
+    try:
+        if isinstance(source, str):
+            with open(filename, "rb") as f:
+                data = f.read()
+            if importlib.util.decode_source(data) != source:
+                return None
+            source = data
+        with open(importlib.util.cache_from_source(filename, optimization=level or ""), "rb") as pyc:
+            header = pyc.read(16)
+            if (header[:4] != importlib.util.MAGIC_NUMBER or int.from_bytes(header[4:8], "little") != CHECKED_HASH
+                    or header[8:16] != importlib.util.source_hash(bytes(source))):
+                return None
+            code = marshal.load(pyc)
+    except (OSError, ValueError, EOFError, TypeError, UnicodeDecodeError):
+        return None
+    return code if getattr(code, "co_filename", None) == filename else None
+
+
+def _compile(source, filename, mode, flags=0, dont_inherit=False, optimize=-1, **kwargs):
+    if mode == "exec" and not flags and isinstance(filename, str) and filename.endswith(".py"):
+        code = _load_bytecode(source, filename, sys.flags.optimize if optimize == -1 else optimize)
+        if code is not None:
+            return code
+    return builtins.compile(source, filename, mode, flags, dont_inherit, optimize, **kwargs)
+
+
+for _name in ("PyInstaller.lib.modulegraph.modulegraph", "PyInstaller.building.utils"):
+    try:
+        importlib.import_module(_name).compile = _compile
+    except ImportError:
+        pass
+""")
+
+# Run PyInstaller with arguments given to script, fed with precompiled bytecode
+PYINSTALLER_SCRIPT = CODE_CACHE_SCRIPT + textwrap.dedent("""
+from PyInstaller.__main__ import run
+run(sys.argv[1:])
+""")
+
+
+def get_environment_roots(venv: Env) -> Iterable[Path]:
+    """
+    Site packages of build environment, standard library is compiled when Python is installed
+    """
+    return {Path(venv.paths[name]) for name in ("purelib", "platlib") if venv.paths.get(name)}
+
+
+def precompile(venv: Env, roots: Sequence[Path], levels: Sequence[int], script_path: Path,
+               jobs: Optional[int] = None) -> Dict[str, int]:
+    """
+    Compile sources under roots for given optimization levels with interpreter of build environment,
+    return number of compiled, cached and failed modules.
+    """
+    if not script_path.exists() or script_path.read_text() != COMPILE_SCRIPT:
+        script_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = script_path.with_name(f".{script_path.name}.{os.getpid()}")
+        tmp.write_text(COMPILE_SCRIPT)
+        os.replace(tmp, script_path)
+
+    config = {"roots": sorted(str(root) for root in roots if root.exists()), "levels": sorted(set(levels)),
+              "jobs": jobs}
+    output = venv.run("python", str(script_path), json.dumps(config))
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def get_source_stamps(sources: Iterable[Path]) -> Dict[str, List[int]]:
+    """
+    Modification time & size of project sources, changes are detected by plan without reading them
+    """
+    stamps = {}
+    for source in sources:
+        try:
+            stat = source.stat()
+        except OSError:
+            continue
+        stamps[str(source)] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def write_bytecode_manifest(manifest_path: Path, entries: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Record environments precompiled by build, keyed by hash of lock file & dependency selection. Entries of other
+    selections are kept.
+    """
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.update(entries)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest_path.with_name(f".{manifest_path.name}.{os.getpid()}")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, manifest_path)
+
+
+def get_precompiled_modules(manifest_path: Path, key: Optional[str], levels: Sequence[int],
+                            sources: Iterable[Path]) -> Optional[Dict[str, Any]]:
+    """
+    Environment precompiled by last build for lock file & dependency selection hash, with number of modules still
+    cached and project sources changed since. None when environment was not precompiled for all levels.
+    """
+    try:
+        entry = json.loads(manifest_path.read_text())[key]
+    except (OSError, ValueError, KeyError):
+        return None
+    if not set(levels) <= set(entry["levels"]):
+        return None
+    stamps, previous = get_source_stamps(sources), entry["sources"]
+    stale = sum(stamp != previous.get(path) for path, stamp in stamps.items())
+    return {"environment": entry["environment"], "cached": max(entry["modules"] - stale, 0), "stale": stale}
@@ -0,0 +1,335 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import copy
+import dataclasses
+import glob
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, List, Mapping, Optional, Tuple
+
+from poetry.core.masonry.utils.module import ModuleOrPackageNotFoundError
+from poetry.poetry import Poetry
+
+from poetry_pyinstaller_plugin import utils
+from poetry_pyinstaller_plugin.archive import ARCHIVE_FORMATS, check_archive_format
+from poetry_pyinstaller_plugin.backends import BACKENDS
+from poetry_pyinstaller_plugin.hooks import find_hook_source, get_hook_spec
+from poetry_pyinstaller_plugin.resources import RESOURCES_MODES
+from poetry_pyinstaller_plugin.smoke import SmokeConfig
+
+PLUGIN_SECTION = "tool.poetry-pyinstaller-plugin"
+
+HOOK_OPTIONS = ("pre-build", "post-build")
+
+TYPE_NAMES = {str: "string", bool: "boolean", int: "integer", list: "array", dict: "table"}
+
+
+@dataclasses.dataclass(frozen=True)
+class Option:
+    """
+    Option of plugin configuration. Options set on plugin section are defaults of all targets, unless
+    'inherit' is false. 'paths' tells which part of value holds project paths: 'value', 'items' or 'keys'.
+    """
+    name: str
+    types: Tuple[type, ...]
+    default: Any = None
+    items: Optional[type] = None
+    keys: Optional[Tuple[str, ...]] = None
+    choices: Optional[Tuple[str, ...]] = None
+    paths: Optional[str] = None
+    check: Optional[Callable[[Any], Any]] = None
+    required: bool = False
+    target: bool = True
+    plugin: bool = True
+    inherit: bool = True
+
+
+OPTIONS: Tuple[Option, ...] = (
+    Option("source", (str,), paths="value", required=True, plugin=False),
+    Option("type", (str,), "onedir", choices=("onefile", "onedir")),
+    Option("backend", (str,), "pyinstaller", choices=tuple(BACKENDS)),
+    Option("bundle", (bool,), False),
+    Option("bundle-wheels", (str, list), ["*-py3-none-any.whl"], items=str),
+    Option("strip", (bool,), False),
+    Option("no-upx", (bool,), False),
+    Option("optimize-binaries", (bool,), False),
+    Option("upx-exclude", (list,), [], items=str),
+    Option("console", (bool,), False),
+    Option("windowed", (bool,), False),
+    Option("icon", (str,), paths="value"),
+    Option("uac-admin", (bool,), False),
+    Option("uac-uiaccess", (bool,), False),
+    Option("argv-emulation", (bool,), False),
+    Option("arch", (str,)),
+    Option("hidden-import", (str, list), items=str),
+    Option("when", (str,), choices=("release", "prerelease")),
+    Option("archive", (str,), choices=tuple(ARCHIVE_FORMATS), check=check_archive_format),
+    Option("contents-directory", (str,)),
+    Option("add-version", (bool,), False),
+    Option("work-dir", (str,)),
+    Option("work-dir-size", (int, str), check=utils.parse_size),
+    Option("certifi.append", (list,), [], items=str, paths="items"),
+    Option("collect", (dict,), {}, items=list, keys=("submodules", "data", "binaries", "all")),
+    Option("exclude-poetry-include", (bool,), False),
+    Option("include", (dict,), {}, items=str, paths="keys"),
+    Option("package", (dict,), {}, items=str, paths="keys"),
+    Option("resources", (dict,), {}, items=str, paths="keys"),
+    Option("resources-mode", (str,), "files", choices=tuple(RESOURCES_MODES)),
+    Option("runtime-hooks", (list,), [], items=str, paths="items"),
+    Option("python-options", (list,), [], items=str),
+    Option("copy-metadata", (list,), [], items=str),
+    Option("recursive-copy-metadata", (list,), [], items=str),
+    Option("smoke", (bool, dict), check=SmokeConfig.from_config),
+    Option("groups", (list,), items=str),
+    Option("extras", (list,), items=str),
+    # Plugin level 'pre-build' & 'post-build' hooks run once around all builds, not inherited
+    Option("pre-build", (str, dict), check=get_hook_spec, inherit=False),
+    Option("post-build", (str, dict), check=get_hook_spec, inherit=False),
+    Option("wheelhouse", (str,), target=False),
+    Option("memory-limit", (int, str), check=utils.parse_size, target=False),
+    Option("precompile", (bool,), False, target=False),
+    Option("targets", (dict,), {}, target=False),
+)
+
+
+class ConfigError(ValueError):
+    """
+    Invalid plugin configuration, holding all problems found
+    """
+    problems: List[str]
+
+    def __init__(self, problems: List[str]):
+        self.problems = problems
+        details = "".join(f"\n  - {problem}" for problem in problems)
+        super().__init__(f"ValueError: Invalid {PLUGIN_SECTION} configuration, {len(problems)} problem(s):{details}")
+
+
+@dataclasses.dataclass(frozen=True)
+class Problem:
+    """
+    Problem found in configuration, paths missing on disk are tied to their target
+    """
+    message: str
+    target: Optional[str] = None
+    missing: bool = False
+
+
+@dataclasses.dataclass
+class TargetConfig:
+    """
+    Effective options of a target, with origin of each value: 'target', 'plugin' or 'default'
+    """
+    name: str
+    values: Dict[str, Any]
+    origins: Dict[str, str]
+
+    def get(self, name: str) -> Any:
+        return self.values[name]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "options": self.values, "origins": self.origins}
+
+
+def _plain(value: Any) -> Any:
+    # TOML items to plain Python values
+    return value.unwrap() if hasattr(value, "unwrap") else value
+
+
+def _get(data: Mapping[str, Any], name: str) -> Tuple[bool, Any]:
+    # Dotted options ('certifi.append') are read from nested tables
+    *tables, key = name.split(".")
+    for table in tables:
+        data = data.get(table)
+        if not isinstance(data, Mapping):
+            return False, None
+    return key in data, data.get(key)
+
+
+def _type_name(types: Tuple[type, ...]) -> str:
+    return " or ".join(TYPE_NAMES[kind] for kind in types)
+
+
+def _is_instance(value: Any, types: Tuple[type, ...]) -> bool:
+    # Booleans are integers in Python, not in TOML
+    return isinstance(value, types) and not (isinstance(value, bool) and bool not in types)
+
+
+@dataclasses.dataclass
+class PluginConfig:
+    """
+    Configuration of plugin compiled once from 'tool.poetry-pyinstaller-plugin' section: plugin options,
+    effective options of each target, and all problems found
+    """
+    root: Path
+    values: Dict[str, Any]
+    targets: Dict[str, TargetConfig]
+    problems: List[Problem] = dataclasses.field(default_factory=list)
+    warnings: List[str] = dataclasses.field(default_factory=list)
+
+    @classmethod
+    def from_poetry(cls, poetry: Poetry) -> PluginConfig:
+        section = utils.PyProjectConfig(poetry.pyproject.data).lookup(PLUGIN_SECTION, {})
+        config = cls.from_data(section, poetry.pyproject_path.parent)
+        config.check_hooks(poetry)
+        return config
+
+    @classmethod
+    def from_data(cls, section: Mapping[str, Any], root: Path) -> PluginConfig:
+        config = cls(root, {}, {})
+        section = _plain(section)
+        if not isinstance(section, dict):
+            config.problems.append(Problem(f"expected table, got {section!r}"))
+            section = {}
+
+        config._check_keys(section, "", "plugin")
+        plugin_options = [option for option in OPTIONS if option.plugin]
+        for option in plugin_options:
+            found, value = _get(section, option.name)
+            if found:
+                config._check_value(option, value, option.name)
+                config.values[option.name] = value
+            elif option.target is False:
+                config.values[option.name] = copy.deepcopy(option.default)
+
+        targets = config.values.get("targets")
+        for name, data in (targets if isinstance(targets, dict) else {}).items():
+            config.targets[name] = config._compile_target(name, data, section)
+        return config
+
+    def _compile_target(self, name: str, data: Any, section: Dict[str, Any]) -> TargetConfig:
+        # When target specified by '<target> = "script.py"'
+        if not isinstance(data, dict):
+            data = {"source": data}
+
+        prefix = f"targets.{name}."
+        self._check_keys(data, prefix, "target", name)
+        target = TargetConfig(name, {}, {})
+        for option in filter(lambda o: o.target, OPTIONS):
+            found, value = _get(data, option.name)
+            if found:
+                self._check_value(option, value, prefix + option.name, name)
+                target.values[option.name], target.origins[option.name] = value, "target"
+            elif option.inherit and option.plugin and _get(section, option.name)[0]:
+                value = copy.deepcopy(_get(section, option.name)[1])
+                target.values[option.name], target.origins[option.name] = value, "plugin"
+            else:
+                if option.required:
+                    self.problems.append(Problem(f"{prefix}{option.name}: missing required option", name))
+                target.values[option.name] = copy.deepcopy(option.default)
+                target.origins[option.name] = "default"
+        self._check_backend(target, prefix)
+        return target
+
+    def check_hooks(self, poetry: Poetry) -> None:
+        """
+        Modules of plugin and target hooks exist in project packages, modules are loaded once hooks run
+        """
+        hooks = [(name, self.values.get(name), None) for name in HOOK_OPTIONS]
+        hooks += [(f"targets.{target.name}.{name}", target.values.get(name), target.name)
+                  for target in self.targets.values() for name in HOOK_OPTIONS]
+        base_modules: Optional[List[Path]] = None
+        for key, spec, target in hooks:
+            try:
+                module_name = get_hook_spec(spec)["hook"].split(":")[0]
+            except (ValueError, TypeError, AttributeError):
+                # Unset or invalid, invalid specs are already reported
+                continue
+            if base_modules is None:
+                try:
+                    base_modules = utils.get_base_modules_path(poetry)
+                except ModuleOrPackageNotFoundError:
+                    base_modules = []
+            if find_hook_source(module_name, base_modules) is None:
+                self.problems.append(Problem(f"{key}: module '{module_name}' not found in project", target, True))
+
+    def _check_backend(self, target: TargetConfig, prefix: str) -> None:
+        """
+        Options set on target but ignored by its backend are problems, options inherited from plugin section
+        are only warned about
+        """
+        backend = BACKENDS.get(target.values["backend"])
+        if backend is None:
+            return
+        defaults = {option.name: option.default for option in OPTIONS}
+        for name in backend.unsupported:
+            if target.values[name] == defaults[name]:
+                continue
+            message = f"{prefix}{name}: not supported by '{backend.name}' backend"
+            if target.origins[name] == "target":
+                self.problems.append(Problem(message, target.name))
+            else:
+                self.warnings.append(f"{message}, ignored")
+
+    def _check_keys(self, data: Dict[str, Any], prefix: str, scope: str, target: Optional[str] = None) -> None:
+        names = [option.name for option in OPTIONS if getattr(option, scope)]
+        known = {name.split(".")[0] for name in names}
+        for key, value in data.items():
+            if key not in known:
+                self.warnings.append(f"{prefix}{key}: unknown option, ignored")
+                continue
+            nested = [name.split(".", 1)[1] for name in names if name.startswith(f"{key}.")]
+            if nested and isinstance(value, dict):
+                for unknown in sorted(set(value) - set(nested)):
+                    self.warnings.append(f"{prefix}{key}.{unknown}: unknown option, ignored")
+            elif nested:
+                self.problems.append(Problem(f"{prefix}{key}: expected table, got {value!r}", target))
+
+    def _check_value(self, option: Option, value: Any, key: str, target: Optional[str] = None) -> None:
+        def problem(message: str, missing: bool = False) -> None:
+            self.problems.append(Problem(f"{key}: {message}", target, missing))
+
+        if not _is_instance(value, option.types):
+            return problem(f"expected {_type_name(option.types)}, got {value!r}")
+
+        if option.choices is not None and value not in option.choices:
+            return problem(f"'{value}' not in {list(option.choices)}")
+
+        members = value if isinstance(value, list) else value.values() if isinstance(value, dict) else []
+        if option.items and not all(_is_instance(item, (option.items,)) for item in members):
+            return problem(f"expected {TYPE_NAMES[option.items]} items, got {value!r}")
+
+        if option.keys is not None and (unknown := sorted(set(value) - set(option.keys))):
+            return problem(f"unsupported key(s) {unknown}, not in {list(option.keys)}")
+
+        if option.check is not None:
+            try:
+                option.check(value)
+            except ValueError as error:
+                return problem(str(error).removeprefix("ValueError: "))
+
+        if option.paths is not None:
+            paths = [value] if option.paths == "value" else list(value)
+            for path in paths:
+                if isinstance(path, str) and not self.exists(path):
+                    problem(f"'{path}' not found in {self.root}", missing=True)
+
+    def exists(self, path: str) -> bool:
+        """
+        Path relative to project exists, glob patterns must match at least one file
+        """
+        if glob.has_magic(path):
+            return any(glob.iglob(str(self.root / path), recursive=True))
+        return (self.root / path).exists()
+
+    @property
+    def errors(self) -> List[str]:
+        return [problem.message for problem in self.problems]
+
+    def get_problems(self, skipped: Collection[str] = (), paths: bool = True, prefix: str = "") -> List[str]:
+        """
+        Messages of all problems, missing paths are ignored for targets skipped on this version or when
+        'paths' is false
+        """
+        return [
+            f"{prefix}{problem.message}" for problem in self.problems
+            if not problem.missing or (paths and problem.target not in skipped)
+        ]
+
+    def check(self, skipped: Collection[str] = (), paths: bool = True, prefix: str = "") -> None:
+        """
+        Raise all problems at once
+        """
+        if problems := self.get_problems(skipped, paths, prefix):
+            raise ConfigError(problems)
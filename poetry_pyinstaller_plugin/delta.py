@@ -0,0 +1,300 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import shutil
+import struct
+import tarfile
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DELTA_VERSION = 1
+BLOCK_SIZE = 64 * 1024
+# On a miss, blocks of base file following last copied range searched in new file, and range of base file where
+# start of new block (sample) is searched
+LOOKAHEAD = 4
+SEARCH_WINDOW = 4 * 1024 ** 2
+SAMPLE_SIZE = 64
+PATCH_MAGIC = b"PPIDELTA1"
+
+# Patch operations: copy range from base file, or insert literal data
+_COPY = struct.Struct("<cQI")
+_DATA = struct.Struct("<cI")
+
+
+def sha256sum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(1024 ** 2):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _checksum(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _index_blocks(path: Optional[Path], block_size: int) -> Tuple[Dict[bytes, Tuple[int, int]],
+                                                                  Dict[bytes, Tuple[int, int]]]:
+    """
+    Index base file blocks by checksum, last partial block apart
+    """
+    blocks: Dict[bytes, Tuple[int, int]] = {}
+    tails: Dict[bytes, Tuple[int, int]] = {}
+    if path is None:
+        return blocks, tails
+    with open(path, "rb") as f:
+        offset = 0
+        while block := f.read(block_size):
+            index = blocks if len(block) == block_size else tails
+            index.setdefault(_checksum(block), (offset, len(block)))
+            offset += len(block)
+    return blocks, tails
+
+
+def create_patch(base: Optional[Path], new: Path, patch: Path, block_size: int = BLOCK_SIZE) -> None:
+    """
+    Write lzma compressed patch rebuilding new file from base file, blocks of base file found in new file are
+    copied from it and others are stored as literal data. Without base, patch holds the whole file.
+
+    New file is streamed block by block. A block is copied when it continues last copied range of base file, or
+    when its checksum matches a block of base file. Otherwise, next blocks of base file are searched in new file
+    (data inserted), and start of new block is searched in base file after last copied range (data removed), using
+    'bytes.find' so that no Python code runs per byte.
+    """
+    blocks, tails = _index_blocks(base, block_size)
+    compressor = lzma.LZMACompressor()
+    with contextlib.ExitStack() as stack:
+        src = stack.enter_context(open(new, "rb"))
+        out = stack.enter_context(open(patch, "wb"))
+        base_data: Union[bytes, mmap.mmap] = b""
+        if base is not None and base.stat().st_size > 0:
+            base_file = stack.enter_context(open(base, "rb"))
+            base_data = stack.enter_context(mmap.mmap(base_file.fileno(), 0, access=mmap.ACCESS_READ))
+
+        out.write(compressor.compress(PATCH_MAGIC))
+        copy: Optional[List[int]] = None
+
+        def write_copy(match: Tuple[int, int]) -> None:
+            nonlocal copy
+            if copy and copy[0] + copy[1] == match[0]:
+                copy[1] += match[1]
+                return
+            if copy:
+                out.write(compressor.compress(_COPY.pack(b"C", *copy)))
+            copy = list(match)
+
+        def write_data(data: bytes) -> None:
+            nonlocal copy
+            if not data:
+                return
+            if copy:
+                out.write(compressor.compress(_COPY.pack(b"C", *copy)))
+                copy = None
+            out.write(compressor.compress(_DATA.pack(b"D", len(data)) + data))
+
+        def find(buffer: bytes, offset: int) -> Optional[Tuple[int, int]]:
+            # Position in buffer and offset in base file of next copied block
+            if buffer.startswith(base_data[offset:offset + block_size]) and offset + block_size <= len(base_data):
+                return 0, offset
+            if (match := blocks.get(_checksum(buffer[:block_size]))) is not None:
+                return 0, match[0]
+            inserted = [(buffer.find(base_data[start:start + block_size], 1), start)
+                        for start in range(offset, min(offset + LOOKAHEAD * block_size,
+                                                       len(base_data) - block_size + 1), block_size)]
+            if inserted := [(position, start) for position, start in inserted if position > 0]:
+                return min(inserted)
+            start = base_data.find(buffer[:SAMPLE_SIZE], offset, offset + SEARCH_WINDOW)
+            if start >= 0 and base_data[start:start + block_size] == buffer[:block_size]:
+                return 0, start
+            return None
+
+        offset = 0
+        buffer = src.read(2 * block_size)
+        while len(buffer) >= block_size:
+            if base_data and (match := find(buffer, offset)) is not None:
+                position, offset = match
+                write_data(buffer[:position])
+                write_copy((offset, block_size))
+                buffer, offset = buffer[position:], offset + block_size
+            else:
+                write_data(buffer[:block_size])
+            buffer = buffer[block_size:]
+            if len(buffer) < 2 * block_size:
+                buffer += src.read(2 * block_size - len(buffer))
+
+        for checksum, (start, length) in tails.items():
+            if length <= len(buffer) and _checksum(buffer[len(buffer) - length:]) == checksum:
+                write_data(buffer[:len(buffer) - length])
+                write_copy((start, length))
+                break
+        else:
+            write_data(buffer)
+        if copy:
+            out.write(compressor.compress(_COPY.pack(b"C", *copy)))
+        out.write(compressor.flush())
+
+
+def apply_patch(base: Optional[Path], patch: Path, output: Path) -> None:
+    with lzma.open(patch, "rb") as src, open(output, "wb") as out:
+        if src.read(len(PATCH_MAGIC)) != PATCH_MAGIC:
+            raise ValueError(f"ValueError: Invalid patch file '{patch}'.")
+        base_file = open(base, "rb") if base is not None else None
+        try:
+            while op := src.read(1):
+                if op == b"C" and base_file is not None:
+                    _, offset, length = _COPY.unpack(op + src.read(_COPY.size - 1))
+                    base_file.seek(offset)
+                    out.write(base_file.read(length))
+                elif op == b"D":
+                    _, length = _DATA.unpack(op + src.read(_DATA.size - 1))
+                    out.write(src.read(length))
+                else:
+                    raise ValueError(f"ValueError: Invalid patch file '{patch}'.")
+        finally:
+            if base_file is not None:
+                base_file.close()
+
+
+def _list_files(root: Path, paths: Iterable[str]) -> Dict[str, Path]:
+    files = {}
+    for rel in paths:
+        path = root / rel
+        if path.is_symlink() or path.is_file():
+            files[Path(rel).as_posix()] = path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            for name in [*filenames, *[d for d in dirnames if Path(dirpath, d).is_symlink()]]:
+                file = Path(dirpath, name)
+                files[file.relative_to(root).as_posix()] = file
+    return files
+
+
+@contextlib.contextmanager
+def open_base(path: Path) -> Iterator[Path]:
+    """
+    Previous release as a directory, archives are extracted in a temporary directory
+    """
+    if path.is_dir():
+        yield path
+        return
+
+    with tempfile.TemporaryDirectory(prefix="pyinstaller-delta-") as tmp:
+        if zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                archive.extractall(tmp)
+        elif path.name.endswith(".tar.zst"):
+            import zstandard
+            with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                with tarfile.open(fileobj=reader, mode="r|") as archive:
+                    _extract_tar(archive, tmp)
+        else:
+            with tarfile.open(path, "r:*") as archive:
+                _extract_tar(archive, tmp)
+        yield Path(tmp)
+
+
+def _extract_tar(archive: tarfile.TarFile, path: str) -> None:
+    if hasattr(tarfile, "data_filter"):
+        archive.extractall(path, filter="tar")
+    else:  # pragma: nocover
+        archive.extractall(path)
+
+
+def _process_file(rel: str, new: Path, base: Optional[Path], delta_path: Path,
+                  block_size: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Manifest entry of new file, patch is written when file changed. Executed in worker processes.
+    """
+    if new.is_symlink():
+        return rel, {"link": os.readlink(new)}
+
+    entry: Dict[str, Any] = {"sha256": sha256sum(new), "size": new.stat().st_size,
+                             "mode": new.stat().st_mode & 0o777}
+    if base is not None and (base.is_symlink() or not base.is_file()):
+        base = None
+    if base is not None and sha256sum(base) == entry["sha256"]:
+        return rel, entry
+
+    patch = delta_path / "patches" / f"{rel}.patch"
+    patch.parent.mkdir(parents=True, exist_ok=True)
+    create_patch(base, new, patch, block_size)
+    entry["patch"] = patch.relative_to(delta_path).as_posix()
+    entry["base"] = base is not None
+    return rel, entry
+
+
+def create_delta(base_root: Path, new_root: Path, paths: Iterable[str], delta_path: Path,
+                 jobs: Optional[int] = None, block_size: int = BLOCK_SIZE) -> Dict[str, Any]:
+    """
+    Compare given paths (relative to roots) of previous and new release, write manifest of new files with
+    their hashes, patches of changed & added files and list of removed files in delta directory.
+    Files are compared in a process pool.
+    """
+    paths = list(paths)
+    base_files = _list_files(base_root, paths)
+    new_files = _list_files(new_root, paths)
+
+    if delta_path.exists():
+        shutil.rmtree(delta_path)
+    (delta_path / "patches").mkdir(parents=True)
+
+    names = sorted(new_files)
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as executor:
+        files = dict(executor.map(
+            _process_file, names, [new_files[rel] for rel in names], [base_files.get(rel) for rel in names],
+            [delta_path] * len(names), [block_size] * len(names),
+        ))
+
+    manifest = {
+        "version": DELTA_VERSION,
+        "block-size": block_size,
+        "files": files,
+        "removed": sorted(set(base_files) - set(new_files)),
+    }
+    (delta_path / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def apply_delta(base_root: Path, delta_path: Path, output_root: Path) -> None:
+    """
+    Rebuild new release in output directory from previous release and delta, checking file hashes
+    """
+    manifest = json.loads((delta_path / "manifest.json").read_text())
+    for rel, entry in manifest["files"].items():
+        output = output_root / rel
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if "link" in entry:
+            os.symlink(entry["link"], output)
+            continue
+
+        if "patch" in entry:
+            apply_patch(base_root / rel if entry["base"] else None, delta_path / entry["patch"], output)
+        else:
+            shutil.copyfile(base_root / rel, output)
+        os.chmod(output, entry["mode"])
+
+        if sha256sum(output) != entry["sha256"]:
+            raise ValueError(f"ValueError: Checksum mismatch for '{rel}' after applying delta.")
+
+
+def get_delta_stats(delta_path: Path, manifest: Dict[str, Any]) -> Dict[str, int]:
+    files = manifest["files"].values()
+    return {
+        "unchanged": sum(1 for entry in files if "sha256" in entry and "patch" not in entry),
+        "patched": sum(1 for entry in files if entry.get("base")),
+        "added": sum(1 for entry in files if "patch" in entry and not entry["base"]),
+        "removed": len(manifest["removed"]),
+        "size": sum(entry.get("size", 0) for entry in files),
+        "delta-size": sum(f.stat().st_size for f in delta_path.rglob("*") if f.is_file()),
+    }
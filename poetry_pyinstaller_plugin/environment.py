@@ -0,0 +1,184 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+from cleo.io.io import IO
+from poetry.__version__ import __version__ as poetry_version
+from poetry.poetry import Poetry
+from poetry.utils.env import Env, EnvCommandError, EnvManager, VirtualEnv
+
+from poetry_pyinstaller_plugin import utils
+from poetry_pyinstaller_plugin.config import PluginConfig
+
+INSTALL_ARGS = ("--all-extras", "--all-groups")
+
+# 'poetry install --sync' is deprecated since Poetry 2.0 in favor of 'poetry sync'
+POETRY_SYNC = int(poetry_version.split(".")[0]) >= 2
+
+
+def get_install_args(groups: Optional[Sequence[str]], extras: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    """
+    Dependency selection arguments of 'poetry install', all groups and extras by default
+    """
+    if groups is None and extras is None:
+        return INSTALL_ARGS
+
+    args = ["--only", ",".join(groups)] if groups is not None else ["--all-groups"]
+    if extras is None:
+        args.append("--all-extras")
+    elif len(extras) > 0:
+        args.extend(("--extras", " ".join(extras)))
+    return tuple(args)
+
+
+def get_install_command(install_args: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Poetry command installing given dependency selection, custom selections are synchronized with lock file
+    """
+    install_args = tuple(install_args)
+    if install_args == INSTALL_ARGS:
+        return ("poetry", "install", *install_args)
+    if POETRY_SYNC:
+        return ("poetry", "sync", *install_args)
+    return ("poetry", "install", *install_args, "--sync")
+
+
+class Environment(utils.LoggingMixin):
+    """
+    Provision virtual environment used to run PyInstaller, optionally backed by a wheelhouse snapshot
+    keyed by lock file hash and interpreter.
+
+    Project's environment is used for default dependency selection, other selections get a dedicated
+    environment in build cache, reused across builds.
+    """
+    poetry: Poetry
+    wheelhouse: Optional[Path]
+    install_args: Sequence[str]
+
+    def __init__(self, poetry: Poetry, io: IO, install_args: Sequence[str] = INSTALL_ARGS,
+                 config: Optional[PluginConfig] = None, **kwargs):
+        super().__init__(io, **kwargs)
+        self.poetry = poetry
+        self.install_args = tuple(install_args)
+        self.platform = utils.get_platform(poetry)
+
+        # Plugin configuration compiled once by commands, compiled from pyproject otherwise
+        if config is None:
+            config = PluginConfig.from_poetry(poetry)
+        self.wheelhouse = None
+        if wheelhouse := config.values["wheelhouse"]:
+            self.wheelhouse = (poetry.pyproject_path.parent / Path(wheelhouse).expanduser()).resolve()
+
+    @property
+    def dedicated(self) -> bool:
+        return self.install_args != INSTALL_ARGS
+
+    def dedicated_path(self, venv: Env) -> Path:
+        key = hashlib.sha256(" ".join(self.install_args).encode()).hexdigest()[:12]
+        interpreter = f"py{venv.version_info[0]}{venv.version_info[1]}"
+        return utils.get_cache_path(self.poetry) / "envs" / f"{key}-{interpreter}"
+
+    @property
+    def lock_path(self) -> Path:
+        return self.poetry.pyproject_path.parent / "poetry.lock"
+
+    @property
+    def lock_hash(self) -> Optional[str]:
+        if not self.lock_path.exists():
+            return None
+        digest = hashlib.sha256(self.lock_path.read_bytes())
+        digest.update(" ".join(self.install_args).encode())
+        return digest.hexdigest()
+
+    def snapshot_path(self, venv: Env) -> Optional[Path]:
+        if self.wheelhouse is None or (lock_hash := self.lock_hash) is None:
+            return None
+        interpreter = f"py{venv.version_info[0]}{venv.version_info[1]}"
+        return self.wheelhouse / f"{lock_hash[:16]}-{interpreter}-{self.platform}"
+
+    def get(self) -> Env:
+        """
+        Get virtual environment without installing dependencies, created if missing
+        """
+        env_manager = EnvManager(self.poetry, io=self._io)
+        venv = env_manager.create_venv()
+        if not self.dedicated:
+            return venv
+
+        path = self.dedicated_path(venv)
+        if not (path / "pyvenv.cfg").exists():
+            self.log(f"Creating dedicated environment <debug>[{' '.join(self.install_args)}]</debug>")
+            EnvManager.build_venv(path, executable=Path(venv.python), with_pip=True)
+        return VirtualEnv(path)
+
+    def create(self) -> Env:
+        venv = self.get()
+        self.provision(venv)
+        return venv
+
+    def provision(self, venv: Env) -> None:
+        snapshot = self.snapshot_path(venv)
+
+        if snapshot and self.is_restored(snapshot):
+            # Locked requirements of selected groups & extras are restored, 'poetry install' is left with
+            # project and path dependencies installed in develop mode, never saved in wheelhouse
+            self.restore(venv, snapshot)
+
+        self.install(venv)
+
+        if snapshot and not snapshot.exists():
+            self.snapshot(venv, snapshot)
+
+    def is_restored(self, snapshot: Path) -> bool:
+        """
+        Snapshot was saved from lock file & dependency selection of this environment, as written in its
+        fingerprint. Snapshot names only hold a prefix of lock hash, older snapshots have no fingerprint.
+        """
+        fingerprint = snapshot / "fingerprint"
+        return fingerprint.exists() and fingerprint.read_text().strip() == self.lock_hash
+
+    def install(self, venv: Env) -> None:
+        args = get_install_command(self.install_args)
+        self.debug(f"run '{' '.join(args)}'")
+        self.debug_command(venv.run(*args, cwd=self.poetry.pyproject_path.parent))
+
+    def restore(self, venv: Env, snapshot: Path) -> None:
+        """
+        Install locked requirements from wheelhouse snapshot, without reaching any index
+        """
+        self.log(f"Restoring environment from wheelhouse <debug>{snapshot.name}</debug>")
+        self.debug_command(venv.run_pip(
+            "install", "--no-index", "--no-deps", "--find-links", str(snapshot),
+            "-r", str(snapshot / "requirements.txt")
+        ))
+
+    def snapshot(self, venv: Env, snapshot: Path) -> None:
+        """
+        Build wheelhouse from installed requirements, written atomically to avoid partial snapshots
+        """
+        self.log(f"Saving environment to wheelhouse <debug>{snapshot.name}</debug>")
+        tmp = snapshot.with_name(f".{snapshot.name}.{os.getpid()}")
+        tmp.mkdir(parents=True, exist_ok=True)
+        try:
+            requirements = venv.run_pip("freeze", "--exclude-editable")
+            (tmp / "requirements.txt").write_text(requirements)
+            self.debug_command(venv.run_pip(
+                "wheel", "--no-deps", "--wheel-dir", str(tmp), "-r", str(tmp / "requirements.txt")
+            ))
+            (tmp / "fingerprint").write_text(f"{self.lock_hash}\n")
+            os.replace(tmp, snapshot)
+        except EnvCommandError as exc:
+            self.warning(f"Unable to save environment to wheelhouse: {exc}")
+        except OSError:
+            # Snapshot saved concurrently by another build
+            if not snapshot.exists():
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import IO as BinaryIO
+from typing import Any, Optional
+
+from cleo.io.io import IO
+
+from poetry_pyinstaller_plugin import utils
+
+SOCKET_PREFIX = "unix:"
+
+
+class EventStream(utils.LoggingMixin):
+    """
+    Build events written as JSON lines, as they happen, to a file (appended) or a Unix socket ('unix:<path>').
+    Writes are serialized between build threads. Stream is closed when its reader goes away, builds go on.
+    """
+    destination: str
+    emitted: int
+    _file: Optional[BinaryIO]
+    _socket: Optional[socket.socket]
+
+    def __init__(self, destination: str, io: Optional[IO] = None, **kwargs):
+        super().__init__(io, **kwargs)
+        self.destination = destination
+        self.emitted = 0
+        self._file = None
+        self._socket = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, destination: str, io: Optional[IO] = None) -> EventStream:
+        stream = cls(destination, io)
+        if destination.startswith(SOCKET_PREFIX):
+            if not hasattr(socket, "AF_UNIX"):  # pragma: nocover
+                raise ValueError(f"ValueError: Unix sockets are not supported on this platform ({destination}).")
+            stream._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                stream._socket.connect(destination[len(SOCKET_PREFIX):])
+            except OSError:
+                stream._socket.close()
+                raise
+        else:
+            path = Path(destination).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stream._file = open(path, "ab")
+        return stream
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None and self._socket is None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """
+        Write event with its time and fields, fields set to None are left out
+        """
+        record = {"event": event, "time": round(time.time(), 3), "pid": os.getpid()}
+        record.update({key: value for key, value in fields.items() if value is not None})
+        line = (json.dumps(record, default=str) + "\n").encode()
+        with self._lock:
+            if self.closed:
+                return
+            try:
+                if self._socket is not None:
+                    self._socket.sendall(line)
+                else:
+                    self._file.write(line)
+                    self._file.flush()
+                self.emitted += 1
+            except OSError as exc:
+                self.warning(f"Event stream {self.destination} closed ({exc.strerror or exc}), build goes on")
+                self._close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = self._socket = None
@@ -1,10 +1,21 @@
 # SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
 # SPDX-License-Identifier: MIT
 
+from __future__ import annotations
+
+import ast
+import asyncio
+import hashlib
 import importlib.util
+import inspect
+import json
 import os
+import threading
+import time
+from concurrent.futures import Executor, Future
 from pathlib import Path
-from typing import Callable, Literal, Optional
+from typing import (TYPE_CHECKING, Any, Callable, Dict, List, Literal,
+                    Optional, Sequence, Tuple, Union)
 
 from poetry.console.application import Application
 from poetry.poetry import Poetry
@@ -12,34 +23,204 @@ from poetry.utils.env import Env
 from tomlkit import TOMLDocument
 
 from poetry_pyinstaller_plugin import utils
+from poetry_pyinstaller_plugin.delta import sha256sum
+
+if TYPE_CHECKING:  # pragma: nocover
+    from poetry_pyinstaller_plugin.target import Target
+
+HOOK_SPEC_KEYS = ["hook", "inputs", "outputs"]
+
+# Fingerprints of hooks running concurrently are saved to the same file
+_FINGERPRINTS_LOCK = threading.Lock()
+
+
+def get_hook_spec(spec: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Normalize hook spec, either '<module>:<callable>' or a table with 'hook', 'inputs' & 'outputs' keys
+    """
+    if isinstance(spec, str):
+        spec = {"hook": spec}
+    unknown = set(spec) - set(HOOK_SPEC_KEYS)
+    if unknown:
+        raise ValueError(f"ValueError: Unsupported hook option(s) {sorted(unknown)}, not in {HOOK_SPEC_KEYS}.")
+    if ":" not in spec.get("hook", ""):
+        raise ValueError(f"ValueError: Invalid hook '{spec.get('hook')}', expected '<module>:<callable>'.")
+    return {"hook": spec["hook"], "inputs": list(spec.get("inputs", [])), "outputs": list(spec.get("outputs", []))}
+
+
+def find_hook_source(module_name: str, base_modules: Sequence[Path]) -> Optional[Path]:
+    """
+    Source of hook module in base folders of project packages, module is never loaded
+    """
+    parts = module_name.split('.')
+    for base_module in base_modules:
+        source = base_module / Path(*parts[:-1]) / f"{parts[-1]}.py"
+        if source.exists():
+            return source
+    return None
+
+
+def memoize(inputs: Sequence[str] = (), outputs: Sequence[str] = ()) -> Callable[[Callable], Callable]:
+    """
+    Declare input globs and output paths of a hook (relative to project root), hook is skipped when
+    they are unchanged since its last successful run
+    """
+    def decorator(func: Callable) -> Callable:
+        func.__hook_inputs__ = list(inputs)
+        func.__hook_outputs__ = list(outputs)
+        return func
+    return decorator
+
+
+def get_memoize_declarations(source: str, callable_name: str) -> Tuple[List[str], List[str]]:
+    """
+    Inputs & outputs declared by 'memoize' decorator of callable, read from module source without executing it.
+    Declarations built at runtime are not known, hook is not memoized.
+    """
+    for node in ast.parse(source).body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) or node.name != callable_name:
+            continue
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call):
+                continue
+            func = decorator.func
+            if (func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)) != "memoize":
+                continue
+            try:
+                arguments = dict(zip(("inputs", "outputs"), map(ast.literal_eval, decorator.args)))
+                arguments.update((keyword.arg, ast.literal_eval(keyword.value)) for keyword in decorator.keywords)
+            except ValueError:
+                return [], []
+            return list(arguments.get("inputs", [])), list(arguments.get("outputs", []))
+    return [], []
+
+
+def get_fingerprint(root: Path, inputs: Sequence[str], outputs: Sequence[str],
+                    source: Optional[Path] = None) -> str:
+    """
+    Hash of input files content, output files size & modification time and hook source
+    """
+    digest = hashlib.sha256(json.dumps([list(inputs), list(outputs)]).encode())
+    if source is not None and source.exists():
+        digest.update(f"source {sha256sum(source)}\n".encode())
+
+    for pattern in inputs:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file():
+                digest.update(f"input {path.relative_to(root).as_posix()} {sha256sum(path)}\n".encode())
+
+    for output in outputs:
+        path = root / output
+        if not path.exists():
+            digest.update(f"output {output} missing\n".encode())
+            continue
+        files = [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+        for file in files:
+            stat = file.stat()
+            digest.update(f"output {file.relative_to(root).as_posix()} {stat.st_size} {stat.st_mtime_ns}\n".encode())
+
+    return digest.hexdigest()
 
 
 class PluginHook(utils.LoggingMixin):
     _venv: Env
-    _hook: Optional[Callable]
+    _callable: Optional[Callable]
     type: Literal["pre", "post"]
     name: str
     poetry: Poetry
     pyproject_data: TOMLDocument
     platform: str
+    target: Optional[Target]
+    duration: Optional[float]
+    result: Any
+    inputs: List[str]
+    outputs: List[str]
+    cached: bool
 
-    def __init__(self, application: Application, module_name: str, callable_name: str):
+    def __init__(self, application: Application, module_name: str, callable_name: str,
+                 target: Optional[Target] = None, inputs: Sequence[str] = (), outputs: Sequence[str] = (),
+                 poetry: Optional[Poetry] = None):
         super().__init__(application._io)  # noqa
         self.name = f"{module_name}:{callable_name}"
-        self.poetry = application.poetry
+        # Hooks of workspace projects are loaded from their own project
+        self.poetry = poetry or application.poetry
         self.pyproject_data = self.poetry.pyproject.data
         self.platform = utils.get_platform(self.poetry)
-        self._hook = self._get_callable(module_name, callable_name)
+        self.target = target
+        self.duration = None
+        self.result = None
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cached = False
+        self._loaded = False
+        self._callable = None
 
-    def _get_source_path(self, module_name: str) -> Path:
-        parts = module_name.split('.')
+    @classmethod
+    def from_spec(cls, application: Application, spec: Union[str, Dict[str, Any]],
+                  target: Optional[Target] = None, poetry: Optional[Poetry] = None) -> PluginHook:
+        spec = get_hook_spec(spec)
+        return cls(application, *spec["hook"].split(":"), target=target, inputs=spec["inputs"],
+                   outputs=spec["outputs"], poetry=poetry)
+
+    @property
+    def _hook(self) -> Optional[Callable]:
+        """
+        Hook callable, module is loaded once hook is about to run
+        """
+        if not self._loaded:
+            self._callable = self._get_callable(*self.name.split(":"))
+            self._loaded = True
+        return self._callable
+
+    @_hook.setter
+    def _hook(self, value: Optional[Callable]) -> None:
+        self._callable = value
+        self._loaded = True
 
-        for base_module in utils.get_base_modules_path(self.poetry):
-            source = base_module / Path(*parts[:-1]) / f"{parts[-1]}.py"
-            if source.exists():
-                return source
+    @property
+    def fingerprint_key(self) -> str:
+        return f"{self.type}:{self.target.prog if self.target else ''}:{self.name}"
 
-        raise RuntimeError(f"Unable to find module '{module_name}' in current project.")
+    def _get_fingerprint(self) -> str:
+        source = None
+        try:
+            source = self._get_source_path(self.name.split(":")[0])
+        except RuntimeError:
+            pass
+        return get_fingerprint(self.poetry.pyproject_path.parent, self.inputs, self.outputs, source)
+
+    def _load_fingerprint(self) -> Optional[str]:
+        path = utils.get_cache_path(self.poetry) / "hooks.json"
+        try:
+            return json.loads(path.read_text())["hooks"].get(self.fingerprint_key)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_fingerprint(self, fingerprint: str) -> None:
+        path = utils.get_cache_path(self.poetry) / "hooks.json"
+        with _FINGERPRINTS_LOCK:
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                data = {"version": 1, "hooks": {}}
+            data.setdefault("hooks", {})[self.fingerprint_key] = fingerprint
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+            tmp.write_text(json.dumps(data, indent=2, sort_keys=True))
+            os.replace(tmp, path)
+
+    @property
+    def description(self) -> str:
+        if self.target is None:
+            return f"{self.type}-build hook <debug>'{self.name}'</debug>"
+        return f"{self.type}-build hook <debug>'{self.name}'</debug> of <c1>{self.target.prog}</c1>"
+
+    def _get_source_path(self, module_name: str) -> Path:
+        source = find_hook_source(module_name, utils.get_base_modules_path(self.poetry))
+        if source is None:
+            raise RuntimeError(f"Unable to find module '{module_name}' in current project.")
+        return source
 
     def _get_callable(self, module_name: str, callable_name: str) -> Optional[Callable]:
         top_module = module_name.split(".")[-1]
@@ -54,17 +235,67 @@ class PluginHook(utils.LoggingMixin):
 
         return None
 
-    def _exec(self, venv: Env) -> None:
+    def _load_declarations(self) -> bool:
+        """
+        Inputs & outputs of hook, declared in pyproject or by 'memoize' decorator. Return whether hook is memoized.
+        """
+        # Inputs & outputs declared in pyproject are checked before loading hook's module
+        if not (self.inputs or self.outputs) and self._hook is not None:
+            self.inputs = list(getattr(self._hook, "__hook_inputs__", []))
+            self.outputs = list(getattr(self._hook, "__hook_outputs__", []))
+        return bool(self.inputs or self.outputs)
+
+    def is_cached(self) -> bool:
+        """
+        Hook would be skipped: memoized and inputs & outputs unchanged since its last successful run. Hook's module
+        is parsed, never executed: missing or invalid modules are not cached.
+        """
+        if not (self.inputs or self.outputs):
+            module_name, callable_name = self.name.split(":")
+            try:
+                source = self._get_source_path(module_name).read_text()
+                self.inputs, self.outputs = get_memoize_declarations(source, callable_name)
+            except (RuntimeError, OSError, SyntaxError, ValueError):
+                return False
+        return bool(self.inputs or self.outputs) and self._load_fingerprint() == self._get_fingerprint()
+
+    def _exec(self, venv: Env) -> Any:
         """
-        Start hook callable
+        Start hook callable, coroutine functions are run in their own event loop
         """
         self._venv = venv
-        if self._hook:
-            self.log(f"<info>Running<info> {self.type}-build hook <debug>'{self.name}'</debug>")
-            self._hook(self)
-        else:
+        self.cached = False
+        memoized = self._load_declarations()
+
+        if memoized and self._load_fingerprint() == self._get_fingerprint():
+            self.cached = True
+            self.log(f"<info>Skipping</info> {self.description}, inputs & outputs unchanged")
+            return None
+
+        if not self._hook:
             module, _callable = self.name.split(':')
             self.warning(f"Skipping {self.type}-build hook, '{_callable}' callable not found in {module}.")
+            return None
+
+        self.log(f"<info>Running<info> {self.description}")
+        start = time.perf_counter()
+        try:
+            result = self._hook(self)
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+            self.result = result
+        finally:
+            self.duration = time.perf_counter() - start
+
+        if memoized:
+            self._save_fingerprint(self._get_fingerprint())
+        return result
+
+    def submit(self, executor: Executor, venv: Env) -> Future:
+        """
+        Run hook in given executor, hook result or exception is available from returned future
+        """
+        return executor.submit(self._exec, venv)
 
     def run(self, command: str, *args: str) -> str:
         """
@@ -76,6 +307,13 @@ class PluginHook(utils.LoggingMixin):
             self.debug("++ " + line)
         return output
 
+    async def run_async(self, command: str, *args: str) -> str:
+        """
+        Run command in virtual environment from a worker thread, allowing coroutine hooks to run
+        several commands concurrently
+        """
+        return await asyncio.to_thread(self.run, command, *args)
+
     def run_pip(self, *args: str) -> str:
         """
         Install requirements in virtual environment
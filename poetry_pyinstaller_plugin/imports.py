@@ -0,0 +1,198 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import ast
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set
+
+from poetry.poetry import Poetry
+
+from poetry_pyinstaller_plugin import utils
+
+if TYPE_CHECKING:  # pragma: nocover
+    from poetry_pyinstaller_plugin.target import Target
+
+
+class ImportGraph:
+    """
+    Static import graph of project's modules, parsed imports are cached on disk and only
+    re-parsed for files modified since last update.
+    """
+    CACHE_VERSION = 1
+
+    def __init__(self, roots: Iterable[Path], cache_path: Optional[Path] = None):
+        self.roots = [Path(root).resolve() for root in roots]
+        self.cache_path = cache_path
+        self.modules: Dict[str, Path] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    @classmethod
+    def from_poetry(cls, poetry: Poetry) -> ImportGraph:
+        return cls(utils.get_base_modules_path(poetry), utils.get_cache_path(poetry) / "import-graph.json")
+
+    def _load(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except ValueError:
+            return
+        if data.get("version") == self.CACHE_VERSION:
+            self._entries = data.get("files", {})
+
+    def save(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": self.CACHE_VERSION, "files": self._entries}))
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+    def module_name(self, path: Path) -> Optional[str]:
+        path = Path(path).resolve()
+        if path.suffix != ".py":
+            return None
+        for root in self.roots:
+            if root in path.parents:
+                parts = list(path.relative_to(root).with_suffix("").parts)
+                if parts[-1] == "__init__":
+                    parts.pop()
+                return ".".join(parts) or None
+        return None
+
+    def update(self) -> None:
+        """
+        Scan project's packages, parse new or modified modules and save cache
+        """
+        self.modules = {}
+        seen = set()
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in utils.IGNORED_NAMES and not d.startswith(".")]
+                for filename in filenames:
+                    if not filename.endswith(".py"):
+                        continue
+                    path = Path(dirpath, filename)
+                    if name := self.module_name(path):
+                        self.modules.setdefault(name, path)
+                        self.imports(path)
+                        seen.add(str(path))
+
+        for key in list(self._entries):
+            if key not in seen:
+                del self._entries[key]
+                self._dirty = True
+        self.save()
+
+    def imports(self, path: Path) -> List[str]:
+        """
+        Absolute names imported by module at given path
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return []
+
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry and entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["imports"]
+
+        imports = sorted(self._parse(path))
+        self._entries[key] = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "imports": imports}
+        self._dirty = True
+        return imports
+
+    def _parse(self, path: Path) -> Set[str]:
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except (SyntaxError, ValueError):
+            return set()
+
+        module = self.module_name(path)
+        package = module if module and path.name == "__init__.py" else (module or "").rpartition(".")[0]
+
+        names = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    names.update(_parents(alias.name))
+            elif isinstance(node, ast.ImportFrom):
+                base = node.module or ""
+                if node.level:
+                    if not module:
+                        continue
+                    parts = package.split(".") if package else []
+                    if node.level - 1 > len(parts):
+                        continue
+                    parts = parts[:len(parts) - (node.level - 1)]
+                    base = ".".join(filter(None, [*parts, base]))
+                if not base:
+                    continue
+                names.update(_parents(base))
+                names.update(f"{base}.{alias.name}" for alias in node.names if alias.name != "*")
+        return names
+
+    def closure(self, source: Path, extra: Iterable[str] = ()) -> Set[str]:
+        """
+        Names of modules transitively imported by source, including unresolved names
+        """
+        names: Set[str] = set()
+        queue = [*extra, *self.imports(Path(source).resolve())]
+        if name := self.module_name(source):
+            queue.extend(_parents(name))
+
+        while queue:
+            name = queue.pop()
+            if name in names:
+                continue
+            names.add(name)
+            if path := self.modules.get(name):
+                queue.extend(self.imports(path))
+        return names
+
+
+def _parents(name: str) -> List[str]:
+    parts = name.split(".")
+    return [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+
+
+def get_affected_targets(poetry: Poetry, targets: List[Target], changes: Set[Path]) -> List[Target]:
+    """
+    Filter targets affected by changed files, either owned by target or part of target's import closure
+    """
+    project_path = poetry.pyproject_path.parent
+    if changes & {poetry.pyproject_path.resolve(), (project_path / "poetry.lock").resolve()}:
+        return list(targets)
+
+    graph = ImportGraph.from_poetry(poetry)
+    graph.update()
+
+    affected = []
+    for target in targets:
+        owned = target.watch_paths
+        if any(change == path or path in change.parents for change in changes for path in owned):
+            affected.append(target)
+            continue
+
+        hidden_imports = target.hidden_import or []
+        if isinstance(hidden_imports, str):
+            hidden_imports = [hidden_imports]
+        collected = [module for modules in target.collect_config.values() for module in modules]
+
+        closure = graph.closure(target.source, [*hidden_imports, *collected])
+        for change in changes:
+            name = graph.module_name(change)
+            if name and (name in closure or any(name.startswith(f"{c}.") for c in collected)):
+                affected.append(target)
+                break
+
+    graph.save()
+    return affected
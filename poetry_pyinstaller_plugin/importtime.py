@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Set
+
+PREFIX = "import time:"
+
+
+@dataclasses.dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: List[ImportNode] = dataclasses.field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "self": self.self_us,
+            "cumulative": self.cumulative_us,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+def parse_importtime(output: str) -> List[ImportNode]:
+    """
+    Parse '-X importtime' output into a tree. Modules are reported once imported, after their own imports,
+    so children of a module are pending nodes one level deeper.
+    """
+    pending: Dict[int, List[ImportNode]] = {}
+    for line in output.splitlines():
+        if not line.startswith(PREFIX):
+            continue
+        parts = line[len(PREFIX):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        level = (len(name) - len(name.lstrip(" "))) // 2
+        node = ImportNode(name.strip(), int(parts[0]), int(parts[1]), pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(node)
+    return pending.get(0, [])
+
+
+def iter_nodes(nodes: Iterable[ImportNode]) -> Iterator[ImportNode]:
+    for node in nodes:
+        yield node
+        yield from iter_nodes(node.children)
+
+
+def rank(nodes: Iterable[ImportNode], limit: int, key: str = "cumulative_us") -> List[ImportNode]:
+    return sorted(iter_nodes(nodes), key=lambda node: getattr(node, key), reverse=True)[:limit]
+
+
+def get_config_only_modules(nodes: Iterable[ImportNode], closure: Set[str],
+                            hidden_imports: Sequence[str], collected: Sequence[str]) -> List[ImportNode]:
+    """
+    Modules imported at runtime, required by 'hidden-import' or 'collect' only: not part of static import
+    closure of target's source
+    """
+    modules = []
+    for node in iter_nodes(nodes):
+        if node.name in closure:
+            continue
+        if node.name in hidden_imports or any(node.name == c or node.name.startswith(f"{c}.") for c in collected):
+            modules.append(node)
+    return modules
+
+
+def run_importtime(executable: Path, args: Sequence[str], timeout: float = 60.0) -> str:
+    """
+    Run executable with import time profiling enabled, return standard error
+    """
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME="1")
+    out = subprocess.run([str(executable), *args], capture_output=True, text=True, env=env, timeout=timeout)
+    return out.stderr
@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import IO, Optional
+
+if sys.platform == "win32":  # pragma: nocover
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    Advisory lock on a file, held between concurrent builds of the same checkout (processes or threads).
+    Lock file is left in place, removing it would let another build lock a new file with the same name.
+    """
+    path: Path
+    _file: Optional[IO]
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            if sys.platform == "win32":  # pragma: nocover
+                self._file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after 10 seconds
+                        continue
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._file.close()
+            self._file = None
+            raise
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if sys.platform == "win32":  # pragma: nocover
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> FileLock:
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def publish(source: Path, destination: Path) -> None:
+    """
+    Replace destination by source. Source is first moved next to destination, then renamed over it,
+    destination never holds a partially copied output. Caller holds lock of destination.
+    Files are replaced atomically. Directories can't be renamed over each other: previous output is renamed aside
+    first and removed after the swap, destination is missing between both renames (never partially written).
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    staged = destination.with_name(f".{destination.name}.{token}.new")
+    shutil.move(str(source), staged)
+
+    replaced = destination.exists() or destination.is_symlink()
+    if not replaced or not (staged.is_dir() or (destination.is_dir() and not destination.is_symlink())):
+        # Files are replaced atomically
+        os.replace(staged, destination)
+        return
+
+    # Directories can't be renamed over non-empty directories or files, previous output is moved away first
+    previous = destination.with_name(f".{destination.name}.{token}.old")
+    os.replace(destination, previous)
+    try:
+        os.replace(staged, destination)
+    except OSError:
+        os.replace(previous, destination)
+        _remove(staged)
+        raise
+    _remove(previous)
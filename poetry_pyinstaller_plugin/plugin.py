@@ -5,12 +5,17 @@ from __future__ import annotations
 
 __author__ = "Thomas Mahé <oss@tmahe.fr>"
 
+import contextlib
 import fnmatch
 import importlib
+import json
 import logging
 import os
+import shlex
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 import poetry.console
 from cleo.commands.command import Command
@@ -19,13 +24,44 @@ from cleo.events.console_events import COMMAND, TERMINATE
 from cleo.events.console_terminate_event import ConsoleTerminateEvent
 from cleo.events.event import Event
 from cleo.events.event_dispatcher import EventDispatcher
+from cleo.helpers import argument, option
+from cleo.io.outputs.output import Type as OutputType
 from poetry.console.application import Application
 from poetry.console.commands.build import BuildCommand
 from poetry.plugins.application_plugin import ApplicationPlugin
-from poetry.utils.env import EnvManager
+from poetry.utils.env import Env
 
 from poetry_pyinstaller_plugin import Target, __version__, utils
-from poetry_pyinstaller_plugin.hooks import PostHook, PreHook
+from poetry_pyinstaller_plugin.backends import get_backend
+from poetry_pyinstaller_plugin.binaries import (get_cached_binaries,
+                                                get_commands)
+from poetry_pyinstaller_plugin.bytecode import (get_environment_roots,
+                                                get_precompiled_modules,
+                                                get_source_stamps, precompile,
+                                                write_bytecode_manifest)
+from poetry_pyinstaller_plugin.config import ConfigError, PluginConfig
+from poetry_pyinstaller_plugin.delta import (create_delta, get_delta_stats,
+                                             open_base)
+from poetry_pyinstaller_plugin.environment import INSTALL_ARGS, Environment
+from poetry_pyinstaller_plugin.events import EventStream
+from poetry_pyinstaller_plugin.hooks import (PluginHook, PostHook, PreHook,
+                                             get_hook_spec)
+from poetry_pyinstaller_plugin.imports import (ImportGraph,
+                                               get_affected_targets)
+from poetry_pyinstaller_plugin.importtime import (ImportNode,
+                                                  get_config_only_modules,
+                                                  iter_nodes,
+                                                  parse_importtime, rank,
+                                                  run_importtime)
+from poetry_pyinstaller_plugin.prepare import ReadyMarker
+from poetry_pyinstaller_plugin.profiling import (get_hook_timings,
+                                                 get_hotspots)
+from poetry_pyinstaller_plugin.scheduler import Scheduler
+from poetry_pyinstaller_plugin.watch import _Watcher, create_watcher
+from poetry_pyinstaller_plugin.wheel import bundle_wheel
+from poetry_pyinstaller_plugin.workspace import (EnvironmentPool, Project,
+                                                 discover_projects,
+                                                 load_project)
 
 
 class PyInstallerShowCommand(Command, utils.LoggingMixin):
@@ -40,84 +76,1024 @@ class PyInstallerShowCommand(Command, utils.LoggingMixin):
 class PyInstallerBuildCommand(BuildCommand, utils.LoggingMixin):
     name = "pyinstaller build"
     description = "Build PyInstaller targets (Excluding targets with bundle feature enabled)."
+    options = [
+        *BuildCommand.options,
+        option("changed-since", None, "Only build targets affected by changes since given git reference.", flag=False),
+        option("delta-from", None, "Create delta against previous release directory or archive.", flag=False),
+        option("events", None, "Write build events as JSON lines to file or Unix socket ('unix:PATH').", flag=False),
+        option("profile", None, "Profile PyInstaller runs with cProfile and report hotspots.", flag=True),
+        option("projects", None, "Build targets of all projects matching glob pattern, relative to current project.",
+               flag=False, multiple=True),
+    ]
     targets: List[Target]
     output: Path
 
     def __init__(self, application: Application):  # pragma: nocover
         super().__init__()
         self._app = application
-        self._pyproject = utils.PyProjectConfig(self._app.poetry.pyproject.data)
+        self.config = PluginConfig.from_poetry(self._app.poetry)
         self.attach_io(application._io)  # noqa
 
-        targets = self._pyproject.lookup("tool.poetry-pyinstaller-plugin.targets", dict())
-
-        self.targets = [Target(name, self._app.poetry, io=self._io) for name in targets.keys()]
+        self.targets = self._load_targets()
 
         self.platform = utils.get_platform(self._app.poetry)
         self.pre_build_hook = None
         self.post_build_hook = None
+        self.executed_hooks: List[PluginHook] = []
+        self.events: Optional[EventStream] = None
+        # Workspace project of targets built with '--projects', by target identity
+        self.workspace: Dict[int, Project] = {}
+
+        if hook_spec := self.config.values.get("pre-build"):
+            self.pre_build_hook = PreHook.from_spec(self._app, hook_spec)
 
-        if hook_spec := self._pyproject.lookup('tool.poetry-pyinstaller-plugin.pre-build', None):
-            self.pre_build_hook = PreHook(self._app, *hook_spec.split(":"))
+        if hook_spec := self.config.values.get("post-build"):
+            self.post_build_hook = PostHook.from_spec(self._app, hook_spec)
 
-        if hook_spec := self._pyproject.lookup('tool.poetry-pyinstaller-plugin.post-build', None):
-            self.post_build_hook = PostHook(self._app, *hook_spec.split(":"))
+    def _load_targets(self) -> List[Target]:
+        # Invalid options are all reported before any target is created, missing paths once targets are known
+        self.config.check(paths=False)
+        return [
+            Target(name, self._app.poetry, io=self._io, config=config) for name, config in self.config.targets.items()
+        ]
+
+    def check_config(self, configs: List[Tuple[str, PluginConfig, List[Target]]]) -> None:
+        """
+        Log warnings of configurations, then raise problems of all configurations at once. Runs before any
+        expensive step, paths missing for targets skipped on this version are ignored.
+        """
+        problems = []
+        for prefix, config, targets in configs:
+            for warning in config.warnings:
+                self.warning(f"Warning: {prefix}{warning}")
+            problems.extend(config.get_problems([target.name for target in targets if target.skip], prefix=prefix))
+        if problems:
+            raise ConfigError(problems)
 
     @property
     def use_bundle(self) -> bool:
         return True in [t.bundle for t in self.targets]
 
+    def get_affected_targets(self, ref: str, project: Optional[Project] = None) -> List[Target]:
+        """
+        Targets affected by files changed since given git reference, of workspace project if any
+        """
+        poetry = project.poetry if project else self._app.poetry
+        changes = utils.get_changed_files(poetry.pyproject_path.parent, ref)
+        for change in sorted(changes):
+            self.debug(f"changed: {change}")
+        return get_affected_targets(poetry, project.targets if project else self.targets, changes)
+
+    def filter_affected_targets(self, ref: str, project: Optional[Project] = None) -> List[Target]:
+        """
+        Targets to build with '--changed-since', others are reported as skipped to event stream
+        """
+        targets = self.get_affected_targets(ref, project)
+        prefix = f"{project.name}: " if project else ""
+        self.log(f"{prefix}<info>{len(targets)}</info> target(s) affected by changes since <c1>{ref}</c1>")
+        if self.events is not None:
+            affected = {id(target) for target in targets}
+            for target in project.targets if project else self.targets:
+                if id(target) not in affected:
+                    target.events = self.events
+                    target.emit("target-skipped", reason=f"not affected by changes since {ref}")
+        return targets
+
+    def _create_venv(self, targets: List[Target]) -> Env:  # pragma: nocover
+        """
+        Provision project's environment and dedicated environments of given targets
+        """
+        venv = Environment(self._app.poetry, self._io, config=self.config).create()
+        selections = {
+            target.install_args for target in targets
+            if not target.skip and get_backend(target.backend).requires_environment
+        }
+        for install_args in sorted(selections):
+            environment = Environment(self._app.poetry, self._io, install_args, config=self.config)
+            if environment.dedicated:
+                environment.create()
+        return venv
+
+    def get_target_hook(self, target: Target, hook_type: str) -> Optional[PluginHook]:
+        """
+        Per-target 'pre-build' or 'post-build' hook, executed hooks are kept for build summary
+        """
+        spec = target.pre_build if hook_type == "pre" else target.post_build
+        if spec is None:
+            return None
+        project = self.workspace.get(id(target))
+        hook = (PreHook if hook_type == "pre" else PostHook).from_spec(
+            self._app, spec, target=target, poetry=project.poetry if project else None)
+        self.executed_hooks.append(hook)
+        return hook
+
+    def get_environment(self, target: Target) -> Env:
+        """
+        Build environment of target, environment shared by workspace projects with identical lock files
+        """
+        if project := self.workspace.get(id(target)):
+            return project.environments[target.install_args]
+        return Environment(self._app.poetry, self._io, target.install_args, config=self.config).get()
+
+    def precompile_bytecode(self, targets: List[Target]) -> None:
+        """
+        Compile modules of build environments and project packages once for all targets, in parallel.
+        Bytecode is fed to PyInstaller run of each target and compiled again only when sources change.
+        """
+        levels, environments = self.get_bytecode_environments(targets)
+        if not environments:
+            return
+        for target in targets:
+            target.precompiled = not target.skip and target.backend == "pyinstaller"
+        self.log(f"Precompiling bytecode <debug>(optimization level {', '.join(map(str, levels))})</debug>")
+        script_path = utils.get_cache_path(self._app.poetry) / "precompile.py"
+        entries = {}
+        for path, (venv, roots, keys) in environments.items():
+            start = time.perf_counter()
+            stats = precompile(venv, sorted(roots), levels, script_path)
+            self.log(f"  - Compiled <info>{stats['compiled']}</info> module(s) <debug>({stats['cached']} unchanged, "
+                     f"{stats['failed']} failed, {time.perf_counter() - start:.1f}s, {path})</debug>")
+            for key, sources in keys.items():
+                entries[key] = {"environment": str(path), "levels": levels, "sources": get_source_stamps(sources),
+                                "modules": stats["compiled"] + stats["cached"]}
+        write_bytecode_manifest(self.bytecode_manifest_path, entries)
+
+    @property
+    def bytecode_manifest_path(self) -> Path:
+        """
+        Environments precompiled by last build, read by plan
+        """
+        return utils.get_cache_path(self._app.poetry) / "bytecode.json"
+
+    def get_bytecode_key(self, target: Target) -> Tuple[Optional[str], List[Path]]:
+        """
+        Hash of lock file & dependency selection of target's build environment, with sources of its project
+        """
+        project = self.workspace.get(id(target))
+        poetry, config = (project.poetry, project.config) if project else (self._app.poetry, self.config)
+        key = Environment(poetry, self._io, target.install_args, config=config).lock_hash
+        return key, utils.get_module_sources(poetry)
+
+    def get_bytecode_environments(self, targets: List[Target]
+                                  ) -> Tuple[List[int], Dict[Path, Tuple[Env, Set[Path], Dict[str, List[Path]]]]]:
+        """
+        Optimization levels of PyInstaller targets and their build environments with roots to compile, and
+        hashes of lock file & dependency selection of targets using them
+        """
+        levels = {0}
+        environments: Dict[Path, Tuple[Env, Set[Path], Dict[str, List[Path]]]] = {}
+        for target in targets:
+            if target.skip or target.backend != "pyinstaller":
+                continue
+            levels.add(target.optimize_level)
+            venv = self.get_environment(target)
+            project = self.workspace.get(id(target))
+            _, roots, keys = environments.setdefault(Path(venv.path), (venv, set(get_environment_roots(venv)), {}))
+            roots.update(utils.get_base_modules_path(project.poetry if project else self._app.poetry))
+            key, sources = self.get_bytecode_key(target)
+            if key is not None:
+                keys[key] = sources
+        return sorted(levels), environments
+
+    def build_targets(self, targets: List[Target], build: Optional[Callable[[Target], None]] = None) -> None:
+        """
+        Build targets with scheduler, concurrently when a memory limit is configured.
+        Smoke tests, per-target post-build hooks and archives run in background while next targets are building.
+        """
+        if build is None:
+            def build(target: Target) -> None:
+                target.build(self._app.poetry, self, install=False)
+
+        tasks: List[Future] = []
+        scheduler = Scheduler.from_poetry(self._app.poetry, self._io, self.config)
+        if self.events is not None:
+            for target in targets:
+                target.events = self.events
+                duration, peak_rss = scheduler.history.estimate(target)
+                target.emit("target-queued", estimated_duration=duration, estimated_peak_rss=peak_rss)
+
+        # Executors are shut down in reverse order, smoke tests & archives submitted by post-build hooks are awaited
+        with (ThreadPoolExecutor(max_workers=1) as archiver, ThreadPoolExecutor() as tester,
+              ThreadPoolExecutor() as hooks):
+            def post_process(target: Target) -> None:
+                if target.smoke:
+                    tasks.append(tester.submit(target.smoke_test))
+                if target.archive:
+                    tasks.append(archiver.submit(target.create_archive))
+
+            def post_build(target: Target, hook: PluginHook) -> None:
+                hook._exec(self.get_environment(target))  # noqa
+                post_process(target)
+
+            def build_and_post_process(target: Target) -> None:
+                # Pre-build hooks of prepared targets ran in 'poetry pyinstaller prepare'
+                if not (target.skip or target.prepared) and (pre_hook := self.get_target_hook(target, "pre")):
+                    pre_hook._exec(self.get_environment(target))  # noqa
+                build(target)
+                if target.duration is None:
+                    return
+                if post_hook := self.get_target_hook(target, "post"):
+                    # Smoke test & archive run once post-build hook is done, on files signed or patched by hook
+                    tasks.append(hooks.submit(post_build, target, post_hook))
+                else:
+                    post_process(target)
+
+            # Pending tasks are awaited on exit, even if a build failed
+            scheduler.run(targets, build_and_post_process)
+
+        for future in tasks:
+            future.result()
+
+    def log_hooks_summary(self) -> None:
+        """
+        Duration and result of executed hooks
+        """
+        hooks = [hook for hook in self.executed_hooks if hook.cached or hook.duration is not None]
+        if not hooks:
+            return
+        self.log("Hooks summary")
+        for hook in hooks:
+            if hook.cached:
+                self.log(f"  - {hook.description} <debug>(cached)</debug>")
+                continue
+            result = f", returned {hook.result!r}" if hook.result is not None else ""
+            self.log(f"  - {hook.description} <debug>({hook.duration:.2f}s{result})</debug>")
+
+    def log_work_dir_summary(self, targets: List[Target]) -> None:
+        """
+        Work dir used by targets configured with 'work-dir', with I/O time saved compared to last build on disk
+        """
+        targets = [target for target in targets if target.work_dir is not None and target.duration is not None]
+        if not targets:
+            return
+        self.log("Work dir summary")
+        for target in targets:
+            size = f"{utils.format_size(target.work_size)} of intermediates" if target.work_size else "intermediates"
+            if target.work_dir_used is None:
+                self.log(f"  - <c1>{target.prog}</c1> built on disk <debug>({size})</debug>")
+            elif target.io_saved is None:
+                self.log(f"  - <c1>{target.prog}</c1> built in {target.work_dir_used} "
+                         f"<debug>({size}, no build on disk to compare with)</debug>")
+            else:
+                self.log(f"  - <c1>{target.prog}</c1> built in {target.work_dir_used}, "
+                         f"<info>{target.io_saved:.1f}s</info> I/O time saved <debug>({size})</debug>")
+
+    def report_profiles(self, targets: List[Target], limit: int = 10) -> None:
+        """
+        Hotspots & slowest PyInstaller hooks of profiled builds
+        """
+        for target in targets:
+            if not target.profile_path.exists() or target.duration is None:
+                continue
+            self.log(f"Profile of <c1>{target.prog}</c1> <debug>({target.profile_path})</debug>")
+            for hotspot in get_hotspots(target.profile_path, limit):
+                self.log(f"  {hotspot['cumulative']:8.2f}s {hotspot['total']:8.2f}s  {hotspot['function']} "
+                         f"<debug>({hotspot['location']}, {hotspot['calls']} calls)</debug>")
+            if hooks := get_hook_timings(target.profile_path, limit):
+                self.log(f"  Slowest hooks of <c1>{target.prog}</c1>")
+                for hook in hooks:
+                    self.log(f"  {hook['time']:8.2f}s  {hook['hook']} <debug>({hook['path']})</debug>")
+
+    def create_delta(self, targets: List[Target], base: Path) -> Dict[str, Any]:
+        """
+        Delta of built targets against previous release, written to 'dist/pyinstaller/delta/<platform>'
+        """
+        output_path = utils.get_output_path(self) / "pyinstaller"
+        dist_path = output_path / self.platform
+        delta_path = output_path / "delta" / self.platform
+        paths = [str(path.relative_to(dist_path)) for target in targets if not target.skip
+                 for path in (target.output_path, *target.extra_outputs)]
+
+        self.log(f"Creating delta against <c1>{base}</c1>")
+        with open_base(base.resolve()) as base_root:
+            manifest = create_delta(base_root, dist_path, paths, delta_path)
+
+        stats = get_delta_stats(delta_path, manifest)
+        self.log(f"  - <info>{stats['patched']}</info> patched, <info>{stats['added']}</info> added, "
+                 f"<info>{stats['removed']}</info> removed, {stats['unchanged']} unchanged "
+                 f"<debug>({utils.format_size(stats['delta-size'])} for {utils.format_size(stats['size'])})</debug>")
+        return manifest
+
+    def load_workspace(self, patterns: List[str]) -> List[Project]:
+        """
+        Projects matching '--projects' patterns, relative to current project
+        """
+        root = self._app.poetry.pyproject_path.parent
+        output = Path(output).resolve() if (output := self.option("output")) else None
+        projects, problems = [], []
+        for path in discover_projects(root, patterns):
+            try:
+                projects.append(load_project(root, path, self._io, output))
+            except ConfigError as error:
+                problems.extend(error.problems)
+        if problems:
+            raise ConfigError(problems)
+
+        for project in projects:
+            for target in project.targets:
+                self.workspace[id(target)] = project
+        return projects
+
+    def get_project_hook(self, project: Project, hook_type: str) -> Optional[PluginHook]:
+        """
+        Plugin level 'pre-build' or 'post-build' hook of workspace project
+        """
+        if (spec := project.config.values.get(f"{hook_type}-build")) is None:
+            return None
+        hook = (PreHook if hook_type == "pre" else PostHook).from_spec(self._app, spec, poetry=project.poetry)
+        self.executed_hooks.append(hook)
+        return hook
+
+    def prepare_workspace(self, projects: List[Project]) -> EnvironmentPool:
+        """
+        Provision environments of workspace targets, shared between projects with identical lock files
+        """
+        self.log("Preparing environments")
+        pool = EnvironmentPool(self._io)
+        for project in projects:
+            if project.prepared:
+                self.log(f"  - Using environments of <c1>{project.name}</c1> prepared by "
+                         f"<c1>poetry pyinstaller prepare</c1>")
+            for target in project.targets:
+                if target.skip or not get_backend(target.backend).requires_environment:
+                    continue
+                if project.prepared:
+                    target.prepared = True
+                    if target.install_args not in project.environments:
+                        environment = Environment(project.poetry, self._io, target.install_args, config=project.config)
+                        project.environments[target.install_args] = environment.get()
+                else:
+                    pool.get(project, target.install_args)
+        return pool
+
+    @staticmethod
+    def get_project_environment(project: Project, pool: EnvironmentPool) -> Env:
+        """
+        Environment running plugin level hooks of workspace project: project's environment when one of its
+        targets uses it, otherwise any environment of its targets. Created only when targets need none.
+        """
+        if INSTALL_ARGS in project.environments:
+            return project.environments[INSTALL_ARGS]
+        if project.environments:
+            return next(iter(project.environments.values()))
+        return pool.get(project, INSTALL_ARGS)
+
+    def precompile_workspace(self, projects: List[Project]) -> None:
+        """
+        Precompile bytecode of targets of projects enabling 'precompile' in their own configuration
+        """
+        targets = [target for project in projects if project.config.values["precompile"] for target in project.targets]
+        if targets:
+            self.precompile_bytecode(targets)
+
+    def build_workspace(self, projects: List[Project]) -> None:
+        """
+        Schedule targets of all projects at once, each target is built to its project's output
+        """
+        def build(target: Target) -> None:
+            project = self.workspace[id(target)]
+            target.build(project.poetry, self, install=False, dist_path=project.dist_path,
+                         venv=project.environments.get(target.install_args))
+
+        self.build_targets([target for project in projects for target in project.targets], build)
+
+    def log_workspace_summary(self, projects: List[Project], pool: EnvironmentPool, duration: float) -> None:
+        """
+        Built targets by project, with environments created & reused
+        """
+        self.log("Workspace summary")
+        built = 0
+        for project in projects:
+            targets = [target for target in project.targets if target.duration is not None]
+            built += len(targets)
+            skipped = sum(target.skip for target in project.targets)
+            details = f", {skipped} skipped" if skipped else ""
+            self.log(f"  - <c1>{project.name}</c1> <info>{len(targets)}</info> target(s) built "
+                     f"<debug>({sum(target.duration for target in targets):.1f}s{details})</debug>")
+            for target in targets:
+                self.log(f"      {target.prog} <debug>({target.duration:.1f}s, {target.output_path})</debug>")
+        self.log(f"Built <info>{built}</info> target(s) of <info>{len(projects)}</info> project(s) in {duration:.1f}s "
+                 f"<debug>({pool.created} environment(s) created, {pool.reused} reused)</debug>")
+
+    def handle_workspace(self, patterns: List[str]) -> int:  # pragma: nocover
+        if utils.get_option(self, "delta-from"):
+            raise ValueError("ValueError: --delta-from is not supported with --projects, "
+                             "create delta of each project from its own directory.")
+
+        projects = self.load_workspace(patterns)
+        if not projects:
+            self.warning(f"No project with pyinstaller targets matching {', '.join(patterns)}.")
+            return 0
+        self.check_config([(f"{project.name}: ", project.config, project.targets) for project in projects])
+
+        # Markers are checked against all targets of project, as written by 'prepare'
+        for project in projects:
+            project.prepared = ReadyMarker.from_poetry(project.poetry).is_valid(project.targets)
+
+        if ref := utils.get_option(self, "changed-since"):
+            for project in projects:
+                project.targets = self.filter_affected_targets(ref, project)
+            projects = [project for project in projects if project.targets]
+            if not projects:
+                return 0
+
+        start = time.perf_counter()
+        self.log(f"Building <info>pyinstaller</info> targets of <info>{len(projects)}</info> project(s) "
+                 f"<debug>[{self.platform}]</debug>")
+        for project in projects:
+            self.debug(f"{project.name}: {', '.join(target.prog for target in project.targets)}")
+
+        pool = self.prepare_workspace(projects)
+        targets = [target for project in projects for target in project.targets]
+        profile = utils.get_option(self, "profile", False)
+        for target in targets:
+            target.profile = profile
+
+        for project in projects:
+            if not project.prepared and (hook := self.get_project_hook(project, "pre")):
+                hook._exec(self.get_project_environment(project, pool))  # noqa
+
+        self.precompile_workspace(projects)
+
+        self.build_workspace(projects)
+        self.log_work_dir_summary(targets)
+
+        if profile:
+            self.report_profiles(targets)
+
+        for project in projects:
+            if hook := self.get_project_hook(project, "post"):
+                hook._exec(self.get_project_environment(project, pool))  # noqa
+
+        self.log_workspace_summary(projects, pool, time.perf_counter() - start)
+        self.log_hooks_summary()
+        return 0
+
+    @contextlib.contextmanager
+    def event_stream(self) -> Iterator[Optional[EventStream]]:
+        """
+        Stream build events to '--events' destination for the duration of the build, with overall
+        build status. Without destination, events are not recorded.
+        """
+        destination = utils.get_option(self, "events")
+        if not destination:
+            yield None
+            return
+
+        self.events = EventStream.open(destination, self._io)
+        self.events.emit("build-started", project=self._app.poetry.package.name, platform=self.platform,
+                         projects=utils.get_option(self, "projects") or None)
+        start = time.perf_counter()
+        error = None
+        try:
+            yield self.events
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            raise
+        finally:
+            self.events.emit("build-finished", status="failed" if error else "success",
+                             duration=round(time.perf_counter() - start, 3), error=error)
+            self.events.close()
+            self.events = None
+
     def handle(self) -> int:  # pragma: nocover
-        env_manager = EnvManager(self._app.poetry, io=self._io)
-        venv = env_manager.create_venv()
-        venv.run("poetry", "install", "--all-extras", "--all-groups")
+        with self.event_stream():
+            if patterns := utils.get_option(self, "projects"):
+                return self.handle_workspace(patterns)
+            return self.handle_project()
+
+    def handle_project(self) -> int:  # pragma: nocover
+        self.check_config([("", self.config, self.targets)])
+        targets = self.targets
+        if ref := utils.get_option(self, "changed-since"):
+            targets = self.filter_affected_targets(ref)
+            if len(targets) == 0:
+                return 0
+
+        if profile := utils.get_option(self, "profile", False):
+            for target in targets:
+                target.profile = True
+
+        if prepared := ReadyMarker.from_poetry(self._app.poetry).is_valid(self.targets):
+            self.log("Using environments prepared by <c1>poetry pyinstaller prepare</c1>")
+            venv = Environment(self._app.poetry, self._io, config=self.config).get()
+            for target in targets:
+                target.prepared = True
+        else:
+            venv = self._create_venv(targets)
+
         venv_version = f"python{venv.version_info[0]}.{venv.version_info[1]}"
-        pyinstaller_version = venv.run("pyinstaller", "--version").strip()
+        pyinstaller_version = None
+        if any(target.backend == "pyinstaller" for target in targets):
+            pyinstaller_version = venv.run("pyinstaller", "--version").strip()
 
-        if self.pre_build_hook:
+        if self.pre_build_hook and not prepared:
             self.pre_build_hook.attach_io(self._io)
+            self.executed_hooks.append(self.pre_build_hook)
             self.pre_build_hook._exec(venv)  # noqa
 
         self.log(f"Building <info>pyinstaller</info> <debug>[{venv_version} {self.platform}]</debug>")
-        self.debug(f"PyInstaller version = {pyinstaller_version}")
+        if pyinstaller_version:
+            self.debug(f"PyInstaller version = {pyinstaller_version}")
 
         self.log(str(self._app.poetry.pyproject_path))
 
+        if self.config.values["precompile"]:
+            self.precompile_bytecode(targets)
+
         if len(self.targets) == 0:
             self.warning("No targets definition found, nothing to build with pyinstaller.")
 
-        for target in self.targets:
-            target.build(self._app.poetry, self)
+        self.build_targets(targets)
+        self.log_work_dir_summary(targets)
+
+        if profile:
+            self.report_profiles(targets)
+
+        if base := utils.get_option(self, "delta-from"):
+            self.create_delta(targets, Path(base))
 
         if self.post_build_hook:
             self.post_build_hook.attach_io(self._io)
+            self.executed_hooks.append(self.post_build_hook)
             self.post_build_hook._exec(venv)  # noqa
 
+        self.log_hooks_summary()
         return 0
 
+    def get_bundled_wheels(self, output_path: Path) -> Dict[str, List[Target]]:
+        """
+        Wheels found in output path matching 'bundle-wheels' patterns of bundled targets,
+        with targets to bundle in each wheel
+        """
+        targets = list(filter(lambda t: t.bundle and not t.skip, self.targets))
+        wheels: Dict[str, List[Target]] = {}
+        for file in sorted(os.listdir(output_path)):
+            for target in targets:
+                if any(fnmatch.fnmatch(file, pattern) for pattern in target.bundle_wheels):
+                    wheels.setdefault(file, []).append(target)
+        return wheels
+
     def bundle_wheels(self):  # pragma: nocover
-        wheels = []
         output_path = utils.get_output_path(self)
-        for file in os.listdir(output_path):
-            if fnmatch.fnmatch(file, '*-py3-none-any.whl'):
-                wheels.append(file)
-
-        targets = list(filter(lambda t: t.bundle and not t.skip, self.targets))
+        wheels = self.get_bundled_wheels(output_path)
 
-        if len(targets) == 0:
+        if len(wheels) == 0:
             return
 
         self.log("Bundling PyInstaller targets to wheel(s)")
-        for wheel in wheels:
-            for target in targets:
-                target.bundle_to_wheel(output_path, wheel)
+        futures = {}
+        with ProcessPoolExecutor(max_workers=min(len(wheels), os.cpu_count() or 1)) as executor:
+            for wheel, targets in wheels.items():
+                for target in targets:
+                    self.log(f"  - Adding <c1>{target.prog}</c1> to data scripts <debug>{wheel}</debug>")
+                sources = [
+                    path for target in targets
+                    for path in [output_path / "pyinstaller" / self.platform / target.prog,
+                                 *target.wheel_resources(output_path)]
+                ]
+                futures[executor.submit(bundle_wheel, output_path / wheel, sources, self.platform)] = wheel
+
+            results = {wheel: future.result() for future, wheel in futures.items()}
+
+        saved = sum(saved for _, saved in results.values())
+        if saved:
+            self.log(f"Deduplicated <info>{utils.format_size(saved)}</info> of files shared by targets")
+
+        self.log(f"Replacing <info>platform</info> in wheels <b>({self.platform})</b>")
+        for new, _ in results.values():
+            self.log(f"  - {new}")
+
+
+class PyInstallerPrepareCommand(PyInstallerBuildCommand):
+    name = "pyinstaller prepare"
+    description = "Prepare build environments: install dependencies, merge certificates and run pre-build hooks."
+    options = [*PyInstallerBuildCommand.options]
+
+    def handle(self) -> int:  # pragma: nocover
+        poetry = self._app.poetry
+        self.check_config([("", self.config, self.targets)])
+        marker = ReadyMarker.from_poetry(poetry)
+        marker.clear()
+
+        self.log(f"Preparing <info>pyinstaller</info> <debug>[{self.platform}]</debug>")
+        venv = self._create_venv(self.targets)
+        environments = [Path(venv.path)]
+
+        if self.pre_build_hook:
+            self.pre_build_hook.attach_io(self._io)
+            self.executed_hooks.append(self.pre_build_hook)
+            self.pre_build_hook._exec(venv)  # noqa
+
+        for target in self.targets:
+            if target.skip:
+                continue
+            target_venv = venv
+            if get_backend(target.backend).requires_environment:
+                target_venv = Environment(poetry, self._io, target.install_args, config=self.config).get()
+                environments.append(Path(target_venv.path))
+                target._deploy_certificates(poetry, target_venv)  # noqa
+            if hook := self.get_target_hook(target, "pre"):
+                hook._exec(target_venv)  # noqa
+
+        marker.write(self.targets, environments)
+        self.log(f"Prepared <info>{len(set(environments))}</info> environment(s) <debug>({marker.path})</debug>")
+        self.log_hooks_summary()
+        return 0
+
+
+class PyInstallerPlanCommand(PyInstallerBuildCommand):
+    name = "pyinstaller plan"
+    description = "Show what would be built by PyInstaller without building."
+    options = [
+        *PyInstallerBuildCommand.options,
+        option("json", None, "Output build plan as JSON.", flag=True),
+    ]
+
+    def get_cached_steps(self, target: Target, prepared: bool) -> List[str]:
+        """
+        Steps of target build skipped thanks to prepared environments and pre-build hook memo
+        """
+        steps = []
+        if prepared and get_backend(target.backend).requires_environment:
+            steps.extend(["install", "certificates"])
+        if target.pre_build:
+            hook = PreHook.from_spec(self._app, target.pre_build, target=target)
+            if prepared or hook.is_cached():
+                steps.append("pre-build")
+        return steps
+
+    def get_bytecode_plan(self, targets: List[Target]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Modules of build environments precompiled by last build and project sources changed since, when 'precompile'
+        is enabled. Predicted from manifest of last build, environments are never inspected.
+        """
+        if not self.config.values["precompile"]:
+            return None
+        targets = [target for target in targets if not target.skip and target.backend == "pyinstaller"]
+        levels = sorted({0, *(target.optimize_level for target in targets)})
+        plan: Dict[Optional[str], Dict[str, Any]] = {}
+        for target in targets:
+            key, sources = self.get_bytecode_key(target)
+            if key not in plan:
+                precompiled = get_precompiled_modules(self.bytecode_manifest_path, key, levels, sources)
+                plan[key] = precompiled or {"environment": None, "cached": 0, "stale": None}
+        return list(plan.values())
+
+    def get_plan(self) -> Dict[str, Any]:
+        affected = None
+        if ref := utils.get_option(self, "changed-since"):
+            affected = {target.prog for target in self.get_affected_targets(ref)}
+
+        prepared = ReadyMarker.from_poetry(self._app.poetry).is_valid(self.targets)
+        binaries_cache = utils.get_cache_path(self._app.poetry) / "binaries"
+        built = []
+        targets = []
+        for target in self.targets:
+            target.resolve_dist_path(self)
+            skipped = None
+            if target.skip:
+                skipped = f"on {target.when} only"
+            elif affected is not None and target.prog not in affected:
+                skipped = f"not affected since {ref}"
+            else:
+                built.append(target)
+
+            binaries = None
+            if target.post_process_binaries and get_commands(target.platform, target.strip, not target.no_upx):
+                if cached := get_cached_binaries(binaries_cache, target.get_binaries_manifest_path(binaries_cache)):
+                    binaries = {"cached": cached[0], "total": cached[1]}
+
+            targets.append({
+                "name": target.prog,
+                "type": target.type,
+                "bundle": target.bundle,
+                "skipped": skipped,
+                "output": str(target.output_path),
+                "executable": str(target.executable_path),
+                "archive": str(target.archive_path) if target.archive else None,
+                "pre-build": get_hook_spec(target.pre_build)["hook"] if target.pre_build else None,
+                "post-build": get_hook_spec(target.post_build)["hook"] if target.post_build else None,
+                "backend": target.backend,
+                "command": target.build_command,
+                "cached": self.get_cached_steps(target, prepared) if skipped is None else [],
+                "cached-binaries": binaries,
+            })
+
+        pre_build_cached = bool(self.pre_build_hook) and (prepared or self.pre_build_hook.is_cached())
+        return {
+            "platform": self.platform,
+            "pre-build": self.pre_build_hook.name if self.pre_build_hook else None,
+            "post-build": self.post_build_hook.name if self.post_build_hook else None,
+            "prepared": prepared,
+            "cached": ["pre-build"] if pre_build_cached else [],
+            "bytecode": self.get_bytecode_plan(built),
+            "targets": targets,
+        }
+
+    def handle(self) -> int:
+        plan = self.get_plan()
+
+        if self.option("json"):
+            self._io.write_line(json.dumps(plan, indent=2), type=OutputType.RAW)
+            return 0
+
+        self.log(f"Plan <info>pyinstaller</info> <debug>[{plan['platform']}]</debug>")
+        if plan["prepared"]:
+            self.log("  - environments prepared by <c1>poetry pyinstaller prepare</c1> "
+                     "<debug>(install, certificates & pre-build hooks skipped)</debug>")
+        if plan["pre-build"]:
+            cached = " <debug>(cached)</debug>" if "pre-build" in plan["cached"] else ""
+            self.log(f"  - pre-build hook <c1>{plan['pre-build']}</c1>{cached}")
+        for environment in plan["bytecode"] or []:
+            if environment["environment"] is None:
+                self.log("  - bytecode: not precompiled yet, all modules to compile")
+                continue
+            self.log(f"  - bytecode: <info>{environment['cached']}</info> module(s) cached, "
+                     f"{environment['stale']} project source(s) changed <debug>({environment['environment']})</debug>")
+
+        for target in plan["targets"]:
+            if target["skipped"]:
+                self.log(f"  - <c1>{target['name']}</c1> <warning>skipped ({target['skipped']})</warning>")
+                continue
+            self.log(f"  - <c1>{target['name']}</c1> <debug>({target['type']})</debug>")
+            self.log(f"      output:  {target['output']}")
+            if target["archive"]:
+                self.log(f"      archive: {target['archive']}")
+            if target["pre-build"]:
+                self.log(f"      pre-build hook:  <c1>{target['pre-build']}</c1>")
+            self.log(f"      command: {' '.join(target['command'])}")
+            cached = [f"{step} hook" if step == "pre-build" else step for step in target["cached"]]
+            if binaries := target["cached-binaries"]:
+                cached.append(f"{binaries['cached']}/{binaries['total']} binaries")
+            if cached:
+                self.log(f"      cached:  {', '.join(cached)}")
+            if target["post-build"]:
+                self.log(f"      post-build hook: <c1>{target['post-build']}</c1>")
+
+        if plan["post-build"]:
+            self.log(f"  - post-build hook <c1>{plan['post-build']}</c1>")
+
+        return 0
+
+
+class PyInstallerConfigCommand(PyInstallerBuildCommand):
+    name = "pyinstaller config"
+    description = "Validate plugin configuration and show effective options of each target."
+    options = [
+        *PyInstallerBuildCommand.options,
+        option("json", None, "Output effective configuration as JSON.", flag=True),
+    ]
+
+    def _load_targets(self) -> List[Target]:
+        # Invalid configuration is reported by 'handle' instead of failing command creation
+        if self.config.get_problems(paths=False):
+            return []
+        return super()._load_targets()
+
+    def get_config(self) -> Dict[str, Any]:
+        skipped = [target.name for target in self.targets if target.skip]
+        return {
+            "project": str(self._app.poetry.pyproject_path),
+            "plugin": {name: value for name, value in self.config.values.items() if name != "targets"},
+            "targets": [
+                {**config.to_dict(), "skipped": name in skipped} for name, config in self.config.targets.items()
+            ],
+            "warnings": self.config.warnings,
+            "errors": self.config.get_problems(skipped),
+        }
 
-        if len(wheels) > 0:
-            self.log(f"Replacing <info>platform</info> in wheels <b>({self.platform})</b>")
-            for wheel in wheels:
-                new = wheel.replace("-any.whl", f"-{self.platform}.whl")
-                os.replace(output_path / wheel, output_path / new)
-                self.log(f"  - {new}")
+    def handle(self) -> int:
+        config = self.get_config()
+
+        if self.option("json"):
+            self._io.write_line(json.dumps(config, indent=2), type=OutputType.RAW)
+            return 1 if config["errors"] else 0
+
+        self.log(f"Configuration <info>pyinstaller</info> <debug>({config['project']})</debug>")
+        for name, value in config["plugin"].items():
+            if value is not None:
+                self.log(f"  {name} = {json.dumps(value)}")
+
+        for target in config["targets"]:
+            skipped = " <warning>(skipped on this version)</warning>" if target["skipped"] else ""
+            self.log(f"  - <c1>{target['name']}</c1>{skipped}")
+            for name, value in target["options"].items():
+                if value is not None:
+                    self.log(f"      {name} = {json.dumps(value)} <debug>({target['origins'][name]})</debug>")
+
+        for warning in config["warnings"]:
+            self.warning(f"Warning: {warning}")
+
+        if config["errors"]:
+            for error in config["errors"]:
+                self.error(error)
+            self.error(f"Invalid configuration, {len(config['errors'])} problem(s) found.")
+            return 1
+
+        self.log(f"Configuration valid, <info>{len(config['targets'])}</info> target(s)")
+        return 0
+
+
+class PyInstallerProfileImportsCommand(PyInstallerBuildCommand):
+    name = "pyinstaller profile-imports"
+    description = "Profile module imports at startup of a PyInstaller target."
+    arguments = [argument("target", "Name of the target to profile.")]
+    options = [
+        *PyInstallerBuildCommand.options,
+        option("build", None, "Build a profiling variant of the target with '-X importtime' first.", flag=True),
+        option("args", None, "Arguments given to executable (smoke test arguments by default).", flag=False),
+        option("input", None, "Read '-X importtime' output from file instead of running executable.", flag=False),
+        option("limit", None, "Number of modules to rank.", flag=False, default="20"),
+        option("depth", None, "Depth of displayed import tree.", flag=False, default="2"),
+        option("json", None, "Output import profile as JSON.", flag=True),
+    ]
+
+    def get_target(self, name: str) -> Target:
+        for target in self.targets:
+            if name in (target.name, target.prog):
+                return target
+        raise ValueError(f"ValueError: Unknown target '{name}', not in {[t.name for t in self.targets]}.")
+
+    def get_profile(self, target: Target, output: str) -> Dict[str, Any]:
+        roots = parse_importtime(output)
+        if not roots:
+            raise RuntimeError(
+                f"No import time found in output of {target.prog}, frozen executables ignore PYTHON* environment "
+                f"variables: use '--build' or add 'X importtime' to target's 'python-options'."
+            )
+
+        hidden_imports = target.hidden_import or []
+        if isinstance(hidden_imports, str):
+            hidden_imports = [hidden_imports]
+        collected = [module for modules in target.collect_config.values() for module in modules]
+        graph = ImportGraph.from_poetry(self._app.poetry)
+        graph.update()
+
+        limit = int(self.option("limit"))
+
+        def entry(node: ImportNode) -> Dict[str, Any]:
+            return {"name": node.name, "self": node.self_us, "cumulative": node.cumulative_us}
+
+        return {
+            "target": target.prog,
+            "modules": sum(1 for _ in iter_nodes(roots)),
+            "total": sum(root.cumulative_us for root in roots),
+            "cumulative": [entry(node) for node in rank(roots, limit)],
+            "self": [entry(node) for node in rank(roots, limit, key="self_us")],
+            "config-only": [
+                entry(node) for node in
+                get_config_only_modules(roots, graph.closure(target.source), hidden_imports, collected)
+            ],
+            "tree": [root.to_dict() for root in roots],
+        }
+
+    def _run(self, target: Target) -> str:  # pragma: nocover
+        if path := self.option("input"):
+            return Path(path).read_text()
+
+        if self.option("build"):
+            target.python_options.append("X importtime")
+            self._create_venv([target])
+            target.build(self._app.poetry, self, install=False, dist_path=target.work_path / "profile-imports")
+        else:
+            target.resolve_dist_path(self)
+
+        if not target.executable_path.exists():
+            raise RuntimeError(f"{target.executable_path} not found, build target first or use '--build'.")
+
+        if args := self.option("args"):
+            args = shlex.split(args)
+        else:
+            args = target.smoke.args if target.smoke else []
+        return run_importtime(target.executable_path, args)
+
+    def _log_tree(self, nodes: List[Dict[str, Any]], total: int, depth: int, level: int = 1) -> None:
+        for node in sorted(nodes, key=lambda n: n["cumulative"], reverse=True):
+            # Hide modules below 1% of total import time
+            if node["cumulative"] * 100 < total:
+                continue
+            self.log(f"{'  ' * level}- {node['name']} <debug>{node['cumulative'] / 1000:.1f} ms</debug>")
+            if level < depth:
+                self._log_tree(node["children"], total, depth, level + 1)
+
+    def handle(self) -> int:
+        try:
+            profile = self.get_profile(target := self.get_target(self.argument("target")), self._run(target))
+        except (ValueError, RuntimeError) as exc:
+            self.error(str(exc))
+            return 1
+
+        if self.option("json"):
+            self._io.write_line(json.dumps(profile, indent=2), type=OutputType.RAW)
+            return 0
+
+        self.log(f"Import profile of <c1>{profile['target']}</c1> "
+                 f"<debug>({profile['modules']} modules, {profile['total'] / 1000:.1f} ms)</debug>")
+
+        self.log("Slowest imports <debug>(cumulative / self)</debug>")
+        for node in profile["cumulative"]:
+            self.log(f"  {node['cumulative'] / 1000:8.1f} ms {node['self'] / 1000:8.1f} ms  {node['name']}")
+
+        self.log("Import tree")
+        self._log_tree(profile["tree"], profile["total"], int(self.option("depth")))
+
+        if profile["config-only"]:
+            self.log("Imported through <info>hidden-import</info>/<info>collect</info> only")
+            for node in profile["config-only"]:
+                self.log(f"  - {node['name']} <debug>{node['cumulative'] / 1000:.1f} ms</debug>")
+
+        return 0
+
+
+class PyInstallerWatchCommand(PyInstallerBuildCommand):
+    name = "pyinstaller watch"
+    description = "Watch sources and rebuild affected PyInstaller targets on change."
+    options = [
+        *PyInstallerBuildCommand.options,
+        option("debounce", None, "Quiet period in seconds before starting a rebuild.", flag=False, default="0.5"),
+        option("poll", None, "Use polling instead of inotify to detect changes.", flag=True),
+    ]
+    watcher: Optional[_Watcher] = None
+
+    @property
+    def project_files(self) -> List[Path]:
+        project_path = self._app.poetry.pyproject_path.parent
+        return [self._app.poetry.pyproject_path.resolve(), (project_path / "poetry.lock").resolve()]
+
+    @property
+    def watch_paths(self) -> Set[Path]:
+        packages = [path.resolve() for path in utils.get_base_modules_path(self._app.poetry)]
+        return {*self.project_files, *packages, *[p for t in self.targets for p in t.watch_paths]}
+
+    def _rebuild(self, targets: List[Target]) -> None:  # pragma: nocover
+        def build(target: Target) -> None:
+            target.clean = False
+            try:
+                target.build(self._app.poetry, self, install=False)
+            except Exception as exc:
+                self.error(f"Failed to build {target.prog}: {exc}")
+
+        try:
+            self.build_targets(targets, build)
+        except Exception as exc:
+            self.error(f"Failed to process built targets: {exc}")
+
+    def _watch(self) -> None:
+        """
+        Watch project files, packages and paths of current targets. A previous watcher is replaced,
+        detection time of changes it reported is kept.
+        """
+        watcher = create_watcher(self.watch_paths, polling=self.option("poll"))
+        if self.watcher is not None:
+            watcher.detected_at = self.watcher.detected_at
+            self.watcher.close()
+        self.watcher = watcher
+
+    def _reload(self) -> None:
+        self._app.reset_poetry()
+        self.config = PluginConfig.from_poetry(self._app.poetry)
+        self.targets = self._load_targets()
+        self.check_config([("", self.config, self.targets)])
+        # Sources, includes or packages of reloaded targets may have changed
+        self._watch()
+
+    def handle(self) -> int:  # pragma: nocover
+        self.check_config([("", self.config, self.targets)])
+        self._create_venv(self.targets)
+        self._rebuild(self.targets)
+
+        self._watch()
+        paths = len(self.watcher.roots) + len(self.watcher.files)
+        self.log(f"Watching <c1>{paths}</c1> path(s) for changes <debug>({type(self.watcher).__name__})</debug>")
+
+        try:
+            while True:
+                changes = self.watcher.wait(float(self.option("debounce")))
+                started = time.monotonic()
+                for change in sorted(changes):
+                    self.debug(f"changed: {change}")
+
+                if changes & set(self.project_files):
+                    self.log("Project configuration changed, reloading targets")
+                    try:
+                        self._reload()
+                    except ConfigError as error:
+                        self.error(str(error))
+                        continue
+                    self._create_venv(self.targets)
+                    targets = self.targets
+                else:
+                    targets = get_affected_targets(self._app.poetry, self.targets, changes)
+
+                self._rebuild(targets)
+                self.log(f"Rebuilt <info>{len(targets)}</info> target(s) in "
+                         f"<b>{time.monotonic() - started:.2f}s</b> "
+                         f"<debug>(latency {time.monotonic() - self.watcher.detected_at:.2f}s)</debug>")
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            self.watcher.close()
 
 
 class PyInstallerPlugin(ApplicationPlugin):
@@ -140,8 +1116,28 @@ class PyInstallerPlugin(ApplicationPlugin):
         def show_command_factory():
             return PyInstallerShowCommand()
 
+        def prepare_command_factory():
+            return PyInstallerPrepareCommand(self._app)
+
+        def plan_command_factory():
+            return PyInstallerPlanCommand(self._app)
+
+        def watch_command_factory():
+            return PyInstallerWatchCommand(self._app)
+
+        def profile_imports_command_factory():
+            return PyInstallerProfileImportsCommand(self._app)
+
+        def config_command_factory():
+            return PyInstallerConfigCommand(self._app)
+
         application.command_loader.register_factory("pyinstaller build", build_command_factory)
         application.command_loader.register_factory("pyinstaller show", show_command_factory)
+        application.command_loader.register_factory("pyinstaller prepare", prepare_command_factory)
+        application.command_loader.register_factory("pyinstaller plan", plan_command_factory)
+        application.command_loader.register_factory("pyinstaller watch", watch_command_factory)
+        application.command_loader.register_factory("pyinstaller profile-imports", profile_imports_command_factory)
+        application.command_loader.register_factory("pyinstaller config", config_command_factory)
 
         application.event_dispatcher.add_listener(COMMAND, self.on_build_command)
         application.event_dispatcher.add_listener(TERMINATE, self.on_terminate)
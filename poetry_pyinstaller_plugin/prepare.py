@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from poetry.poetry import Poetry
+
+from poetry_pyinstaller_plugin import utils
+
+if TYPE_CHECKING:  # pragma: nocover
+    from poetry_pyinstaller_plugin.target import Target
+
+MARKER_VERSION = 1
+
+
+class ReadyMarker:
+    """
+    Written by 'poetry pyinstaller prepare' once environments are installed, certificates merged and
+    pre-build hooks executed. Valid while lock file, pyproject.toml and certificates are unchanged.
+    """
+    poetry: Poetry
+    path: Path
+
+    def __init__(self, poetry: Poetry, path: Path):
+        self.poetry = poetry
+        self.path = path
+
+    @classmethod
+    def from_poetry(cls, poetry: Poetry) -> ReadyMarker:
+        return cls(poetry, utils.get_cache_path(poetry) / f"ready-{utils.get_platform(poetry)}.json")
+
+    def fingerprint(self, targets: Sequence[Target]) -> str:
+        root = self.poetry.pyproject_path.parent
+        digest = hashlib.sha256(f"{MARKER_VERSION} {utils.get_platform(self.poetry)}".encode())
+
+        for path in [root / "poetry.lock", self.poetry.pyproject_path]:
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes() if path.exists() else b"missing")
+
+        for target in targets:
+            digest.update(f"{target.name} {' '.join(target.install_args)}".encode())
+            for certificate in target.certificates:
+                path = root / certificate
+                digest.update(certificate.encode())
+                digest.update(path.read_bytes() if path.exists() else b"missing")
+
+        return digest.hexdigest()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != MARKER_VERSION:
+            return None
+        return data
+
+    def is_valid(self, targets: Sequence[Target]) -> bool:
+        """
+        Marker matches current lock fingerprint and prepared environments still exist
+        """
+        if (data := self.load()) is None or data.get("fingerprint") != self.fingerprint(targets):
+            return False
+        return all((Path(env) / "pyvenv.cfg").exists() for env in data.get("environments", []))
+
+    def write(self, targets: Sequence[Target], environments: List[Path]) -> None:
+        data = {
+            "version": MARKER_VERSION,
+            "fingerprint": self.fingerprint(targets),
+            "environments": sorted({str(env) for env in environments}),
+            "targets": [target.name for target in targets],
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path.exists():
+            self.path.unlink()
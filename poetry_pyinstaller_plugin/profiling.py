@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import os
+import pstats
+import textwrap
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Run PyInstaller in-process under cProfile, peak RSS of the process itself is reported
+# as PyInstaller is no longer a child process
+PROFILE_WRAPPER = textwrap.dedent("""
+import cProfile, sys
+from PyInstaller.__main__ import run
+profiler = cProfile.Profile()
+code = 0
+try:
+    profiler.runcall(run, sys.argv[3:])
+except SystemExit as exc:
+    code = exc.code
+finally:
+    profiler.dump_stats(sys.argv[2])
+try:
+    import resource
+except ImportError:
+    sys.exit(code)
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with open(sys.argv[1], "w") as f:
+    f.write(str(rss if sys.platform == "darwin" else rss * 1024))
+sys.exit(code)
+""")
+
+
+def _get_stats(path: Path) -> Dict[Any, Any]:
+    return pstats.Stats(str(path)).stats  # noqa
+
+
+def get_hotspots(path: Path, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Functions with highest cumulative time, entry points of wrapper itself are left aside
+    """
+    hotspots = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in _get_stats(path).items():
+        if filename in ("<string>", "~") or (function == "run" and filename.endswith("__main__.py")):
+            continue
+        hotspots.append({
+            "function": function,
+            "location": f"{Path(filename).name}:{line}",
+            "calls": calls,
+            "total": total,
+            "cumulative": cumulative,
+        })
+    return sorted(hotspots, key=lambda h: h["cumulative"], reverse=True)[:limit]
+
+
+def get_hook_timings(path: Path, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Time spent in PyInstaller hook modules ('hook-<module>.py'), module level code and 'hook()' function
+    """
+    hooks: Dict[str, Dict[str, Any]] = {}
+    for (filename, _, function), (_, calls, _, cumulative, _) in _get_stats(path).items():
+        name = os.path.basename(filename)
+        if not (name.startswith("hook-") and name.endswith(".py")) or function not in ("<module>", "hook"):
+            continue
+        hook = hooks.setdefault(filename, {"hook": name[len("hook-"):-len(".py")], "path": filename, "time": 0.0})
+        hook["time"] += cumulative
+    return sorted(hooks.values(), key=lambda h: h["time"], reverse=True)[:limit]
@@ -0,0 +1,146 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import glob
+import json
+import os
+import shutil
+import struct
+from pathlib import Path
+from typing import Dict
+
+RESOURCES_MODES = ["files", "pack"]
+
+# Header of resource packs: magic, size of JSON index, offset of data. Index maps logical names to
+# '[offset, size]' relative to data offset, data of each resource starts on a page boundary.
+PACK_MAGIC = b"PYIRPACK"
+PACK_HEADER = struct.Struct("<8sQQ")
+PACK_ALIGNMENT = 4096
+
+# Runtime hook registering 'pyinstaller_resources' module: resources shipped next to executable are
+# listed and memory-mapped on first access, nothing is read at startup
+RUNTIME_HOOK = """
+import os
+import sys
+import types
+
+
+def _install(location, packed):
+    module = types.ModuleType("pyinstaller_resources", "Resources shipped next to executable, by logical name")
+    views = {}
+    state = {}
+
+    def _pack():
+        if "index" not in state:
+            import json
+            import mmap
+            import struct
+            header = struct.Struct("<8sQQ")
+            with open(location, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(data) < header.size or header.unpack_from(data)[0] != b"PYIRPACK":
+                raise RuntimeError(f"Invalid resource pack {location}")
+            _, size, offset = header.unpack_from(data)
+            state["data"], state["offset"] = memoryview(data), offset
+            state["index"] = json.loads(bytes(data[header.size:header.size + size]))
+        return state["index"]
+
+    def names():
+        if packed:
+            return sorted(_pack())
+        return sorted(
+            os.path.relpath(os.path.join(root, file), location).replace(os.sep, "/")
+            for root, _, files in os.walk(location) for file in files
+        )
+
+    def path(name):
+        if packed or ".." in name.split("/"):
+            raise KeyError(name)
+        file = os.path.join(location, *name.split("/"))
+        if not os.path.isfile(file):
+            raise KeyError(name)
+        return file
+
+    def get(name):
+        if name not in views:
+            if packed:
+                if name not in _pack():
+                    raise KeyError(name)
+                start, size = state["index"][name]
+                views[name] = state["data"][state["offset"] + start:state["offset"] + start + size]
+            else:
+                import mmap
+                with open(path(name), "rb") as file:
+                    size = os.fstat(file.fileno()).st_size
+                    views[name] = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b"")
+        return views[name]
+
+    module.location, module.names, module.path, module.get = location, names, path, get
+    sys.modules[module.__name__] = module
+"""
+
+
+def collect_resources(root: Path, config: Dict[str, str]) -> Dict[str, Path]:
+    """
+    Files of 'resources' entries by logical name. Like 'include', sources are files, folders or glob patterns
+    relative to root, copied under destination folder: logical name is '<destination>/<path in source>'.
+    """
+    resources: Dict[str, Path] = {}
+    for source, destination in config.items():
+        prefix = "" if destination in ("", ".") else destination.strip("/") + "/"
+        for match in sorted(glob.glob(str(root / source), recursive=True)):
+            match = Path(match)
+            files = [match] if match.is_file() else sorted(p for p in match.rglob("*") if p.is_file())
+            for file in files:
+                name = prefix + (file.name if file == match else file.relative_to(match).as_posix())
+                if name in resources and resources[name] != file:
+                    raise ValueError(f"ValueError: Resource '{name}' provided by both {resources[name]} and {file}.")
+                resources[name] = file
+    return dict(sorted(resources.items()))
+
+
+def copy_resources(resources: Dict[str, Path], destination: Path) -> int:
+    """
+    Copy resources to folder by logical name, return total size
+    """
+    size = 0
+    for name, source in resources.items():
+        path = destination / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, path)
+        size += path.stat().st_size
+    return size
+
+
+def write_pack(resources: Dict[str, Path], destination: Path) -> int:
+    """
+    Write resources to a single pack with an index of their offsets, return size of pack
+    """
+    index, position = {}, 0
+    for name, source in resources.items():
+        size = source.stat().st_size
+        index[name] = [position, size]
+        position += -(-size // PACK_ALIGNMENT) * PACK_ALIGNMENT
+
+    encoded = json.dumps(index, separators=(",", ":")).encode()
+    offset = -(-(PACK_HEADER.size + len(encoded)) // PACK_ALIGNMENT) * PACK_ALIGNMENT
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with open(destination, "wb") as pack:
+        pack.write(PACK_HEADER.pack(PACK_MAGIC, len(encoded), offset))
+        pack.write(encoded)
+        for name, source in resources.items():
+            pack.seek(offset + index[name][0])
+            with open(source, "rb") as file:
+                shutil.copyfileobj(file, pack, 1024 ** 2)
+        pack.truncate(offset + position)
+    return os.path.getsize(destination)
+
+
+def get_runtime_hook(name: str, packed: bool) -> str:
+    """
+    Source of runtime hook giving access to resources at '<executable folder>/<name>'
+    """
+    return f"{RUNTIME_HOOK}\n\n_install(os.path.join(os.path.dirname(sys.executable), {name!r}), {packed!r})\n"
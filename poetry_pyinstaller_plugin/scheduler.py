@@ -0,0 +1,191 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from cleo.io.io import IO
+from poetry.poetry import Poetry
+
+from poetry_pyinstaller_plugin import utils
+from poetry_pyinstaller_plugin.config import PluginConfig
+
+if TYPE_CHECKING:  # pragma: nocover
+    from poetry_pyinstaller_plugin.target import Target
+
+# Static estimates for targets never built before
+DEFAULT_DURATION = 60.0
+DEFAULT_PEAK_RSS = 1024 ** 3
+
+
+class BuildHistory:
+    """
+    Duration and peak memory usage of previous target builds, stored in build cache
+    """
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    @classmethod
+    def from_poetry(cls, poetry: Poetry) -> BuildHistory:
+        return cls(utils.get_cache_path(poetry) / "build-history.json")
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except ValueError:
+            return
+        if data.get("version") == self.VERSION:
+            self.entries = data.get("targets", {})
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": self.VERSION, "targets": self.entries}, indent=2))
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def key(target: Target) -> str:
+        # Targets of workspace projects may share names
+        if target.workspace is not None:
+            return f"{target.platform}/{target.workspace}/{target.name}"
+        return f"{target.platform}/{target.name}"
+
+    def record(self, target: Target) -> None:
+        if target.duration is None:
+            return
+        entry = self.entries.setdefault(self.key(target), {})
+        entry["duration"] = round(target.duration, 3)
+        if target.peak_rss:
+            entry["peak-rss"] = target.peak_rss
+        if target.work_size:
+            entry["work-size"] = target.work_size
+        # Reference to estimate I/O time saved by builds in 'work-dir'
+        if target.work_dir is not None and target.work_dir_used is None:
+            entry["disk-duration"] = entry["duration"]
+
+    def estimate(self, target: Target) -> Tuple[float, int]:
+        """
+        Predicted duration (seconds) and peak RSS (bytes) of target build
+        """
+        entry = self.entries.get(self.key(target), {})
+        return entry.get("duration", DEFAULT_DURATION), entry.get("peak-rss", DEFAULT_PEAK_RSS)
+
+    def estimate_work_size(self, target: Target) -> Optional[int]:
+        """
+        Size of PyInstaller intermediates of previous target build, when measured
+        """
+        return self.entries.get(self.key(target), {}).get("work-size")
+
+    def disk_duration(self, target: Target) -> Optional[float]:
+        """
+        Duration of last target build with intermediates on disk
+        """
+        return self.entries.get(self.key(target), {}).get("disk-duration")
+
+
+class Scheduler(utils.LoggingMixin):
+    """
+    Build targets longest-first, running builds concurrently while predicted memory usage
+    fits within memory limit. Targets are built one at a time when no limit is set.
+    """
+    history: BuildHistory
+    memory_limit: Optional[int]
+    jobs: int
+
+    def __init__(self, io: IO, history: BuildHistory, memory_limit: Optional[int] = None,
+                 jobs: Optional[int] = None, **kwargs):
+        super().__init__(io, **kwargs)
+        self.history = history
+        self.memory_limit = memory_limit
+        self.jobs = 1 if memory_limit is None else (jobs or os.cpu_count() or 1)
+
+    @classmethod
+    def from_poetry(cls, poetry: Poetry, io: IO, config: Optional[PluginConfig] = None) -> Scheduler:
+        if config is None:
+            config = PluginConfig.from_poetry(poetry)
+        memory_limit = config.values["memory-limit"]
+        if memory_limit is not None:
+            memory_limit = utils.parse_size(memory_limit)
+        return cls(io, BuildHistory.from_poetry(poetry), memory_limit)
+
+    def order(self, targets: List[Target]) -> List[Target]:
+        return sorted(targets, key=lambda target: self.history.estimate(target)[0], reverse=True)
+
+    def run(self, targets: List[Target], build: Callable[[Target], None]) -> None:
+        """
+        Build all targets, first error is raised once running builds are over
+        """
+        try:
+            if self.jobs == 1:
+                for target in self.order(targets):
+                    self._build(target, build)
+            else:
+                self._run_concurrently(targets, build)
+        finally:
+            self.history.save()
+
+    def _run_concurrently(self, targets: List[Target], build: Callable[[Target], None]) -> None:
+        pending = self.order(targets)
+        running: Dict[Future, Target] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                if error is None:
+                    self._admit(pending, running, lambda target: executor.submit(self._build, target, build))
+                else:
+                    pending.clear()
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    if (exc := future.exception()) is not None and error is None:
+                        error = exc
+
+        if error is not None:
+            raise error
+
+    def _admit(self, pending: List[Target], running: Dict[Future, Target],
+               submit: Callable[[Target], Future]) -> None:
+        used = sum(self.history.estimate(target)[1] for target in running.values())
+        index = 0
+        while index < len(pending) and len(running) < self.jobs:
+            target = pending[index]
+            memory = self.history.estimate(target)[1]
+            if running and used + memory > self.memory_limit:
+                index += 1
+                continue
+            if memory > self.memory_limit:
+                self.warning(f"Predicted memory usage of {target.prog} ({utils.format_size(memory)}) "
+                             f"exceeds memory limit, building it alone")
+            self.debug(f"scheduling {target.prog} (predicted {utils.format_size(memory)}, "
+                       f"{utils.format_size(used + memory)} in use)")
+            running[submit(pending.pop(index))] = target
+            used += memory
+
+    def _build(self, target: Target, build: Callable[[Target], None]) -> None:
+        target.work_size_estimate = self.history.estimate_work_size(target)
+        build(target)
+        if target.work_dir_used is not None and target.duration is not None:
+            if (disk_duration := self.history.disk_duration(target)) is not None:
+                target.io_saved = disk_duration - target.duration
+        self.history.record(target)
+        if target.duration is not None:
+            peak = f", peak {utils.format_size(target.peak_rss)}" if target.peak_rss else ""
+            self.debug(f"{target.prog} built in {target.duration:.1f}s{peak}")
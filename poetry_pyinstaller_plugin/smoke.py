@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import dataclasses
+import statistics
+import subprocess
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+@dataclasses.dataclass
+class SmokeConfig:
+    args: List[str] = dataclasses.field(default_factory=list)
+    exit_code: int = 0
+    timeout: float = 30.0
+    runs: int = 3
+    budget: Optional[float] = None
+    cold_budget: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Union[bool, Dict[str, Any]]) -> Optional[SmokeConfig]:
+        if not config:
+            return None
+        if config is True:
+            return cls()
+        fields = {field.name.replace("_", "-"): field.name for field in dataclasses.fields(cls)}
+        unknown = set(config) - set(fields)
+        if unknown:
+            raise ValueError(f"ValueError: Unsupported smoke test option(s) {sorted(unknown)}, not in {list(fields)}.")
+        return cls(**{fields[key]: value for key, value in config.items()})
+
+
+@dataclasses.dataclass
+class SmokeResult:
+    exit_code: int
+    output: str
+    timings: List[float]
+
+    @property
+    def cold(self) -> float:
+        return self.timings[0]
+
+    @property
+    def warm(self) -> Optional[float]:
+        """
+        Median duration of runs following first one
+        """
+        if len(self.timings) < 2:
+            return None
+        return statistics.median(self.timings[1:])
+
+
+def run_smoke_test(executable: Path, config: SmokeConfig) -> SmokeResult:
+    """
+    Run executable several times, first run is cold (files not yet in cache, 'onefile' unpacked), next
+    ones are warm. Stop at first run returning unexpected exit code.
+    """
+    timings = []
+    out = None
+    for _ in range(max(config.runs, 1)):
+        start = time.perf_counter()
+        try:
+            out = subprocess.run([str(executable), *map(str, config.args)], capture_output=True, text=True,
+                                 timeout=config.timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Smoke test of {executable.name} timed out after {config.timeout}s")
+        timings.append(time.perf_counter() - start)
+        if out.returncode != config.exit_code:
+            break
+    return SmokeResult(out.returncode, out.stdout + out.stderr, timings)
+
+
+def check_smoke_result(name: str, config: SmokeConfig, result: SmokeResult) -> None:
+    if result.exit_code != config.exit_code:
+        raise RuntimeError(
+            f"Smoke test of {name} exited with code {result.exit_code} (expected {config.exit_code}):\n"
+            f"{result.output.strip()}"
+        )
+    if config.cold_budget is not None and result.cold > config.cold_budget:
+        raise RuntimeError(f"Cold startup of {name} took {result.cold:.3f}s, over budget of {config.cold_budget}s")
+    latency = result.warm if result.warm is not None else result.cold
+    if config.budget is not None and latency > config.budget:
+        raise RuntimeError(f"Startup of {name} took {latency:.3f}s, over budget of {config.budget}s")
@@ -1,39 +1,82 @@
 # SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
 # SPDX-License-Identifier: MIT
 
+import contextlib
 import dataclasses
 import logging
 import os
+import tempfile
 import textwrap
-import zipfile
-from errno import EEXIST, EINVAL, ENOTDIR
+import time
 from pathlib import Path
-from shutil import copy, copytree, rmtree
-from typing import Any, Dict, List, Optional, Union
+from shutil import copy, copytree, disk_usage, rmtree
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 import tomlkit
 from cleo.io.io import IO
 from poetry.console.commands.build import BuildCommand
 from poetry.core.version.pep440 import PEP440Version
 from poetry.poetry import Poetry
-from poetry.utils.env import Env, EnvManager
-from tomlkit import TOMLDocument
+from poetry.utils.env import Env
 
 from poetry_pyinstaller_plugin import utils
+from poetry_pyinstaller_plugin.archive import create_archive
+from poetry_pyinstaller_plugin.backends import Backend, get_backend
+from poetry_pyinstaller_plugin.binaries import get_commands, optimize_binaries
+from poetry_pyinstaller_plugin.bytecode import CODE_CACHE_SCRIPT, PYINSTALLER_SCRIPT
+from poetry_pyinstaller_plugin.config import PluginConfig, TargetConfig
+from poetry_pyinstaller_plugin.environment import (Environment,
+                                                   get_install_args,
+                                                   get_install_command)
+from poetry_pyinstaller_plugin.events import EventStream
+from poetry_pyinstaller_plugin.locking import FileLock, publish
+from poetry_pyinstaller_plugin.profiling import PROFILE_WRAPPER
+from poetry_pyinstaller_plugin.resources import (collect_resources,
+                                                 copy_resources,
+                                                 get_runtime_hook, write_pack)
+from poetry_pyinstaller_plugin.smoke import (SmokeConfig, SmokeResult,
+                                             check_smoke_result,
+                                             run_smoke_test)
+
+# Run command given after output path, then write peak RSS (in bytes) to output path. RUSAGE_CHILDREN reports the
+# largest RSS of a single waited-for descendant, not the sum of processes running at the same time
+PEAK_RSS_WRAPPER = textwrap.dedent("""
+import subprocess, sys
+code = subprocess.call(sys.argv[2:])
+try:
+    import resource
+except ImportError:
+    sys.exit(code)
+rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+with open(sys.argv[1], "w") as f:
+    f.write(str(rss if sys.platform == "darwin" else rss * 1024))
+sys.exit(code)
+""")
+
+
+# Space required in 'work-dir' by targets never built there, and free space left by a build failing for lack of space
+DEFAULT_WORK_SIZE = 1024 ** 3
+WORK_DIR_FULL = 64 * 1024 ** 2
 
 
 @dataclasses.dataclass(init=False)
 class Target(utils.LoggingMixin):
+    name: str
     package_version: PEP440Version
+    project_path: Path
     dist_path: Path
     work_path: Path
     platform: str
     prog: str
     source: Path
     type: str
+    backend: str
     bundle: bool
+    bundle_wheels: List[str]
     strip: bool
     no_upx: bool
+    optimize_binaries: bool
+    upx_exclude: List[str]
     console: bool
     windowed: bool
     icon: Optional[str]
@@ -43,65 +86,110 @@ class Target(utils.LoggingMixin):
     arch: Optional[str]
     hidden_import: Union[str, List[str]]
     when: Optional[str]
+    archive: Optional[str]
+    contents_directory: Optional[str]
     add_version: bool
     certificates: List[str]
     collect_config: Dict[str, List[str]]
     exclude_poetry_include: bool
     include_config: Dict[str, List[str]]
     runtime_hooks: List[str]
+    python_options: List[str]
     copy_metadata_config: List[str]
     recursive_copy_metadata_config: List[str]
     package_config: Dict[str, str]
-
-    def __init__(self, prog: str, poetry: Poetry, io: IO, **kwargs):
+    resources_config: Dict[str, str]
+    resources_mode: str
+    groups: Optional[List[str]]
+    extras: Optional[List[str]]
+    clean: bool
+    profile: bool
+    prepared: bool
+    precompiled: bool
+    workspace: Optional[str]
+    scratch_path: Optional[Path]
+    work_dir: Optional[str]
+    work_dir_size: Optional[int]
+    external_work_path: Optional[Path]
+    work_dir_used: Optional[Path]
+    work_size: Optional[int]
+    work_size_estimate: Optional[int]
+    io_saved: Optional[float]
+    smoke: Optional[SmokeConfig]
+    config: TargetConfig
+    events: Optional[EventStream]
+    pre_build: Optional[str]
+    post_build: Optional[str]
+    duration: Optional[float]
+    peak_rss: Optional[int]
+
+    def __init__(self, prog: str, poetry: Poetry, io: IO, config: Optional[TargetConfig] = None, **kwargs):
         super().__init__(io, **kwargs)
         self._global_config = utils.PyProjectConfig(poetry.pyproject.data)
-        self._plugin_config = self._global_config.get_section("tool.poetry-pyinstaller-plugin")
-        self._target_config = self._global_config.get_section(f"tool.poetry-pyinstaller-plugin.targets.{prog}")
 
-        # When target specified by '<target> = "script.py"'
-        if not isinstance(self._target_config.data, dict):
-            self._target_config.data = TOMLDocument().add("source", self._target_config.data)
+        # Options compiled & checked once by commands for all targets, compiled from pyproject otherwise
+        if config is None:
+            plugin_config = PluginConfig.from_poetry(poetry)
+            plugin_config.check(paths=False)
+            config = plugin_config.targets[prog]
+        self.config = config
 
+        self.name = prog
         self.prog = prog
-        self.source = (poetry.pyproject_path.parent / self.lookup("source", None)).resolve()
+        self.project_path = poetry.pyproject_path.parent
+        self.source = (self.project_path / config.get("source")).resolve()
         self.platform = utils.get_platform(poetry)
         self.package_version = self._get_package_version(poetry)
-        self.work_path = (poetry.pyproject_path.parent / 'build' / self.platform).resolve()
-
-        fields = {
-            "type": "onedir",
-            "bundle": False,
-            "strip": False,
-            "no-upx": False,
-            "console": False,
-            "windowed": False,
-            "icon": None,
-            "uac-admin": False,
-            "uac-uiaccess": False,
-            "argv-emulation": False,
-            "arch": None,
-            "hidden-import": None,
-            "when": None,
-            "add-version": False
-        }
-        for field, default in fields.items():
-            self.__setattr__(field.replace("-", "_"), self.lookup(field, default))
-
-        self.certificates = self.lookup("certifi.append", list())
-        self.collect_config = self.lookup("collect", dict())
-        self.exclude_poetry_include = self.lookup("exclude-poetry-include", False)
-        self.include_config = self.lookup("include", dict())
-        self.runtime_hooks = self.lookup("runtime-hooks", list())
-        self.copy_metadata_config = self.lookup("copy-metadata", list())
-        self.recursive_copy_metadata_config = self.lookup("recursive-copy-metadata", list())
-        self.package_config = self.lookup("package", dict())
+        self.work_path = (self.project_path / 'build' / self.platform).resolve()
+        self.clean = True
+        self.profile = False
+        self.prepared = False
+        self.precompiled = False
+        self.workspace = None
+        self.scratch_path = None
+        self.external_work_path = None
+        self.work_dir_used = None
+        self.work_size = None
+        self.work_size_estimate = None
+        self.io_saved = None
+        self.duration = None
+        self.peak_rss = None
+        self.events = None
+
+        for field in ("type", "backend", "bundle", "strip", "no-upx", "console", "windowed", "icon", "uac-admin",
+                      "uac-uiaccess", "argv-emulation", "arch", "optimize-binaries", "hidden-import", "when",
+                      "archive", "contents-directory", "add-version", "work-dir", "upx-exclude", "runtime-hooks",
+                      "exclude-poetry-include", "resources-mode", "pre-build", "post-build", "groups", "extras"):
+            self.__setattr__(field.replace("-", "_"), config.get(field))
+
+        self.certificates = config.get("certifi.append")
+        self.collect_config = config.get("collect")
+        self.include_config = config.get("include")
+        self.python_options = list(config.get("python-options"))
+        self.copy_metadata_config = config.get("copy-metadata")
+        self.recursive_copy_metadata_config = config.get("recursive-copy-metadata")
+        self.package_config = config.get("package")
+        self.resources_config = config.get("resources")
+        self.smoke = SmokeConfig.from_config(config.get("smoke"))
+        self.work_dir_size = config.get("work-dir-size")
+        if self.work_dir_size is not None:
+            self.work_dir_size = utils.parse_size(self.work_dir_size)
+        self.bundle_wheels = config.get("bundle-wheels")
+        if isinstance(self.bundle_wheels, str):
+            self.bundle_wheels = [self.bundle_wheels]
 
         if self.add_version:
             self.prog = f"{self.prog}-{self.package_version.to_string()}"
 
         self.validate()
 
+    @property
+    def build_command(self) -> List[str]:
+        """
+        Command run by target's backend
+        """
+        return get_backend(self.backend).command(self)
+
     @property
     def pyinstaller_command(self) -> List[str]:
         args = [
@@ -110,13 +198,14 @@ class Target(utils.LoggingMixin):
             f"--{self.type}",
             "--name", self.prog,
             "--noconfirm",
-            "--clean",
-            "--workpath", self.work_path,
-            "--distpath", self.dist_path,
-            "--specpath", (self.dist_path / ".specs"),
-            "--contents-directory", f"_{self.prog}_internal",
-            "--strip" if self.strip else ...,
+            "--clean" if self.clean else ...,
+            "--workpath", self.build_work_path,
+            "--distpath", self.build_dist_path,
+            "--specpath", self.spec_path,
+            "--contents-directory", self.contents_directory_name,
+            "--strip" if self.strip and not self.post_process_binaries else ...,
             "--no_upx" if self.no_upx else ...,
+            "--noupx" if self.post_process_binaries and not self.no_upx else ...,
             "--console" if self.console else "--noconsole",
             "--windowed" if self.windowed else "--nowindowed",
             "--uac-admin" if self.uac_admin else ...,
@@ -125,7 +214,7 @@ class Target(utils.LoggingMixin):
         ]
 
         if self.icon:
-            args.extend(("--icon", Path(self.icon).resolve()))
+            args.extend(("--icon", self.resolve_path(self.icon)))
 
         if self.arch:
             args.extend(("--target-arch", self.arch))
@@ -133,6 +222,16 @@ class Target(utils.LoggingMixin):
         for hook in self.runtime_hooks:
             args.extend(("--runtime-hook", hook))
 
+        if self.resources_config:
+            args.extend(("--runtime-hook", self.resources_hook_path))
+
+        for python_option in self.python_options:
+            args.extend(("--python-option", python_option))
+
+        if not self.post_process_binaries:
+            for pattern in self.upx_exclude:
+                args.extend(("--upx-exclude", pattern))
+
         for package in self.copy_metadata_config:
             args.extend(("--copy-metadata", package))
 
@@ -160,12 +259,12 @@ class Target(utils.LoggingMixin):
         if not self.exclude_poetry_include:
             for item in self._global_config.lookup("tool.poetry.include", list()):
                 if path := item if isinstance(item, str) else item.get("path", None):
-                    args.extend(("--add-data", f"{Path(path).resolve()}{sep}."))
+                    args.extend(("--add-data", f"{self.resolve_path(path)}{sep}."))
 
         # Includes from plugin
         for source, target in self.include_config.items():
             if source and target:
-                args.extend(("--add-data", f"{Path(source).resolve()}{sep}{target}"))
+                args.extend(("--add-data", f"{self.resolve_path(source)}{sep}{target}"))
 
     def _add_hidden_imports_args(self, args: List[Any]) -> None:
         if self.hidden_import:
@@ -198,20 +297,207 @@ class Target(utils.LoggingMixin):
         return PEP440Version.parse(version)
 
     def validate(self):
-        if self.type not in ["onefile", "onedir"]:
+        """
+        Checks across options, values of each option are checked by plugin configuration
+        """
+        if self.bundle and self.type == "onefile" and self.resources_config and self.resources_mode != "pack":
             raise ValueError(
-                f"ValueError: Unsupported distribution type for target '{self.prog}', "
-                f"'{self.type}' not in ['onefile', 'onedir']."
+                f"ValueError: Resources of bundled 'onefile' target '{self.prog}' require resources-mode 'pack'."
             )
 
-        if self.when not in [None, "release", "prerelease"]:
-            raise ValueError(
-                f"ValueError: Unsupported value for field 'when' for target '{self.prog}', "
-                f"'{self.when}' not in ['release', 'prerelease']."
-            )
+    def resolve_path(self, path: Union[str, Path]) -> Path:
+        """
+        Resolve path of target configuration, from project directory in workspace mode as builds are not run from it
+        """
+        if self.workspace is not None:
+            return (self.project_path / path).resolve()
+        return Path(path).resolve()
+
+    @property
+    def post_process_binaries(self) -> bool:
+        """
+        Strip & UPX applied by plugin after build, binaries are embedded in executable of 'onefile' targets
+        """
+        return self.optimize_binaries and self.type == "onedir"
+
+    @property
+    def optimize_level(self) -> int:
+        """
+        Bytecode optimization level set by 'python-options' ("O" or "OO")
+        """
+        return max([option.count("O") for option in self.python_options if option in ("O", "OO")], default=0)
+
+    @property
+    def contents_directory_name(self) -> str:
+        """
+        Folder of dependencies of 'onedir' targets, shared by bundled targets: files they have in common are added
+        once to wheels
+        """
+        if self.contents_directory:
+            return self.contents_directory
+        return "_internal" if self.bundle else f"_{self.prog}_internal"
+
+    @property
+    def install_args(self) -> Tuple[str, ...]:
+        return get_install_args(self.groups, self.extras)
+
+    @property
+    def output_path(self) -> Path:
+        """
+        PyInstaller output, executable for 'onefile' targets or folder for 'onedir' targets
+        """
+        if self.type == "onefile":
+            return self.executable_path
+        return self.dist_path / self.prog
+
+    @property
+    def executable_path(self) -> Path:
+        name = f"{self.prog}.exe" if "win" in self.platform else self.prog
+        if self.type == "onefile":
+            return self.dist_path / name
+        return self.dist_path / self.prog / name
 
-    def lookup(self, field: str, default: Any) -> Any:
-        return self._target_config.lookup(field, self._plugin_config.lookup(field, default))
+    @property
+    def pyinstaller_config_path(self) -> Path:
+        """
+        PyInstaller's config & cache folder of target. PyInstaller shares a per-user cache by default,
+        '--clean' would wipe it under concurrent builds of other targets or projects.
+        """
+        return self.work_path / ".pyinstaller" / self.prog
+
+    @property
+    def build_work_path(self) -> Path:
+        """
+        PyInstaller's work path, within 'work-dir' while building there
+        """
+        return self.external_work_path or self.work_path
+
+    @property
+    def build_dist_path(self) -> Path:
+        """
+        Folder written by backend, per-build scratch folder while building, published to 'dist_path' once built
+        """
+        if self.scratch_path is None:
+            return self.dist_path
+        return self.scratch_path / "dist"
+
+    @property
+    def build_output_path(self) -> Path:
+        return self.build_dist_path / self.output_path.relative_to(self.dist_path)
+
+    @property
+    def build_executable_path(self) -> Path:
+        return self.build_dist_path / self.executable_path.relative_to(self.dist_path)
+
+    @property
+    def spec_path(self) -> Path:
+        if self.scratch_path is None:
+            return self.dist_path / ".specs"
+        return self.scratch_path / "specs"
+
+    @property
+    def resources_name(self) -> Optional[str]:
+        """
+        Resources shipped next to executable, '<prog>.pack' resource pack or '<prog>.resources' folder
+        """
+        if not self.resources_config:
+            return None
+        return f"{self.prog}.pack" if self.resources_mode == "pack" else f"{self.prog}.resources"
+
+    @property
+    def resources_path(self) -> Optional[Path]:
+        if self.resources_name is None:
+            return None
+        return self.executable_path.parent / self.resources_name
+
+    @property
+    def build_resources_path(self) -> Optional[Path]:
+        if self.resources_path is None:
+            return None
+        return self.build_dist_path / self.resources_path.relative_to(self.dist_path)
+
+    def wheel_resources(self, output_path: Path) -> List[Path]:
+        """
+        Resource pack bundled to wheel next to executable of 'onefile' targets, within folder of 'onedir' targets
+        """
+        if self.type != "onefile" or self.resources_name is None:
+            return []
+        return [output_path / "pyinstaller" / self.platform / self.resources_name]
+
+    @property
+    def package_names(self) -> List[str]:
+        """
+        Top-level names of packaged files in folder of executable
+        """
+        return sorted({Path(target if target != "." else source).parts[0]
+                       for source, target in self.package_config.items()})
+
+    @property
+    def extra_outputs(self) -> List[Path]:
+        """
+        Outputs published next to 'onefile' executables: resources and packaged files shipped with them
+        """
+        if self.type != "onefile":
+            return []
+        resources = [self.resources_path] if self.resources_path is not None else []
+        return resources + [self.dist_path / name for name in self.package_names]
+
+    @property
+    def output_size(self) -> int:
+        """
+        Size of published output, including outputs next to executable
+        """
+        paths = [path for path in (self.output_path, *self.extra_outputs) if path.exists()]
+        return sum(path.stat().st_size if path.is_file() else utils.get_tree_size(path) for path in paths)
+
+    @property
+    def resources_hook_path(self) -> Path:
+        """
+        Runtime hook registering 'pyinstaller_resources' module, generated with spec file
+        """
+        return self.spec_path / f"{self.prog}-resources.py"
+
+    @property
+    def work_lock(self) -> FileLock:
+        """
+        Lock of target's PyInstaller work path, kept between builds as analysis cache
+        """
+        return FileLock(self.work_path / ".locks" / f"{self.prog}.lock")
+
+    @property
+    def dist_lock(self) -> FileLock:
+        """
+        Lock of target's outputs in 'dist_path', held while publishing or reading them
+        """
+        return FileLock(self.dist_path / ".locks" / f"{self.prog}.lock")
+
+    @property
+    def archive_path(self) -> Optional[Path]:
+        if self.archive is None:
+            return None
+        return self.dist_path / f"{self.prog}.{self.archive}"
+
+    @property
+    def profile_path(self) -> Path:
+        """
+        cProfile stats of PyInstaller run, written when building with '--profile'
+        """
+        return self.work_path / self.prog / "pyinstaller.prof"
+
+    @property
+    def watch_paths(self) -> List[Path]:
+        """
+        Paths owned by target, any change on them requires a rebuild
+        """
+        paths = [self.source, *self.runtime_hooks, *self.certificates, *self.include_config, *self.package_config,
+                 *self.resources_config]
+        if self.icon:
+            paths.append(self.icon)
+        if not self.exclude_poetry_include:
+            for item in self._global_config.lookup("tool.poetry.include", list()):
+                if path := item if isinstance(item, str) else item.get("path", None):
+                    paths.append(path)
+        return [(self.project_path / path).resolve() for path in paths]
 
     @property
     def skip(self):
@@ -221,33 +507,228 @@ class Target(utils.LoggingMixin):
             return self.package_version.is_stable()
         return False
 
-    def build(self, poetry: Poetry, command: BuildCommand):
-        env_manager = EnvManager(poetry, io=self._io)
-        venv = env_manager.create_venv()
-
+    def resolve_dist_path(self, command: BuildCommand) -> Path:
         self.dist_path = utils.get_output_path(command) / "pyinstaller" / self.platform
+        return self.dist_path
+
+    def build(self, poetry: Poetry, command: BuildCommand, install: bool = True, dist_path: Optional[Path] = None,
+              venv: Optional[Env] = None):
+        self.duration = self.peak_rss = None
+        self.work_dir_used = self.work_size = self.io_saved = None
+        if venv is None and get_backend(self.backend).requires_environment:
+            venv = Environment(poetry, self._io, self.install_args).get()
+
+        if dist_path is None:
+            self.resolve_dist_path(command)
+        else:
+            self.dist_path = dist_path
 
         if self.skip:
             self.warning(f" <info>-</info> Skipping {self.prog} (on {self.when} only)")
+            self.emit("target-skipped", reason=f"on {self.when} only")
             return
 
         self.log(f"  - Building <c1>{self.prog}</c1>")
-
-        # Install dependencies
-        self._install_dependencies(venv)
-
-        # Deploy certificates to venv
-        self._deploy_certificates(poetry, venv)
-
-        # Run pyinstaller
-        self._run_pyinstaller(venv)
-
+        self.emit("target-started", backend=self.backend, type=self.type)
+        start = time.perf_counter()
+        try:
+            self._run_build(poetry, venv, install)
+        except Exception as exc:
+            self.emit("target-failed", duration=round(time.perf_counter() - start, 3),
+                      error=f"{type(exc).__name__}: {exc}")
+            raise
+
+        self.duration = time.perf_counter() - start
         self.log(f"  - Built <success>{self.prog}</success>")
+        if self.events is not None:
+            self.emit("target-finished", duration=round(self.duration, 3), output=self.output_path,
+                      output_size=self.output_size, peak_rss=self.peak_rss, work_dir=self.work_dir_used)
+
+    def _run_build(self, poetry: Poetry, venv: Optional[Env], install: bool) -> None:
+        backend = get_backend(self.backend)
+        # Environment set up by 'poetry pyinstaller prepare'
+        if backend.requires_environment and not self.prepared:
+            # Install dependencies
+            if install:
+                self.emit("target-phase", phase="install")
+                self._install_dependencies(venv)
+
+            # Deploy certificates to venv
+            self.emit("target-phase", phase="certificates")
+            self._deploy_certificates(poetry, venv)
+
+        # Run pyinstaller or configured backend in a scratch folder, concurrent builds never share outputs
+        with self._scratch():
+            if self.resources_config:
+                self._write_resources_hook()
+
+            self.emit("target-phase", phase="build")
+            with self.work_lock:
+                self._build_in_work_dir(backend, venv)
+
+            # Strip & compress collected binaries
+            if self.post_process_binaries:
+                self.emit("target-phase", phase="optimize-binaries")
+                self._optimize_binaries(poetry)
+
+            # Ship resources next to executable, outside of PyInstaller's bundle
+            if self.resources_config:
+                self.emit("target-phase", phase="resources")
+                self._ship_resources()
+
+            # Copy packaged files next to executable, published with it
+            if self.package_config:
+                self.emit("target-phase", phase="package")
+                self._copy_package_files()
+
+            self.emit("target-phase", phase="publish")
+            self._publish()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """
+        Write target event to event stream of build command, if any
+        """
+        if self.events is not None:
+            self.events.emit(event, target=self.prog, workspace=self.workspace, **fields)
+
+    def create_archive(self) -> str:
+        """
+        Archive PyInstaller output next to it, return SHA-256 of archive
+        """
+        self.log(f"  - Archiving <c1>{self.prog}</c1> <debug>({self.archive})</debug>")
+        start = time.perf_counter()
+        with self.dist_lock:
+            checksum = create_archive(self.output_path, self.archive_path, self.archive, extras=self.extra_outputs)
+        duration = time.perf_counter() - start
+        self.log(f"  - Archived <success>{self.archive_path.name}</success> "
+                 f"<debug>sha256:{checksum} in {duration:.1f}s</debug>")
+        self.emit("target-archived", archive=self.archive_path, size=self.archive_path.stat().st_size,
+                  sha256=checksum, duration=round(duration, 3))
+        return checksum
+
+    def smoke_test(self) -> SmokeResult:
+        """
+        Run built executable and measure startup latency, raise if exit code or startup budget is not met
+        """
+        result = run_smoke_test(self.executable_path, self.smoke)
+        warm = f", warm {result.warm:.3f}s" if result.warm is not None else ""
+        self.log(f"  - Smoke tested <c1>{self.prog}</c1> "
+                 f"<debug>(exit code {result.exit_code}, cold {result.cold:.3f}s{warm})</debug>")
+        self.emit("target-smoke-tested", exit_code=result.exit_code, cold=round(result.cold, 3),
+                  warm=round(result.warm, 3) if result.warm is not None else None)
+        check_smoke_result(self.prog, self.smoke, result)
+        return result
+
+    @contextlib.contextmanager
+    def _scratch(self) -> Iterator[Path]:
+        """
+        Per-build scratch folder in work path, removed once build is done
+        """
+        scratch_root = self.work_path / ".scratch"
+        scratch_root.mkdir(parents=True, exist_ok=True)
+        self.scratch_path = Path(tempfile.mkdtemp(prefix=f"{self.prog}-", dir=scratch_root))
+        try:
+            yield self.scratch_path
+        finally:
+            rmtree(self.scratch_path, ignore_errors=True)
+            self.scratch_path = None
+
+    def _get_external_work_path(self) -> Optional[Path]:
+        """
+        Build folder in 'work-dir', None when work dir is not set or lacks space for target's intermediates
+        """
+        if self.work_dir is None:
+            return None
+        root = Path(self.work_dir).expanduser()
+        required = self.work_dir_size or self.work_size_estimate or DEFAULT_WORK_SIZE
+        try:
+            free = disk_usage(root).free
+        except OSError as exc:
+            self.warning(f"  - Work dir {root} unavailable ({exc.strerror}), building {self.prog} on disk")
+            return None
+        if free < required:
+            self.warning(f"  - Not enough space in work dir {root} ({utils.format_size(free)} free, "
+                         f"{utils.format_size(required)} required), building {self.prog} on disk")
+            return None
+        return Path(tempfile.mkdtemp(prefix=f"pyinstaller-{self.prog}-", dir=root))
+
+    def _build_in_work_dir(self, backend: Backend, venv: Optional[Env]) -> None:
+        """
+        Run backend with intermediates in 'work-dir' when it has enough space. Work folder is removed once
+        target is built, or kept for inspection on failure. Build is retried on disk when work dir got full.
+        """
+        self.external_work_path = self._get_external_work_path()
+        if self.external_work_path is not None:
+            root = self.external_work_path.parent
+            try:
+                backend.build(self, venv)
+            except Exception:
+                if disk_usage(root).free >= WORK_DIR_FULL:
+                    self.warning(f"  - Intermediates of {self.prog} kept in {self.external_work_path}")
+                    raise
+                rmtree(self.external_work_path, ignore_errors=True)
+                self.warning(f"  - Work dir {root} is full, building {self.prog} on disk")
+            else:
+                self.work_size = utils.get_tree_size(self.external_work_path)
+                self.work_dir_used = root
+                rmtree(self.external_work_path, ignore_errors=True)
+                return
+            finally:
+                self.external_work_path = None
+
+        backend.build(self, venv)
+        if self.work_dir is not None:
+            self.work_size = utils.get_tree_size(self.work_path / self.prog)
+
+    def _publish(self) -> None:
+        """
+        Move built output from scratch folder to 'dist_path', replacing previous output atomically
+        """
+        if not self.build_output_path.exists():
+            self.warning(f"  - No output to publish for {self.prog} in {self.build_dist_path}")
+            return
+        with self.dist_lock:
+            publish(self.build_output_path, self.output_path)
+            # Resources of 'onefile' targets are next to executable, outside of output
+            if self.type == "onefile" and self.build_resources_path and self.build_resources_path.exists():
+                publish(self.build_resources_path, self.resources_path)
+            if self.type == "onefile":
+                for name in self.package_names:
+                    publish(self.build_dist_path / name, self.dist_path / name)
+        self.debug(f"{self.prog}: published to {self.output_path}")
+
+    def _copy_package_files(self) -> None:
+        """
+        Copy 'package' files next to executable in scratch folder
+        """
+        for source, target in self.package_config.items():
+            destination = self.build_executable_path.parent / (target if target != "." else source)
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            if self.resolve_path(source).is_dir():
+                copytree(self.resolve_path(source), destination, dirs_exist_ok=True)
+            else:
+                copy(self.resolve_path(source), destination)
+
+    def _write_resources_hook(self) -> None:
+        self.resources_hook_path.parent.mkdir(parents=True, exist_ok=True)
+        self.resources_hook_path.write_text(get_runtime_hook(self.resources_name, self.resources_mode == "pack"))
+
+    def _ship_resources(self) -> None:
+        """
+        Copy resources next to built executable, or write them to a single resource pack
+        """
+        resources = collect_resources(self.project_path, self.resources_config)
+        if self.resources_mode == "pack":
+            size = write_pack(resources, self.build_resources_path)
+        else:
+            size = copy_resources(resources, self.build_resources_path)
+        self.log(f"  - Shipped <c1>{len(resources)}</c1> resource(s) with {self.prog} "
+                 f"<debug>({utils.format_size(size)}, {self.resources_name})</debug>")
 
     def _install_dependencies(self, venv: Env):
-        args = ("poetry", "install", "--all-extras", "--all-groups")
+        args = get_install_command(self.install_args)
         self.debug(f"run '{' '.join(args)}'")
-        self.debug_command(venv.run(*args))
+        self.debug_command(venv.run(*args, cwd=self.project_path))
 
     def _deploy_certificates(self, poetry: Poetry, venv: Env):
         for crt in self.certificates:
@@ -259,46 +740,52 @@ class Target(utils.LoggingMixin):
             with open(r"{crt_path}", "r") as include:
                 with open(certifi.where(), 'a') as cert:
                     cert.write(include.read())
-            """))
+            """), cwd=self.project_path)
 
     def _run_pyinstaller(self, venv: Env):
         args = self.pyinstaller_command
         self.debug(f"run '{' '.join(args)}'")
-        self.debug_command(venv.run(*args))
-
-    def _run_package(self):  # pragma: nocover
-        if self.type == "onefile":
-            package_path = Path("dist", "pyinstaller", self.platform, self.prog)
+        env = dict(os.environ, PYINSTALLER_CONFIG_DIR=str(self.pyinstaller_config_path))
+
+        # Bytecode precompiled by build command is fed to PyInstaller run in-process
+        if self.profile:
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            script = CODE_CACHE_SCRIPT + PROFILE_WRAPPER if self.precompiled else PROFILE_WRAPPER
+            self._run_measured(venv, str(self.profile_path), *args[1:], script=script, env=env)
+        elif self.precompiled:
+            self._run_measured(venv, "python", "-c", PYINSTALLER_SCRIPT, *args[1:], env=env)
         else:
-            package_path = Path("dist", "pyinstaller", self.platform)
-
-        for source, target in self.package_config.items():
-            destination = Path(package_path / (target if target != "." else source))
-            try:
-                if destination.exists() and destination.is_dir():
-                    rmtree(destination)
-                copytree(source, destination)
-            except OSError as exc:  # python >2.5 or, is file and/or file exists
-                if exc.errno in (ENOTDIR, EINVAL, EEXIST):
-                    copy(source, destination)
-                else:
-                    raise
-
-    def bundle_to_wheel(self, output_path: Path, wheel: str):  # pragma: nocover
-        target_path = output_path / "pyinstaller" / self.platform / self.prog
-        wheel_path = output_path / wheel
-
-        self.log(f"  - Adding <c1>{self.prog}</c1> to data scripts <debug>{wheel}</debug>")
-        with zipfile.ZipFile(wheel_path, "a", zipfile.ZIP_DEFLATED) as wheel_f:
-            for wheel_file in wheel_f.filelist:
-                if "dist-info/WHEEL" in wheel_file.filename:
-                    wheel_scripts_path = Path(wheel_file.filename.replace("dist-info/WHEEL", "data/scripts/"))
-
-            if os.path.isfile(target_path):
-                wheel_f.write(target_path, arcname=wheel_scripts_path / target_path.name)
-                return
-
-            for root, dirs, files in os.walk(target_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    wheel_f.write(file_path, arcname=wheel_scripts_path / os.path.relpath(file_path, target_path))
+            self._run_measured(venv, *args, env=env)
+
+    def _run_measured(self, venv: Env, *args: str, script: str = PEAK_RSS_WRAPPER,
+                      env: Optional[Dict[str, str]] = None):
+        """
+        Run wrapper script in venv, script writes peak RSS to temporary file given as first argument
+        """
+        fd, rss_path = tempfile.mkstemp(prefix=f"{self.name}-", suffix=".rss")
+        os.close(fd)
+        try:
+            self.debug_command(venv.run("python", "-c", script, rss_path, *args, cwd=self.project_path, env=env))
+            with open(rss_path) as rss:
+                self.peak_rss = int(rss.read() or 0) or None
+        except ValueError:
+            self.peak_rss = None
+        finally:
+            os.unlink(rss_path)
+
+    def get_binaries_manifest_path(self, cache_path: Path) -> Path:
+        """
+        Cache keys of binaries optimized by last build of target, kept in binaries cache
+        """
+        return cache_path / "manifests" / f"{self.platform}-{self.prog}.json"
+
+    def _optimize_binaries(self, poetry: Poetry):
+        commands = get_commands(self.platform, self.strip, not self.no_upx)
+        if not commands:
+            return
+        cache_path = utils.get_cache_path(poetry) / "binaries"
+        stats = optimize_binaries(self.build_output_path, cache_path, commands, self.upx_exclude,
+                                  manifest_path=self.get_binaries_manifest_path(cache_path))
+        self.log(f"  - Optimized <info>{stats['binaries']}</info> binaries of <c1>{self.prog}</c1> "
+                 f"<debug>({', '.join(commands)}, {stats['cached']} cached, "
+                 f"{utils.format_size(stats['before'])} -> {utils.format_size(stats['after'])})</debug>")
@@ -3,8 +3,11 @@
 
 from __future__ import annotations
 
+import os
+import re
+import subprocess
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Set, Union
 
 from cleo.io.io import IO
 from poetry.console.commands.build import BuildCommand
@@ -12,6 +15,10 @@ from poetry.core.masonry.builders.wheel import WheelBuilder
 from poetry.poetry import Poetry
 from tomlkit import TOMLDocument
 
+IGNORED_NAMES = {"build", "dist", "__pycache__", ".git", ".venv", ".mypy_cache", ".pytest_cache"}
+IGNORED_SUFFIXES = (".pyc", ".pyo", ".swp", ".swx", "~")
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
 
 class PyProjectConfig:
     def __init__(self, data: TOMLDocument):
@@ -78,9 +85,85 @@ def get_base_modules_path(poetry: Poetry) -> List[Path]:
     return [module.base for module in WheelBuilder(poetry)._module.includes]  # noqa
 
 
+def get_module_sources(poetry: Poetry) -> List[Path]:
+    """
+    Python sources of project packages, as included in wheel
+    """
+    return [path.resolve() for module in WheelBuilder(poetry)._module.includes  # noqa
+            for path in module.elements if path.suffix == ".py"]
+
+
 def get_output_path(command: BuildCommand) -> Path:
     # True when --output specified
     if dist_path := command.option("output"):  # noqa
         return Path(dist_path).resolve()
     else:
         return Path("dist").resolve()
+
+
+def get_option(command: BuildCommand, name: str, default: Any = None) -> Any:
+    # Options of plugin commands are not defined when running through 'poetry build'
+    if command.io.input.has_option(name):  # noqa
+        return command.option(name)  # noqa
+    return default
+
+
+def get_cache_path(poetry: Poetry) -> Path:
+    return (poetry.pyproject_path.parent / "build" / ".cache").resolve()
+
+
+def is_ignored(path: Path) -> bool:
+    if path.name.endswith(IGNORED_SUFFIXES):
+        return True
+    return any(part in IGNORED_NAMES for part in path.parts)
+
+
+def get_changed_files(path: Path, ref: str) -> Set[Path]:
+    """
+    List files changed since given git reference, including uncommitted and untracked files
+    """
+    commands = [
+        ("git", "diff", "--name-only", "--relative", ref),
+        ("git", "ls-files", "--others", "--exclude-standard"),
+    ]
+    changes = set()
+    for command in commands:
+        out = subprocess.run(command, cwd=path, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"Unable to list changed files since '{ref}': {out.stderr.strip()}")
+        changes.update((path / line).resolve() for line in out.stdout.splitlines() if line)
+    return changes
+
+
+def parse_size(value: Union[int, str]) -> int:
+    """
+    Size in bytes from integer or human readable string, e.g. '512M', '8G' or '1.5GiB'
+    """
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"ValueError: Invalid size '{value}', expected bytes or value like '512M' or '8G'.")
+    return int(float(match[1]) * SIZE_UNITS[match[2].upper()])
+
+
+def get_tree_size(path: Path) -> int:
+    """
+    Total size of files under path, symbolic links are not followed
+    """
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return size
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} TiB"
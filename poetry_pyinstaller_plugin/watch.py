@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Set, Tuple
+
+from poetry_pyinstaller_plugin.utils import IGNORED_NAMES, is_ignored
+
+
+class _Watcher(abc.ABC):
+    """
+    Base watcher, collect changed paths under given roots (recursively) and files.
+    """
+
+    def __init__(self, paths: Iterable[Path]):
+        self.roots: Set[Path] = set()
+        self.files: Set[Path] = set()
+        self.detected_at = time.monotonic()
+        for path in paths:
+            path = Path(path).resolve()
+            if path.is_dir():
+                self.roots.add(path)
+            else:
+                self.files.add(path)
+
+    def is_watched(self, path: Path) -> bool:
+        if path in self.files:
+            return True
+        for root in self.roots:
+            if path == root or root in path.parents:
+                return not is_ignored(path.relative_to(root))
+        return False
+
+    @abc.abstractmethod
+    def poll(self, timeout: float) -> Set[Path]:
+        """
+        Changed paths detected within `timeout` seconds, empty set when nothing changed.
+        """
+
+    def close(self) -> None:
+        pass
+
+    def wait(self, debounce: float) -> Set[Path]:
+        """
+        Block until changes are detected, then wait for a quiet period of `debounce` seconds.
+        """
+        changes = set()
+        while not changes:
+            changes = self.poll(1.0)
+        self.detected_at = time.monotonic()
+
+        while batch := self.poll(debounce):
+            changes.update(batch)
+
+        return changes
+
+
+class PollingWatcher(_Watcher):
+    def __init__(self, paths: Iterable[Path], interval: float = 0.5):
+        super().__init__(paths)
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snapshot = {}
+        for file in self.files:
+            self._stat(file, snapshot)
+        for root in self.roots:
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in IGNORED_NAMES]
+                for filename in filenames:
+                    path = Path(dirpath, filename)
+                    if not is_ignored(path.relative_to(root)):
+                        self._stat(path, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _stat(path: Path, snapshot: Dict[Path, Tuple[int, int]]) -> None:
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self, timeout: float) -> Set[Path]:
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changes = {p for p in current.keys() | self._snapshot.keys() if current.get(p) != self._snapshot.get(p)}
+            self._snapshot = current
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes
+            time.sleep(min(self.interval, remaining))
+
+
+class InotifyWatcher(_Watcher):
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self, paths: Iterable[Path]):
+        super().__init__(paths)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wds: Dict[int, Path] = {}
+
+        for root in self.roots:
+            self._add_tree(root)
+        for file in self.files:
+            self._add_watch(file.parent)
+
+    def _add_watch(self, path: Path) -> None:
+        if path in self._wds.values():
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self._wds[wd] = path
+
+    def _add_tree(self, root: Path) -> None:
+        for dirpath, dirnames, _ in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_NAMES]
+            self._add_watch(Path(dirpath))
+
+    def poll(self, timeout: float) -> Set[Path]:
+        changes: Set[Path] = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changes
+
+        data = os.read(self._fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                return self.roots | self.files
+
+            if wd not in self._wds:
+                continue
+
+            path = self._wds[wd] / name if name else self._wds[wd]
+            if not self.is_watched(path):
+                continue
+
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self._add_tree(path)
+            changes.add(path)
+
+        return changes
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def create_watcher(paths: Iterable[Path], polling: bool = False) -> _Watcher:
+    """
+    Create inotify watcher when available, falls back to polling otherwise.
+    """
+    paths = list(paths)
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):  # pragma: nocover
+            pass
+    return PollingWatcher(paths)
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import os
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from poetry_pyinstaller_plugin.delta import sha256sum
+
+
+def get_platform_wheel_name(wheel: str, platform: str) -> str:
+    """
+    Replace 'any' platform tag by given platform, platform specific wheels are left unchanged
+    """
+    if wheel.endswith("-any.whl"):
+        return f"{wheel[:-len('-any.whl')]}-{platform}.whl"
+    return wheel
+
+
+def add_to_wheel(wheel_path: Path, sources: List[Path], entries: Optional[Dict[str, str]] = None) -> int:
+    """
+    Add executables or onedir folders to data scripts of wheel, files already added with identical
+    content are skipped using hashes of written entries. Return number of bytes saved.
+    """
+    entries = {} if entries is None else entries
+    saved = 0
+
+    with zipfile.ZipFile(wheel_path, "a", zipfile.ZIP_DEFLATED) as wheel_f:
+        for wheel_file in wheel_f.filelist:
+            if "dist-info/WHEEL" in wheel_file.filename:
+                wheel_scripts_path = Path(wheel_file.filename.replace("dist-info/WHEEL", "data/scripts/"))
+
+        for source in sources:
+            if os.path.isfile(source):
+                files = [(str(source), source.name)]
+            else:
+                files = [
+                    (os.path.join(root, file), os.path.relpath(os.path.join(root, file), source))
+                    for root, dirs, filenames in os.walk(source) for file in filenames
+                ]
+
+            for file_path, name in files:
+                arcname = (wheel_scripts_path / name).as_posix()
+                digest = sha256sum(Path(file_path))
+                if arcname in entries:
+                    if entries[arcname] != digest:
+                        raise RuntimeError(
+                            f"Conflicting content for '{name}' in {wheel_path.name}, targets sharing "
+                            f"'contents-directory' must bundle identical files."
+                        )
+                    saved += os.path.getsize(file_path)
+                    continue
+                entries[arcname] = digest
+                wheel_f.write(file_path, arcname=arcname)
+
+    return saved
+
+
+def bundle_wheel(wheel_path: Path, sources: List[Path], platform: str) -> Tuple[str, int]:
+    """
+    Bundle sources into a copy of wheel renamed with platform tag, replacing original wheel atomically.
+    Executed in worker processes, return name of bundled wheel and number of bytes saved.
+    """
+    tmp = wheel_path.with_name(f".{wheel_path.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copyfile(wheel_path, tmp)
+        saved = add_to_wheel(tmp, sources)
+        name = get_platform_wheel_name(wheel_path.name, platform)
+        os.replace(tmp, wheel_path.with_name(name))
+        if name != wheel_path.name:
+            wheel_path.unlink()
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return name, saved
@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright 2025 Thomas Mahé <oss@tmahe.fr>
+# SPDX-License-Identifier: MIT
+
+from __future__ import annotations
+
+import dataclasses
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import tomlkit
+from cleo.io.io import IO
+from poetry.factory import Factory
+from poetry.poetry import Poetry
+from poetry.utils.env import Env
+
+from poetry_pyinstaller_plugin import Target, utils
+from poetry_pyinstaller_plugin.config import PLUGIN_SECTION, PluginConfig
+from poetry_pyinstaller_plugin.environment import Environment
+
+
+@dataclasses.dataclass
+class Project:
+    """
+    Poetry project of a workspace, targets are built to project's own 'dist' folder
+    """
+    name: str
+    poetry: Poetry
+    targets: List[Target]
+    dist_path: Path
+    config: PluginConfig
+    environments: Dict[Tuple[str, ...], Env] = dataclasses.field(default_factory=dict)
+    # Environments installed by 'poetry pyinstaller prepare' in project
+    prepared: bool = False
+
+    @property
+    def path(self) -> Path:
+        return self.poetry.pyproject_path.parent
+
+
+def has_targets(pyproject: Path) -> bool:
+    try:
+        data = tomlkit.parse(pyproject.read_text())
+    except (OSError, ValueError):
+        return False
+    return bool(utils.PyProjectConfig(data).lookup(f"{PLUGIN_SECTION}.targets", None))
+
+
+def discover_projects(root: Path, patterns: Sequence[str]) -> List[Path]:
+    """
+    Directories matching glob patterns (relative to root) holding a pyproject.toml with plugin targets
+    """
+    projects: List[Path] = []
+    for pattern in patterns:
+        for path in sorted(root.glob(pattern)):
+            path = path.resolve()
+            if path.name == "pyproject.toml":
+                path = path.parent
+            if path.is_dir() and path not in projects and has_targets(path / "pyproject.toml"):
+                projects.append(path)
+    return projects
+
+
+def load_project(root: Path, path: Path, io: IO, output: Optional[Path] = None) -> Project:
+    """
+    Create Poetry project and targets, targets are built to '<output>/<project>' when output is given.
+    Invalid configuration raises all its problems, prefixed by project name.
+    """
+    poetry = Factory().create_poetry(cwd=path)
+    name = path.relative_to(root).as_posix() if path.is_relative_to(root) else path.name
+    platform = utils.get_platform(poetry)
+    dist_path = (output / name if output else path / "dist") / "pyinstaller" / platform
+
+    config = PluginConfig.from_poetry(poetry)
+    config.check(paths=False, prefix=f"{name}: ")
+    targets = [Target(target, poetry, io=io, config=target_config) for target, target_config in config.targets.items()]
+    for target in targets:
+        target.workspace = name
+    return Project(name, poetry, targets, dist_path, config)
+
+
+class EnvironmentPool(utils.LoggingMixin):
+    """
+    Build environments of workspace projects, projects with identical lock file and dependency selection
+    share a single environment where each project is installed
+    """
+    environments: Dict[str, Env]
+    created: int
+    reused: int
+
+    def __init__(self, io: IO, **kwargs):
+        super().__init__(io, **kwargs)
+        self.environments = {}
+        self.created = 0
+        self.reused = 0
+
+    def get(self, project: Project, install_args: Sequence[str]) -> Env:
+        install_args = tuple(install_args)
+        if install_args in project.environments:
+            return project.environments[install_args]
+
+        environment = Environment(project.poetry, self._io, install_args, config=project.config)
+        lock_hash = environment.lock_hash
+        if lock_hash is not None and lock_hash in self.environments:
+            venv = self.environments[lock_hash]
+            self.log(f"  - Reusing environment <debug>{venv.path}</debug> for <c1>{project.name}</c1>")
+            self._install_root(project, venv)
+            self.reused += 1
+        else:
+            self.log(f"  - Creating environment of <c1>{project.name}</c1> <debug>[{' '.join(install_args)}]</debug>")
+            venv = environment.create()
+            self.created += 1
+            if lock_hash is not None:
+                self.environments[lock_hash] = venv
+
+        project.environments[install_args] = venv
+        return venv
+
+    def _install_root(self, project: Project, venv: Env) -> None:
+        """
+        Locked dependencies are already installed, only project itself is missing
+        """
+        args = ("poetry", "install", "--only-root")
+        self.debug(f"run '{' '.join(args)}' in {project.path}")
+        self.debug_command(venv.run(*args, cwd=project.path))
@@ -0,0 +1,123 @@
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase, skipIf
+
+from poetry_pyinstaller_plugin.archive import (BlockCompressor,
+                                               create_archive)
+
+try:
+    import zstandard
+except ImportError:  # pragma: nocover
+    zstandard = None
+
+
+class TestBlockCompressor(TestCase):
+
+    def test_blocks_in_order(self):
+        out = io.BytesIO()
+        compressor = BlockCompressor(out, lambda block: gzip.compress(block, mtime=0), block_size=1024, threads=4)
+        data = os.urandom(64 * 1024)
+        for i in range(0, len(data), 1000):
+            compressor.write(data[i:i + 1000])
+        compressor.close()
+
+        self.assertEqual(gzip.decompress(out.getvalue()), data)
+
+    def test_xz_streams(self):
+        out = io.BytesIO()
+        compressor = BlockCompressor(out, lzma.compress, block_size=100)
+        compressor.write(b"x" * 1000)
+        compressor.close()
+        self.assertEqual(lzma.decompress(out.getvalue()), b"x" * 1000)
+
+    def test_compress_error(self):
+        def compress(block):
+            raise RuntimeError("compression failed")
+
+        compressor = BlockCompressor(io.BytesIO(), compress, block_size=10)
+        compressor.write(b"data")
+        with self.assertRaises(RuntimeError):
+            compressor.close()
+
+
+class TestCreateArchive(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.source = self.root / "my-tool"
+        (self.source / "_my-tool_internal").mkdir(parents=True)
+        (self.source / "my-tool").write_bytes(os.urandom(1024))
+        (self.source / "my-tool").chmod(0o755)
+        (self.source / "_my-tool_internal" / "base_library.zip").write_bytes(b"data" * 10000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def check_checksum(self, archive, checksum):
+        self.assertEqual(checksum, hashlib.sha256(archive.read_bytes()).hexdigest())
+        sha256 = archive.with_name(f"{archive.name}.sha256").read_text()
+        self.assertEqual(sha256, f"{checksum}  {archive.name}\n")
+
+    def check_tar(self, archive_format):
+        archive = self.root / f"my-tool.{archive_format}"
+        checksum = create_archive(self.source, archive, archive_format, threads=2)
+        self.check_checksum(archive, checksum)
+
+        with tarfile.open(archive) if archive_format != "tar.zst" else self.open_zst(archive) as tar:
+            self.assertEqual(tar.extractfile("my-tool/_my-tool_internal/base_library.zip").read(), b"data" * 10000)
+            self.assertEqual(tar.getmember("my-tool/my-tool").mode & 0o777, 0o755)
+        self.assertEqual([p.name for p in self.root.iterdir() if p.name.startswith(".")], [])
+
+    def open_zst(self, archive):
+        data = zstandard.ZstdDecompressor().stream_reader(archive.open("rb")).read()
+        return tarfile.open(fileobj=io.BytesIO(data))
+
+    def test_tar_gz(self):
+        self.check_tar("tar.gz")
+
+    def test_tar_xz(self):
+        self.check_tar("tar.xz")
+
+    @skipIf(zstandard is None, "zstandard not installed")
+    def test_tar_zst(self):
+        self.check_tar("tar.zst")
+
+    def test_zip(self):
+        archive = self.root / "my-tool.zip"
+        checksum = create_archive(self.source, archive, "zip")
+        self.check_checksum(archive, checksum)
+
+        with zipfile.ZipFile(archive) as zip_file:
+            self.assertEqual(zip_file.namelist(), ["my-tool/my-tool", "my-tool/_my-tool_internal/base_library.zip"])
+            self.assertIsNone(zip_file.testzip())
+
+    def test_onefile(self):
+        archive = self.root / "my-tool.tar.gz"
+        create_archive(self.source / "my-tool", archive, "tar.gz")
+        with tarfile.open(archive) as tar:
+            self.assertEqual(tar.getnames(), ["my-tool"])
+
+    def test_extras(self):
+        (self.root / "my-tool.pack").write_bytes(b"pack")
+        for archive_format in ("tar.gz", "zip"):
+            archive = self.root / f"my-tool.{archive_format}"
+            create_archive(self.source / "my-tool", archive, archive_format, extras=[self.root / "my-tool.pack"])
+            if archive_format == "zip":
+                with zipfile.ZipFile(archive) as zip_file:
+                    self.assertEqual(zip_file.namelist(), ["my-tool", "my-tool.pack"])
+            else:
+                with tarfile.open(archive) as tar:
+                    self.assertEqual(tar.getnames(), ["my-tool", "my-tool.pack"])
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            create_archive(self.source, self.root / "my-tool.rar", "rar")
+        self.assertFalse((self.root / "my-tool.rar").exists())
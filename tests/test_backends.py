@@ -0,0 +1,126 @@
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipIf
+from unittest.mock import MagicMock, patch
+
+from poetry.factory import Factory
+
+from poetry_pyinstaller_plugin import Target
+from poetry_pyinstaller_plugin.backends import (Backend, NuitkaBackend,
+                                                PyInstallerBackend,
+                                                SimulatedBackend, get_backend)
+
+
+class TestBackends(TestCase):
+
+    def setUp(self):
+        self.patch_platform = patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux")
+        self.patch_platform.start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+        self.poetry = Factory().create_poetry(cwd=Path("test_project"))
+        self.target = Target("my-tool-2", self.poetry, MagicMock())
+        self.target.dist_path = self.root / "dist"
+        self.target.work_path = self.root / "build"
+        self.target.log = MagicMock()
+
+    def tearDown(self):
+        self.patch_platform.stop()
+        self.tmp.cleanup()
+
+    def test_get_backend(self):
+        self.assertIsInstance(get_backend("pyinstaller"), PyInstallerBackend)
+        self.assertIsInstance(get_backend("nuitka"), NuitkaBackend)
+        self.assertIsInstance(get_backend("simulated"), SimulatedBackend)
+        with self.assertRaises(ValueError):
+            get_backend("py2exe")
+
+    def test_pyinstaller(self):
+        self.target._run_pyinstaller = MagicMock()
+        backend = PyInstallerBackend()
+        self.assertEqual(backend.command(self.target), self.target.pyinstaller_command)
+        backend.build(self.target, venv := MagicMock())
+        self.target._run_pyinstaller.assert_called_with(venv)
+
+    def test_nuitka_command(self):
+        target = Target("my-tool-3", self.poetry, MagicMock())
+        target.dist_path = self.root / "dist"
+        command = NuitkaBackend().command(target)
+
+        self.assertEqual(command[:4], ["python", "-m", "nuitka", "--onefile"])
+        self.assertIn(f"--output-filename={target.prog}", command)
+        self.assertIn(f"--linux-icon={Path('icon.ico').resolve()}", command)
+        self.assertIn("--include-module=requests", command)
+        self.assertIn("--include-package=package_a", command)
+        self.assertIn("--include-package-data=package_b", command)
+        self.assertIn("--include-package=package_e", command)
+        self.assertIn("--include-package-data=package_e", command)
+        self.assertIn(f"--include-data-files={Path('file.txt').resolve()}=file.txt", command)
+        self.assertEqual(command[-1], str(target.source))
+
+    def test_nuitka_build(self):
+        backend = NuitkaBackend()
+
+        def run(venv, *args):
+            dist = backend.output_dir(self.target) / "main.dist"
+            dist.mkdir(parents=True)
+            (dist / "my-tool-2").write_text("binary")
+
+        self.target._run_measured = MagicMock(side_effect=run)
+        self.target.output_path.mkdir(parents=True)
+        (self.target.output_path / "stale").touch()
+
+        backend.build(self.target, MagicMock())
+        self.assertEqual(self.target._run_measured.call_args.args[1:], tuple(backend.command(self.target)))
+        self.assertEqual(self.target.executable_path.read_text(), "binary")
+        self.assertFalse((self.target.output_path / "stale").exists())
+
+    def test_simulated(self):
+        backend = SimulatedBackend()
+        backend.build(self.target, None)
+        contents = self.target.output_path / "_my-tool-2_internal"
+        self.assertEqual(sorted(p.name for p in contents.iterdir()), ["base_library.zip", "my-tool-2.pyz"])
+        executable = self.target.executable_path.read_text()
+
+        # Output is rebuilt identically
+        backend.build(self.target, None)
+        self.assertEqual(self.target.executable_path.read_text(), executable)
+
+        self.target.type = "onefile"
+        backend.build(self.target, None)
+        self.assertTrue(self.target.output_path.is_file())
+        self.assertNotEqual(self.target.executable_path.read_text(), executable)
+
+    @skipIf(sys.platform == "win32", "Simulated executables are shell scripts")
+    def test_simulated_executable(self):
+        SimulatedBackend().build(self.target, None)
+        out = subprocess.run([self.target.executable_path], capture_output=True, text=True, check=True)
+        self.assertTrue(out.stdout.startswith("my-tool-2 "))
+
+    @patch("poetry_pyinstaller_plugin.target.Environment")
+    def test_target_build(self, mock_environment):
+        self.target.backend = "simulated"
+        self.target._install_dependencies = MagicMock()
+        self.target._deploy_certificates = MagicMock()
+
+        self.target.build(self.poetry, MagicMock(), dist_path=self.root / "dist")
+        mock_environment.assert_not_called()
+        self.target._install_dependencies.assert_not_called()
+        self.target._deploy_certificates.assert_not_called()
+        self.assertIsNotNone(self.target.duration)
+        self.assertTrue(self.target.executable_path.exists())
+
+    def test_abstract_backend(self):
+        class IncompleteBackend(Backend):
+            name = "incomplete"
+
+            def command(self, target):
+                return []
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+        self.assertEqual(PyInstallerBackend.unsupported, ())
+        self.assertIn("runtime-hooks", NuitkaBackend.unsupported)
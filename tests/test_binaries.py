@@ -0,0 +1,109 @@
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from poetry_pyinstaller_plugin.binaries import (find_binaries,
+                                                get_cached_binaries,
+                                                get_commands, is_binary,
+                                                optimize_binaries,
+                                                process_binary)
+
+APPEND = [sys.executable, "-c", "import sys; open(sys.argv[-1], 'ab').write(b'-processed')"]
+FAIL = [sys.executable, "-c", "raise SystemExit('cannot process')"]
+PE_HEADER = b"MZ".ljust(0x3C, b"\0") + struct.pack("<I", 0x40) + b"PE\0\0"
+
+
+class TestBinaries(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.output = self.root / "my-tool"
+        self.cache = self.root / "cache"
+        internal = self.output / "_internal"
+        (internal / "lib").mkdir(parents=True)
+        (self.output / "my-tool").write_bytes(b"\x7fELF executable")
+        (internal / "libpython.so").write_bytes(b"\x7fELF libpython")
+        (internal / "lib" / "_ssl.pyd").write_bytes(PE_HEADER + b" extension")
+        (internal / "libqt.dylib").write_bytes(b"\xcf\xfa\xed\xfe qt")
+        (internal / "base_library.zip").write_bytes(b"PK\x03\x04")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_is_binary(self):
+        self.assertTrue(is_binary(self.output / "_internal" / "libpython.so"))
+        self.assertTrue(is_binary(self.output / "_internal" / "lib" / "_ssl.pyd"))
+
+        # DOS header must point to PE signature
+        (self.root / "notes.txt").write_bytes(b"MZ notes")
+        self.assertFalse(is_binary(self.root / "notes.txt"))
+        (self.root / "notes.txt").write_bytes(b"MZ" + b" " * 100)
+        self.assertFalse(is_binary(self.root / "notes.txt"))
+        self.assertFalse(is_binary(self.output / "_internal" / "base_library.zip"))
+        self.assertFalse(is_binary(self.output / "missing"))
+
+    def test_find_binaries(self):
+        self.assertEqual([p.name for p in find_binaries(self.output)], ["_ssl.pyd", "libpython.so", "libqt.dylib"])
+
+    @patch("poetry_pyinstaller_plugin.binaries.shutil.which", return_value="/usr/bin/upx")
+    def test_get_commands(self, mock_which):
+        self.assertEqual(get_commands("manylinux_2_39_x86_64", True, True),
+                         {"strip": ["strip"], "upx": ["/usr/bin/upx", "-q"]})
+        self.assertEqual(get_commands("win_amd64", True, True), {"upx": ["/usr/bin/upx", "-q"]})
+        self.assertEqual(get_commands("macosx_14_0_arm64", True, True),
+                         {"strip": ["strip", "-S"], "codesign": ["codesign", "--force", "--sign", "-"]})
+        self.assertEqual(get_commands("manylinux_2_39_x86_64", False, False), {})
+
+        mock_which.return_value = None
+        self.assertEqual(get_commands("manylinux_2_39_x86_64", False, True), {})
+
+    def test_process_binary(self):
+        library = self.output / "_internal" / "libpython.so"
+        library.chmod(0o755)
+
+        self.assertEqual(process_binary(library, self.cache, [APPEND])[:3], (False, 14, 24))
+        self.assertEqual(library.read_bytes(), b"\x7fELF libpython-processed")
+        self.assertEqual(library.stat().st_mode & 0o777, 0o755)
+
+        # Same input is served from cache
+        library.write_bytes(b"\x7fELF libpython")
+        hit, _, _, key = process_binary(library, self.cache, [APPEND])
+        self.assertTrue(hit)
+        self.assertEqual(library.read_bytes(), b"\x7fELF libpython-processed")
+        self.assertEqual([path.name for path in self.cache.iterdir()], [key])
+
+    def test_process_binary_error(self):
+        library = self.output / "_internal" / "libpython.so"
+        with self.assertRaisesRegex(RuntimeError, "cannot process"):
+            process_binary(library, self.cache, [FAIL])
+        self.assertEqual(library.read_bytes(), b"\x7fELF libpython")
+        self.assertEqual(list(self.cache.iterdir()), [])
+
+    def test_optimize_binaries(self):
+        manifest = self.root / "manifests" / "my-tool.json"
+        self.assertIsNone(get_cached_binaries(self.cache, manifest))
+        stats = optimize_binaries(self.output, self.cache, {"strip": APPEND, "upx": APPEND}, ["libqt*"], jobs=2,
+                                  manifest_path=manifest)
+        self.assertEqual(get_cached_binaries(self.cache, manifest), (3, 3))
+
+        self.assertEqual(stats, {"binaries": 3, "cached": 0, "before": 99, "after": 149})
+        self.assertEqual((self.output / "_internal" / "libqt.dylib").read_bytes(), b"\xcf\xfa\xed\xfe qt-processed")
+        self.assertTrue((self.output / "_internal" / "lib" / "_ssl.pyd").read_bytes().endswith(b"-processed" * 2))
+        self.assertEqual((self.output / "my-tool").read_bytes(), b"\x7fELF executable")
+
+    def test_optimize_binaries_default_exclude(self):
+        plugins = self.output / "_internal" / "PyQt6" / "Qt6" / "plugins" / "platforms"
+        plugins.mkdir(parents=True)
+        (plugins / "qwindows.dll").write_bytes(PE_HEADER)
+        (self.output / "_internal" / "VCRUNTIME140.dll").write_bytes(PE_HEADER)
+
+        optimize_binaries(self.output, self.cache, {"upx": APPEND}, jobs=2)
+
+        # PyInstaller never compresses VC runtime & Qt plugins
+        self.assertEqual((plugins / "qwindows.dll").read_bytes(), PE_HEADER)
+        self.assertEqual((self.output / "_internal" / "VCRUNTIME140.dll").read_bytes(), PE_HEADER)
+        self.assertTrue((self.output / "_internal" / "libqt.dylib").read_bytes().endswith(b"-processed"))
@@ -0,0 +1,106 @@
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import types
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from poetry_pyinstaller_plugin.bytecode import (CODE_CACHE_SCRIPT,
+                                                get_environment_roots,
+                                                get_precompiled_modules,
+                                                get_source_stamps, precompile,
+                                                write_bytecode_manifest)
+
+
+class TestPrecompile(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.site_packages = self.root / "site-packages"
+        (self.site_packages / "requests").mkdir(parents=True)
+        (self.site_packages / "requests" / "__init__.py").write_text("from .api import get\n")
+        (self.site_packages / "requests" / "api.py").write_text("def get():\n    assert True\n    return 1\n")
+        (self.site_packages / "broken.py").write_text("def broken(:\n")
+        self.script_path = self.root / "cache" / "precompile.py"
+
+        self.venv = MagicMock()
+        self.venv.run.side_effect = lambda *args: subprocess.check_output([sys.executable, *args[1:]], text=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_precompile(self):
+        stats = precompile(self.venv, [self.site_packages, self.root / "missing"], [0], self.script_path, jobs=2)
+        self.assertEqual(stats, {"compiled": 2, "cached": 0, "failed": 1})
+
+        api = self.site_packages / "requests" / "api.py"
+        with open(importlib.util.cache_from_source(str(api)), "rb") as pyc:
+            header = pyc.read(16)
+        self.assertEqual(header[:4], importlib.util.MAGIC_NUMBER)
+        self.assertEqual(header[8:16], importlib.util.source_hash(api.read_bytes()))
+
+        # Unchanged sources are not compiled again
+        stats = precompile(self.venv, [self.site_packages], [0], self.script_path, jobs=2)
+        self.assertEqual(stats, {"compiled": 0, "cached": 2, "failed": 1})
+
+        # Cache is keyed by source hash & optimization level
+        api.write_text("def get():\n    return 2\n")
+        stats = precompile(self.venv, [self.site_packages], [0, 2], self.script_path, jobs=2)
+        self.assertEqual(stats, {"compiled": 2, "cached": 0, "failed": 1})
+        self.assertTrue(Path(importlib.util.cache_from_source(str(api), optimization=2)).exists())
+        stats = precompile(self.venv, [self.site_packages], [0, 2], self.script_path, jobs=2)
+        self.assertEqual(stats, {"compiled": 0, "cached": 2, "failed": 1})
+
+    def test_bytecode_manifest(self):
+        manifest_path = self.root / "cache" / "bytecode.json"
+        api = self.site_packages / "requests" / "api.py"
+        sources = [api, self.site_packages / "requests" / "__init__.py"]
+        self.assertIsNone(get_precompiled_modules(manifest_path, "lock", [0], sources))
+
+        entry = {"environment": "/venv", "levels": [0, 1], "modules": 40, "sources": get_source_stamps(sources)}
+        write_bytecode_manifest(manifest_path, {"lock": entry})
+        write_bytecode_manifest(manifest_path, {"other": {**entry, "levels": [0]}})
+        self.assertEqual(get_precompiled_modules(manifest_path, "lock", [0, 1], sources),
+                         {"environment": "/venv", "cached": 40, "stale": 0})
+
+        # Changed & added sources are detected from their stamps, levels not compiled by last build are stale
+        api.write_text("def get():\n    return 22\n")
+        stale = get_precompiled_modules(manifest_path, "lock", [0], [*sources, self.site_packages / "broken.py"])
+        self.assertEqual((stale["cached"], stale["stale"]), (38, 2))
+        self.assertIsNone(get_precompiled_modules(manifest_path, "other", [0, 1], sources))
+        self.assertIsNone(get_precompiled_modules(manifest_path, None, [0], sources))
+
+    def test_code_cache_script(self):
+        precompile(self.venv, [self.site_packages], [0], self.script_path, jobs=2)
+        api = str(self.site_packages / "requests" / "api.py")
+        modules = {name: types.ModuleType(name) for name in ["PyInstaller", "PyInstaller.building.utils"]}
+        namespace = {}
+        with patch.dict(sys.modules, modules):
+            exec(CODE_CACHE_SCRIPT, namespace)
+        cached_compile = namespace["_compile"]
+
+        # PyInstaller modules compile with cached bytecode
+        self.assertIs(modules["PyInstaller.building.utils"].compile, cached_compile)
+        self.assertNotIn("compile", vars(modules["PyInstaller"]))
+
+        with patch("builtins.compile", wraps=compile) as mock_compile:
+            source = Path(api).read_bytes()
+            self.assertEqual(cached_compile(source, api, "exec").co_filename, api)
+            self.assertEqual(cached_compile(source.decode(), api, "exec", dont_inherit=True).co_filename, api)
+            mock_compile.assert_not_called()
+
+            # Changed sources, other optimization levels and file names are compiled
+            module = {}
+            exec(cached_compile(b"def get():\n    return 2\n", api, "exec"), module)
+            self.assertEqual(module["get"](), 2)
+            cached_compile(source, api, "exec", optimize=2)
+            cached_compile(source, "<string>", "exec")
+            self.assertEqual(mock_compile.call_count, 3)
+
+    def test_get_environment_roots(self):
+        venv = MagicMock()
+        venv.paths = {"purelib": "/venv/lib/site-packages", "platlib": "/venv/lib/site-packages", "stdlib": "/lib"}
+        self.assertEqual(get_environment_roots(venv), {Path("/venv/lib/site-packages")})
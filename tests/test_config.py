@@ -0,0 +1,187 @@
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from unittest import TestCase, mock
+
+from poetry.factory import Factory
+
+from poetry_pyinstaller_plugin.config import ConfigError, PluginConfig
+
+
+class TestPluginConfig(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "main.py").touch()
+        (self.root / "data").mkdir()
+        (self.root / "data" / "model.bin").touch()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_from_data(self):
+        config = PluginConfig.from_data({
+            "type": "onefile",
+            "strip": True,
+            "pre-build": "hooks:pre_build",
+            "memory-limit": "8G",
+            "targets": {
+                "cli": "main.py",
+                "gui": {"source": "main.py", "type": "onedir", "certifi": {"append": []}, "post-build": "hooks:sign"},
+            },
+        }, self.root)
+
+        self.assertEqual(config.problems, [])
+        self.assertEqual(config.warnings, [])
+        self.assertEqual(config.values["memory-limit"], "8G")
+        self.assertEqual(config.values["precompile"], False)
+        self.assertEqual(list(config.targets), ["cli", "gui"])
+
+        cli, gui = config.targets["cli"], config.targets["gui"]
+        self.assertEqual((cli.get("source"), cli.origins["source"]), ("main.py", "target"))
+        self.assertEqual((cli.get("type"), cli.origins["type"]), ("onefile", "plugin"))
+        self.assertEqual((cli.get("backend"), cli.origins["backend"]), ("pyinstaller", "default"))
+        self.assertEqual((gui.get("type"), gui.origins["type"]), ("onedir", "target"))
+        self.assertEqual(gui.get("strip"), True)
+
+        # Plugin level hooks are not inherited
+        self.assertEqual((cli.get("pre-build"), cli.get("post-build")), (None, None))
+        self.assertEqual(gui.get("post-build"), "hooks:sign")
+
+        # Defaults are not shared between targets
+        self.assertIsNot(cli.get("bundle-wheels"), gui.get("bundle-wheels"))
+        self.assertEqual(cli.to_dict()["options"]["certifi.append"], [])
+
+    def test_problems(self):
+        config = PluginConfig.from_data({
+            "source": "main.py",
+            "memory-limit": "lots",
+            "targets": {
+                "cli": {
+                    "type": "onebig",
+                    "strip": "yes",
+                    "hidden-import": ["requests", 1],
+                    "collect": {"modules": ["a"]},
+                    "smoke": {"timeout": 1, "retries": 2},
+                    "work-dir-size": True,
+                    "noupx": True,
+                    "certifi": {"append": [], "replace": []},
+                },
+                "gui": {"source": "main.py", "certifi": ["ca.crt"], "post-build": "sign"},
+            },
+        }, self.root)
+
+        self.assertEqual(config.errors, [
+            "memory-limit: Invalid size 'lots', expected bytes or value like '512M' or '8G'.",
+            "targets.cli.source: missing required option",
+            "targets.cli.type: 'onebig' not in ['onefile', 'onedir']",
+            "targets.cli.strip: expected boolean, got 'yes'",
+            "targets.cli.hidden-import: expected string items, got ['requests', 1]",
+            "targets.cli.work-dir-size: expected integer or string, got True",
+            "targets.cli.collect: unsupported key(s) ['modules'], not in ['submodules', 'data', 'binaries', 'all']",
+            "targets.cli.smoke: Unsupported smoke test option(s) ['retries'], not in "
+            "['args', 'exit-code', 'timeout', 'runs', 'budget', 'cold-budget'].",
+            "targets.gui.certifi: expected table, got ['ca.crt']",
+            "targets.gui.post-build: Invalid hook 'sign', expected '<module>:<callable>'.",
+        ])
+        self.assertEqual(config.warnings, [
+            "source: unknown option, ignored",
+            "targets.cli.noupx: unknown option, ignored",
+            "targets.cli.certifi.replace: unknown option, ignored",
+        ])
+
+        with self.assertRaises(ConfigError) as exc:
+            config.check()
+        self.assertEqual(exc.exception.problems, config.errors)
+        self.assertIn("10 problem(s):\n  - memory-limit: Invalid size 'lots'", str(exc.exception))
+        self.assertTrue(str(exc.exception).startswith("ValueError: Invalid tool.poetry-pyinstaller-plugin"))
+
+    def test_missing_paths(self):
+        config = PluginConfig.from_data({
+            "targets": {
+                "cli": {
+                    "source": "cli.py",
+                    "icon": "icon.ico",
+                    "include": {"data/*.bin": "data", "data/*.csv": "data", "main.py": "."},
+                    "runtime-hooks": ["hooks/rthook.py"],
+                },
+                "gui": {"source": "main.py", "certifi": {"append": ["ca.crt"]}, "when": "release"},
+            },
+        }, self.root)
+
+        self.assertEqual(config.get_problems(), [
+            f"targets.cli.source: 'cli.py' not found in {self.root}",
+            f"targets.cli.icon: 'icon.ico' not found in {self.root}",
+            f"targets.cli.include: 'data/*.csv' not found in {self.root}",
+            f"targets.cli.runtime-hooks: 'hooks/rthook.py' not found in {self.root}",
+            f"targets.gui.certifi.append: 'ca.crt' not found in {self.root}",
+        ])
+
+        # Paths of skipped targets are ignored, paths are ignored before targets are known
+        self.assertEqual(len(config.get_problems(skipped=["gui"])), 4)
+        self.assertEqual(config.get_problems(["gui"], prefix="api: ")[0],
+                         f"api: targets.cli.source: 'cli.py' not found in {self.root}")
+        config.check(paths=False)
+        config.check(skipped=["cli", "gui"])
+
+    def test_missing_hooks(self):
+        (self.root / "hooks").mkdir()
+        (self.root / "hooks" / "assets.py").write_text("raise RuntimeError('never executed')\n")
+        (self.root / "pyproject.toml").write_text(
+            '[project]\nname = "hooks"\nversion = "0.1.0"\n\n'
+            '[tool.poetry-pyinstaller-plugin]\npre-build = "hooks.assets:generate"\npost-build = "hooks.sign:sign"\n\n'
+            '[tool.poetry-pyinstaller-plugin.targets]\n'
+            'cli = { source = "main.py", post-build = "hooks.assets:sign" }\n'
+            'gui = { source = "main.py", pre-build = { hook = "deploy:upload" }, when = "release" }\n'
+        )
+        config = PluginConfig.from_poetry(Factory().create_poetry(cwd=self.root))
+
+        # Hook modules are looked up in project packages, never loaded
+        self.assertEqual(config.get_problems(), [
+            "post-build: module 'hooks.sign' not found in project",
+            "targets.gui.pre-build: module 'deploy' not found in project",
+        ])
+        self.assertEqual(len(config.get_problems(skipped=["gui"])), 1)
+
+    def test_archive_zstandard(self):
+        data = {"targets": {"cli": {"source": "main.py", "archive": "tar.zst"}, "gui": {"source": "main.py"}}}
+
+        with mock.patch.dict(sys.modules, {"zstandard": None}):
+            config = PluginConfig.from_data(data, self.root)
+        self.assertEqual(config.errors, [
+            "targets.cli.archive: 'tar.zst' archives require 'zstandard' package in Poetry's environment, "
+            "run 'poetry self add zstandard'.",
+        ])
+
+        with mock.patch.dict(sys.modules, {"zstandard": ModuleType("zstandard")}):
+            config = PluginConfig.from_data(data, self.root)
+        self.assertEqual(config.errors, [])
+
+    def test_backend_options(self):
+        config = PluginConfig.from_data({
+            "strip": True,
+            "python-options": [],
+            "targets": {
+                "cli": {"source": "main.py", "backend": "nuitka", "arch": "arm64", "runtime-hooks": ["main.py"]},
+                "gui": {"source": "main.py", "backend": "nuitka", "type": "onefile", "icon": "main.py"},
+                "api": "main.py",
+            },
+        }, self.root)
+
+        # Options ignored by Nuitka are rejected on target, warned about when inherited from plugin section
+        self.assertEqual(config.errors, [
+            "targets.cli.arch: not supported by 'nuitka' backend",
+            "targets.cli.runtime-hooks: not supported by 'nuitka' backend",
+        ])
+        self.assertEqual(config.warnings, [
+            "targets.cli.strip: not supported by 'nuitka' backend, ignored",
+            "targets.gui.strip: not supported by 'nuitka' backend, ignored",
+        ])
+        self.assertEqual([problem.target for problem in config.problems], ["cli", "cli"])
+
+    def test_invalid_section(self):
+        config = PluginConfig.from_data({"targets": ["cli"]}, self.root)
+        self.assertEqual(config.errors, ["targets: expected table, got ['cli']"])
+        self.assertEqual(config.targets, {})
@@ -0,0 +1,163 @@
+import json
+import lzma
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from poetry_pyinstaller_plugin.archive import create_archive
+from poetry_pyinstaller_plugin.delta import (apply_delta, apply_patch,
+                                             create_delta, create_patch,
+                                             get_delta_stats, open_base,
+                                             sha256sum)
+
+
+class TestPatch(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def roundtrip(self, base_data, new_data, block_size=1024):
+        base, new = self.root / "base", self.root / "new"
+        patch, output = self.root / "patch", self.root / "output"
+        new.write_bytes(new_data)
+        if base_data is not None:
+            base.write_bytes(base_data)
+
+        create_patch(base if base_data is not None else None, new, patch, block_size)
+        apply_patch(base if base_data is not None else None, patch, output)
+        self.assertEqual(output.read_bytes(), new_data)
+        return patch.stat().st_size
+
+    def test_changed_blocks(self):
+        base = os.urandom(256 * 1024)
+        new = base[:64 * 1024] + os.urandom(1024) + base[65 * 1024:] + b"appended"
+        size = self.roundtrip(base, new)
+        self.assertLess(size, 4 * 1024)
+
+    def test_shifted_blocks(self):
+        # Blocks following inserted or removed bytes are matched at any offset, as well as last partial block
+        base = os.urandom(64 * 1024 + 100)
+        self.assertLess(self.roundtrip(base, base[:1000] + b"x" + base[1000:]), 2 * 1024)
+        self.assertLess(self.roundtrip(base, base[:1000] + base[1001:]), 2 * 1024)
+        self.assertLess(self.roundtrip(base, b"header" + base[:-100] + b"footer" + base[-100:]), 2 * 1024)
+
+        # Larger changes re-synchronize on blocks following last copied range
+        new = base[:1000] + os.urandom(5000) + base[1000:30000] + base[33333:]
+        self.assertLess(self.roundtrip(base, new), 10 * 1024)
+
+    def test_reordered_blocks(self):
+        base = os.urandom(8 * 1024)
+        new = base[4096:] + base[:4096]
+        self.assertLess(self.roundtrip(base, new), 512)
+
+    def test_without_base(self):
+        self.roundtrip(None, b"new file" * 1000)
+
+    def test_empty_files(self):
+        self.roundtrip(b"", b"")
+        self.roundtrip(b"content", b"")
+
+    def test_invalid_patch(self):
+        patch = self.root / "patch"
+        with lzma.open(patch, "wb") as f:
+            f.write(b"not a patch")
+        with self.assertRaises(ValueError):
+            apply_patch(None, patch, self.root / "output")
+
+        # Copy operations require base file
+        (self.root / "base").write_bytes(b"content")
+        create_patch(self.root / "base", self.root / "base", patch)
+        with self.assertRaises(ValueError):
+            apply_patch(None, patch, self.root / "output")
+
+
+class TestDelta(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.base = self.root / "base"
+        self.new = self.root / "new"
+        self.delta = self.root / "delta"
+
+        library = os.urandom(200 * 1024)
+        self.write(self.base, {
+            "my-tool/my-tool": b"v1",
+            "my-tool/_internal/libpython.so": library,
+            "my-tool/_internal/removed.so": b"removed",
+            "my-tool/_internal/changed.zip": library,
+            "other/other": b"not part of delta",
+        })
+        self.write(self.new, {
+            "my-tool/my-tool": b"v2",
+            "my-tool/_internal/libpython.so": library,
+            "my-tool/_internal/added.so": b"added",
+            "my-tool/_internal/changed.zip": library[:100 * 1024] + b"changed" + library[100 * 1024 + 7:],
+            "onefile": b"onefile",
+        })
+        (self.new / "my-tool" / "my-tool").chmod(0o755)
+        os.symlink("libpython.so", self.new / "my-tool" / "_internal" / "libpython3.so")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, root, files):
+        for name, content in files.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_bytes(content)
+
+    def check_delta(self, base_root):
+        manifest = create_delta(base_root, self.new, ["my-tool", "onefile"], self.delta, jobs=2, block_size=4096)
+
+        files = manifest["files"]
+        self.assertEqual(sorted(files), [
+            "my-tool/_internal/added.so", "my-tool/_internal/changed.zip", "my-tool/_internal/libpython.so",
+            "my-tool/_internal/libpython3.so", "my-tool/my-tool", "onefile",
+        ])
+        self.assertEqual(manifest["removed"], ["my-tool/_internal/removed.so"])
+        self.assertNotIn("patch", files["my-tool/_internal/libpython.so"])
+        self.assertTrue(files["my-tool/_internal/changed.zip"]["base"])
+        self.assertFalse(files["onefile"]["base"])
+        self.assertEqual(files["my-tool/_internal/libpython3.so"], {"link": "libpython.so"})
+        self.assertEqual(files["my-tool/my-tool"]["sha256"], sha256sum(self.new / "my-tool" / "my-tool"))
+        self.assertEqual(json.loads((self.delta / "manifest.json").read_text()), manifest)
+
+        stats = get_delta_stats(self.delta, manifest)
+        self.assertEqual((stats["unchanged"], stats["patched"], stats["added"], stats["removed"]), (1, 2, 2, 1))
+        self.assertLess(stats["delta-size"], 64 * 1024)
+
+        output = self.root / "output"
+        apply_delta(base_root, self.delta, output)
+        for name in files:
+            self.assertEqual((output / name).read_bytes(), (self.new / name).read_bytes())
+        self.assertEqual((output / "my-tool" / "my-tool").stat().st_mode & 0o777, 0o755)
+        self.assertFalse((output / "my-tool" / "_internal" / "removed.so").exists())
+
+    def test_directory(self):
+        with open_base(self.base) as base_root:
+            self.assertEqual(base_root, self.base)
+            self.check_delta(base_root)
+
+    def test_archive(self):
+        archive = self.root / "my-tool.tar.gz"
+        create_archive(self.base / "my-tool", archive, "tar.gz")
+        with open_base(archive) as base_root:
+            self.assertEqual(sorted(p.name for p in base_root.iterdir()), ["my-tool"])
+            self.check_delta(base_root)
+
+    def test_zip_archive(self):
+        archive = self.root / "my-tool.zip"
+        create_archive(self.base / "my-tool", archive, "zip")
+        with open_base(archive) as base_root:
+            self.check_delta(base_root)
+
+    def test_checksum_mismatch(self):
+        create_delta(self.base, self.new, ["my-tool"], self.delta)
+        (self.base / "my-tool" / "_internal" / "libpython.so").write_bytes(b"corrupted")
+        with self.assertRaises(ValueError):
+            apply_delta(self.base, self.delta, self.root / "output")
@@ -0,0 +1,193 @@
+import tempfile
+import textwrap
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from poetry.factory import Factory
+from poetry.utils.env import EnvCommandError
+
+from poetry_pyinstaller_plugin.config import PluginConfig
+from poetry_pyinstaller_plugin.environment import (Environment,
+                                                   get_install_args,
+                                                   get_install_command)
+
+
+class TestFunctions(TestCase):
+
+    def test_get_install_args(self):
+        self.assertEqual(get_install_args(None, None), ("--all-extras", "--all-groups"))
+        self.assertEqual(get_install_args(["main"], None), ("--only", "main", "--all-extras"))
+        self.assertEqual(get_install_args(["main", "build"], []), ("--only", "main,build"))
+        self.assertEqual(get_install_args(None, ["cli", "yaml"]), ("--all-groups", "--extras", "cli yaml"))
+
+    def test_get_install_command(self):
+        self.assertEqual(get_install_command(("--all-extras", "--all-groups")),
+                         ("poetry", "install", "--all-extras", "--all-groups"))
+        self.assertEqual(get_install_command(["--only", "main"]), ("poetry", "sync", "--only", "main"))
+
+        # Poetry 1.x has no 'sync' command
+        with patch("poetry_pyinstaller_plugin.environment.POETRY_SYNC", False):
+            self.assertEqual(get_install_command(["--only", "main"]), ("poetry", "install", "--only", "main", "--sync"))
+
+
+class TestEnvironment(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        self.write_pyproject(wheelhouse="wheelhouse")
+        (self.root / "poetry.lock").write_text("# lock")
+
+        self.patch_platform = patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux")
+        self.patch_platform.start()
+
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+        self.venv = MagicMock()
+        self.venv.version_info = (3, 12, 1)
+        self.venv.run_pip.return_value = "requests==2.32.3\n"
+        self.environment = self.create_environment()
+
+    def tearDown(self):
+        self.patch_platform.stop()
+        self.tmp.cleanup()
+
+    def write_pyproject(self, wheelhouse=None):
+        option = f'wheelhouse = "{wheelhouse}"' if wheelhouse else ""
+        (self.root / "pyproject.toml").write_text(textwrap.dedent(f"""
+        [project]
+        name = "test_package"
+        version = "0.1.0"
+
+        [tool.poetry-pyinstaller-plugin]
+        {option}
+        """))
+
+    def create_environment(self, **kwargs):
+        return Environment(Factory().create_poetry(cwd=self.root), self.io, **kwargs)
+
+    def test_wheelhouse(self):
+        self.assertEqual(self.environment.wheelhouse, self.root / "wheelhouse")
+
+        self.write_pyproject()
+        self.assertIsNone(self.create_environment().wheelhouse)
+
+        # Configuration compiled by commands is used as is
+        config = PluginConfig.from_data({"wheelhouse": "~/wheels"}, self.root)
+        self.assertEqual(self.create_environment(config=config).wheelhouse, Path("~/wheels").expanduser())
+
+    def test_lock_hash(self):
+        lock_hash = self.environment.lock_hash
+        self.assertEqual(len(lock_hash), 64)
+        self.assertNotEqual(self.create_environment(install_args=("--only", "main")).lock_hash, lock_hash)
+
+        (self.root / "poetry.lock").write_text("# updated lock")
+        self.assertNotEqual(self.environment.lock_hash, lock_hash)
+
+        (self.root / "poetry.lock").unlink()
+        self.assertIsNone(self.environment.lock_hash)
+
+    def test_snapshot_path(self):
+        path = self.environment.snapshot_path(self.venv)
+        self.assertEqual(path.parent, self.root / "wheelhouse")
+        self.assertTrue(path.name.endswith("-py312-manylinux"))
+
+        self.write_pyproject()
+        self.assertIsNone(self.create_environment().snapshot_path(self.venv))
+
+    def test_install(self):
+        self.environment.install(self.venv)
+        self.venv.run.assert_called_with("poetry", "install", "--all-extras", "--all-groups", cwd=self.root)
+
+    def test_provision_without_snapshot(self):
+        self.environment.provision(self.venv)
+
+        self.venv.run.assert_called_with("poetry", "install", "--all-extras", "--all-groups", cwd=self.root)
+        snapshot = self.environment.snapshot_path(self.venv)
+        self.venv.run_pip.assert_any_call("freeze", "--exclude-editable")
+        self.assertEqual((snapshot / "requirements.txt").read_text(), "requests==2.32.3\n")
+        self.assertEqual([p.name for p in snapshot.parent.iterdir()], [snapshot.name])
+        self.assertTrue(self.environment.is_restored(snapshot))
+
+    def test_provision_with_snapshot(self):
+        snapshot = self.environment.snapshot_path(self.venv)
+        snapshot.mkdir(parents=True)
+
+        # Snapshots of another lock file or dependency selection are never restored
+        self.environment.provision(self.venv)
+
+        self.venv.run_pip.assert_not_called()
+        self.venv.run.assert_called_with("poetry", "install", "--all-extras", "--all-groups", cwd=self.root)
+
+    def test_provision_with_matching_snapshot(self):
+        snapshot = self.environment.snapshot_path(self.venv)
+        snapshot.mkdir(parents=True)
+        (snapshot / "fingerprint").write_text(f"{self.environment.lock_hash}\n")
+
+        # Locked requirements are restored, 'poetry install' still installs project & editable path dependencies
+        self.environment.provision(self.venv)
+        self.venv.run_pip.assert_called_once_with(
+            "install", "--no-index", "--no-deps", "--find-links", str(snapshot),
+            "-r", str(snapshot / "requirements.txt")
+        )
+        self.venv.run.assert_called_once_with("poetry", "install", "--all-extras", "--all-groups", cwd=self.root)
+
+        # Snapshot of another dependency selection sharing hash prefix
+        dedicated = self.create_environment(install_args=("--only", "main"))
+        self.assertFalse(dedicated.is_restored(snapshot))
+        (snapshot / "fingerprint").unlink()
+        self.assertFalse(self.environment.is_restored(snapshot))
+
+    def test_provision_no_wheelhouse(self):
+        self.write_pyproject()
+        self.create_environment().provision(self.venv)
+        self.venv.run_pip.assert_not_called()
+
+    def test_snapshot_error(self):
+        self.environment.warning = MagicMock()
+        self.venv.run_pip.side_effect = EnvCommandError(MagicMock(returncode=1, output="error"))
+        snapshot = self.environment.snapshot_path(self.venv)
+
+        self.environment.snapshot(self.venv, snapshot)
+
+        self.environment.warning.assert_called()
+        self.assertFalse(snapshot.exists())
+        self.assertEqual(list(snapshot.parent.iterdir()), [])
+
+    def test_dedicated(self):
+        self.assertFalse(self.environment.dedicated)
+        self.assertTrue(self.create_environment(install_args=("--only", "main")).dedicated)
+
+    def test_dedicated_path(self):
+        environment = self.create_environment(install_args=("--only", "main"))
+        path = environment.dedicated_path(self.venv)
+        self.assertEqual(path.parent, self.root / "build" / ".cache" / "envs")
+        self.assertTrue(path.name.endswith("-py312"))
+
+        other = self.create_environment(install_args=("--only", "main,build"))
+        self.assertNotEqual(other.dedicated_path(self.venv), path)
+
+    @patch("poetry_pyinstaller_plugin.environment.EnvManager")
+    def test_get(self, mock_env_manager):
+        mock_env_manager.return_value.create_venv.return_value = self.venv
+        self.assertEqual(self.environment.get(), self.venv)
+        mock_env_manager.build_venv.assert_not_called()
+
+    @patch("poetry_pyinstaller_plugin.environment.VirtualEnv")
+    @patch("poetry_pyinstaller_plugin.environment.EnvManager")
+    def test_get_dedicated(self, mock_env_manager, mock_virtual_env):
+        mock_env_manager.return_value.create_venv.return_value = self.venv
+        self.venv.python = "/usr/bin/python3"
+        environment = self.create_environment(install_args=("--only", "main"))
+        path = environment.dedicated_path(self.venv)
+
+        environment.get()
+        mock_env_manager.build_venv.assert_called_once_with(path, executable=Path("/usr/bin/python3"), with_pip=True)
+        mock_virtual_env.assert_called_with(path)
+
+        # Reused once created
+        path.mkdir(parents=True)
+        (path / "pyvenv.cfg").write_text("")
+        environment.get()
+        mock_env_manager.build_venv.assert_called_once()
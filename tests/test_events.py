@@ -0,0 +1,81 @@
+import json
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase, skipIf
+from unittest.mock import MagicMock
+
+from poetry_pyinstaller_plugin.events import EventStream
+
+
+class TestEventStream(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_file(self):
+        path = Path(self.tmp.name, "logs", "events.jsonl")
+        stream = EventStream.open(str(path))
+        stream.emit("target-started", target="my-tool", error=None, output=Path("dist/my-tool"))
+        stream.close()
+        self.assertTrue(stream.closed)
+
+        # Closed stream ignores events, streams append to existing file
+        stream.emit("ignored")
+        stream = EventStream.open(str(path))
+        stream.emit("target-finished", duration=1.5)
+        stream.close()
+
+        events = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual([event["event"] for event in events], ["target-started", "target-finished"])
+        self.assertEqual(events[0]["output"], str(Path("dist/my-tool")))
+        self.assertNotIn("error", events[0])
+        self.assertEqual(sorted(events[1]), ["duration", "event", "pid", "time"])
+        self.assertEqual(stream.emitted, 1)
+
+    @skipIf(sys.platform == "win32", "Unix sockets")
+    def test_socket(self):
+        path = Path(self.tmp.name, "events.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(str(path))
+        server.listen(1)
+
+        received = []
+
+        def collect():
+            connection, _ = server.accept()
+            with connection, connection.makefile("r") as lines:
+                received.extend(json.loads(line) for line in lines)
+
+        collector = threading.Thread(target=collect)
+        collector.start()
+        stream = EventStream.open(f"unix:{path}")
+        stream.emit("build-started", project="my-project")
+        stream.emit("build-finished", status="success")
+        stream.close()
+        collector.join(5)
+
+        events = [(event["event"], len(event)) for event in received]
+        self.assertEqual(events, [("build-started", 4), ("build-finished", 4)])
+
+    @skipIf(sys.platform == "win32", "Unix sockets")
+    def test_socket_closed_by_reader(self):
+        with self.assertRaises(OSError):
+            EventStream.open(f"unix:{Path(self.tmp.name, 'missing.sock')}")
+
+        reader, writer = socket.socketpair()
+        stream = EventStream("unix:collector", MagicMock())
+        stream._socket = writer
+        stream.warning = MagicMock()
+        reader.close()
+
+        # Build goes on once collector is gone
+        stream.emit("target-started")
+        self.assertTrue(stream.closed)
+        self.assertIn("Event stream unix:collector closed", stream.warning.call_args.args[0])
+        stream.emit("target-finished")
+        stream.warning.assert_called_once()
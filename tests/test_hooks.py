@@ -1,12 +1,17 @@
+import asyncio
 import os
+import tempfile
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Callable
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 from poetry_pyinstaller_plugin import PluginHook
-from poetry_pyinstaller_plugin.hooks import PostHook, PreHook
+from poetry_pyinstaller_plugin.hooks import (PostHook, PreHook,
+                                             get_fingerprint, get_hook_spec,
+                                             get_memoize_declarations)
 
 
 class TestPluginHook(TestCase):
@@ -23,7 +28,7 @@ class TestPluginHook(TestCase):
     @classmethod
     def tearDownClass(cls):
         cls.patch_platform.stop()
-        cls.mock_base_module_path.stop()
+        cls.patch_base_module_path.stop()
 
     def setUp(self):
         self.hook = PluginHook(application=MagicMock(),
@@ -65,6 +70,44 @@ class TestPluginHook(TestCase):
         msg = f"<info>Running<info> {self.hook.type}-build hook <debug>'test_package.main:hello_world'</debug>"
         self.hook.log.assert_called_with(msg)
 
+    def test__exec_result(self):
+        self.hook.log = MagicMock()
+        self.assertEqual(self.hook._exec(MagicMock()), "hello world")
+        self.assertEqual(self.hook.result, "hello world")
+        self.assertGreaterEqual(self.hook.duration, 0)
+
+    def test__exec_coroutine(self):
+        async def hook(plugin_hook):
+            outputs = await asyncio.gather(plugin_hook.run_async("sign", "a"), plugin_hook.run_async("sign", "b"))
+            return sorted(outputs)
+
+        venv = MagicMock()
+        venv.run.side_effect = lambda command, *args: f"{command} {' '.join(args)}"
+        self.hook.log = MagicMock()
+        self.hook.debug = MagicMock()
+        self.hook._hook = hook
+        self.assertEqual(self.hook._exec(venv), ["sign a", "sign b"])
+        self.assertEqual(self.hook.result, ["sign a", "sign b"])
+
+    def test__exec_error(self):
+        self.hook.log = MagicMock()
+        self.hook._hook = MagicMock(side_effect=RuntimeError("failed"))
+        with self.assertRaises(RuntimeError):
+            self.hook._exec(MagicMock())
+        self.assertIsNotNone(self.hook.duration)
+
+    def test_submit(self):
+        self.hook.log = MagicMock()
+        with ThreadPoolExecutor() as executor:
+            future = self.hook.submit(executor, MagicMock())
+        self.assertEqual(future.result(), "hello world")
+
+    def test_description(self):
+        description = f"{self.hook.type}-build hook <debug>'test_package.main:hello_world'</debug>"
+        self.assertEqual(self.hook.description, description)
+        self.hook.target = MagicMock(prog="my-tool")
+        self.assertEqual(self.hook.description, f"{description} of <c1>my-tool</c1>")
+
     def test__exec_no_callable(self):
         venv = MagicMock()
         self.hook.warning = MagicMock()
@@ -140,3 +183,160 @@ class TestPostHook(TestPluginHook):
 
     def test_type(self):
         self.assertEqual(self.hook.type, "post")
+
+
+HOOKS_MODULE = textwrap.dedent("""
+from pathlib import Path
+
+from poetry_pyinstaller_plugin import memoize
+
+
+def _record(hook, name):
+    root = hook.poetry.pyproject_path.parent
+    with open(root / "calls.txt", "a") as f:
+        f.write(name + "\\n")
+    return root
+
+
+@memoize(inputs=["assets/*.svg"], outputs=["generated"])
+def generate(hook):
+    root = _record(hook, "generate")
+    (root / "generated").mkdir(exist_ok=True)
+    for svg in (root / "assets").glob("*.svg"):
+        (root / "generated" / f"{svg.stem}.png").write_text(svg.read_text())
+    return "generated"
+
+
+def plain(hook):
+    _record(hook, "plain")
+""")
+
+
+class TestMemoizedHook(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "hooks").mkdir()
+        (self.root / "hooks" / "assets.py").write_text(HOOKS_MODULE)
+        (self.root / "assets").mkdir()
+        (self.root / "assets" / "logo.svg").write_text("<svg/>")
+
+        self.patchers = [
+            patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="linux"),
+            patch("poetry_pyinstaller_plugin.utils.get_base_modules_path", return_value=[self.root]),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+        self.app = MagicMock()
+        self.app.poetry.pyproject_path = self.root / "pyproject.toml"
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmp.cleanup()
+
+    @property
+    def calls(self):
+        path = self.root / "calls.txt"
+        return path.read_text().split() if path.exists() else []
+
+    def run_hook(self, spec, target=None):
+        hook = PreHook.from_spec(self.app, spec, target=target)
+        hook.log = MagicMock()
+        hook._exec(MagicMock())
+        return hook
+
+    def test_get_hook_spec(self):
+        self.assertEqual(get_hook_spec("hooks.assets:plain"),
+                         {"hook": "hooks.assets:plain", "inputs": [], "outputs": []})
+        self.assertEqual(get_hook_spec({"hook": "hooks.assets:plain", "inputs": ["*.svg"]}),
+                         {"hook": "hooks.assets:plain", "inputs": ["*.svg"], "outputs": []})
+        with self.assertRaises(ValueError):
+            get_hook_spec({"hook": "hooks.assets:plain", "input": ["*.svg"]})
+        with self.assertRaises(ValueError):
+            get_hook_spec({"inputs": ["*.svg"]})
+
+    def test_deferred_loading(self):
+        hook = PreHook.from_spec(self.app, "hooks.does_not_exist:hook")
+        with self.assertRaises(RuntimeError):
+            hook._exec(MagicMock())
+
+    def test_not_memoized(self):
+        self.run_hook("hooks.assets:plain")
+        hook = self.run_hook("hooks.assets:plain")
+        self.assertFalse(hook.cached)
+        self.assertEqual(self.calls, ["plain", "plain"])
+
+    def test_memoize_decorator(self):
+        hook = self.run_hook("hooks.assets:generate")
+        self.assertEqual((hook.result, hook.cached), ("generated", False))
+        self.assertEqual(hook.inputs, ["assets/*.svg"])
+
+        hook = self.run_hook("hooks.assets:generate")
+        self.assertTrue(hook.cached)
+        self.assertIsNone(hook.duration)
+        hook.log.assert_called_with(
+            "<info>Skipping</info> pre-build hook <debug>'hooks.assets:generate'</debug>, inputs & outputs unchanged")
+        self.assertEqual(self.calls, ["generate"])
+
+        # Changed input, removed output and per-target hook are run again
+        (self.root / "assets" / "icon.svg").write_text("<svg></svg>")
+        self.assertFalse(self.run_hook("hooks.assets:generate").cached)
+        (self.root / "generated" / "icon.png").unlink()
+        self.assertFalse(self.run_hook("hooks.assets:generate").cached)
+        self.assertFalse(self.run_hook("hooks.assets:generate", target=MagicMock(prog="my-tool")).cached)
+        self.assertEqual(self.calls, ["generate"] * 4)
+
+    def test_is_cached(self):
+        self.assertFalse(PreHook.from_spec(self.app, "hooks.assets:generate").is_cached())
+        self.run_hook("hooks.assets:generate")
+        self.assertTrue(PreHook.from_spec(self.app, "hooks.assets:generate").is_cached())
+        self.assertFalse(PreHook.from_spec(self.app, "hooks.assets:plain").is_cached())
+
+        # Prediction does not run hook, nor load its module
+        self.assertEqual(self.calls, ["generate"])
+        source = self.root / "hooks" / "assets.py"
+        source.write_text("raise RuntimeError('import')\n" + HOOKS_MODULE)
+        hook = PreHook.from_spec(self.app, "hooks.assets:generate")
+        hook._get_callable = MagicMock()
+        self.assertFalse(hook.is_cached())
+        self.assertEqual((hook.inputs, hook.outputs), (["assets/*.svg"], ["generated"]))
+        hook._get_callable.assert_not_called()
+
+        # Missing & invalid modules are never cached
+        self.assertFalse(PreHook.from_spec(self.app, "hooks.missing:generate").is_cached())
+        source.write_text("def generate(:\n")
+        self.assertFalse(PreHook.from_spec(self.app, "hooks.assets:generate").is_cached())
+
+    def test_get_memoize_declarations(self):
+        self.assertEqual(get_memoize_declarations(HOOKS_MODULE, "generate"), (["assets/*.svg"], ["generated"]))
+        self.assertEqual(get_memoize_declarations(HOOKS_MODULE, "plain"), ([], []))
+        source = "import poetry_pyinstaller_plugin as p\n@p.memoize(['*.svg'])\nasync def hook(h):\n    pass\n"
+        self.assertEqual(get_memoize_declarations(source, "hook"), (["*.svg"], []))
+        # Declarations built at runtime are unknown
+        source = "INPUTS = ['*.svg']\n@memoize(inputs=INPUTS)\ndef hook(h):\n    pass\n"
+        self.assertEqual(get_memoize_declarations(source, "hook"), ([], []))
+
+    def test_memoize_spec(self):
+        spec = {"hook": "hooks.assets:plain", "inputs": ["assets/*.svg"]}
+        self.run_hook(spec)
+
+        # Hook module is not loaded when declared inputs are unchanged
+        hook = PreHook.from_spec(self.app, spec)
+        hook.log = MagicMock()
+        hook._get_callable = MagicMock()
+        hook._exec(MagicMock())
+        self.assertTrue(hook.cached)
+        hook._get_callable.assert_not_called()
+        self.assertEqual(self.calls, ["plain"])
+
+    def test_get_fingerprint(self):
+        source = self.root / "hooks" / "assets.py"
+        fingerprint = get_fingerprint(self.root, ["assets/*.svg"], ["generated"], source)
+        self.assertEqual(get_fingerprint(self.root, ["assets/*.svg"], ["generated"], source), fingerprint)
+        self.assertNotEqual(get_fingerprint(self.root, ["assets/*.png"], ["generated"], source), fingerprint)
+
+        source.write_text(HOOKS_MODULE + "\n# changed\n")
+        self.assertNotEqual(get_fingerprint(self.root, ["assets/*.svg"], ["generated"], source), fingerprint)
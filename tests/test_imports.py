@@ -0,0 +1,165 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from poetry_pyinstaller_plugin.imports import (ImportGraph,
+                                               get_affected_targets)
+
+
+class TestImportGraph(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        self.files = {
+            "pkg/__init__.py": "",
+            "pkg/main.py": "from pkg import cli\nfrom .utils import helper\n",
+            "pkg/cli.py": "import argparse\nimport pkg.commands.run\n",
+            "pkg/utils.py": "def helper(): pass\n",
+            "pkg/commands/__init__.py": "from . import run\n",
+            "pkg/commands/run.py": "from ..utils import helper\n",
+            "pkg/other.py": "import json\n",
+            "pkg/__pycache__/main.py": "import ignored\n",
+        }
+        for name, content in self.files.items():
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_text(content)
+        self.cache_path = self.root / "build" / ".cache" / "import-graph.json"
+        self.graph = ImportGraph([self.root], self.cache_path)
+        self.graph.update()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_module_name(self):
+        self.assertEqual(self.graph.module_name(self.root / "pkg" / "main.py"), "pkg.main")
+        self.assertEqual(self.graph.module_name(self.root / "pkg" / "__init__.py"), "pkg")
+        self.assertEqual(self.graph.module_name(self.root / "pkg" / "data.json"), None)
+        self.assertEqual(self.graph.module_name(Path("/elsewhere/main.py")), None)
+
+    def test_modules(self):
+        self.assertEqual(set(self.graph.modules), {
+            "pkg", "pkg.main", "pkg.cli", "pkg.utils", "pkg.commands", "pkg.commands.run", "pkg.other"
+        })
+
+    def test_imports(self):
+        self.assertEqual(self.graph.imports(self.root / "pkg" / "main.py"),
+                         ["pkg", "pkg.cli", "pkg.utils", "pkg.utils.helper"])
+        self.assertEqual(self.graph.imports(self.root / "pkg" / "commands" / "__init__.py"),
+                         ["pkg", "pkg.commands", "pkg.commands.run"])
+        self.assertEqual(self.graph.imports(self.root / "pkg" / "commands" / "run.py"),
+                         ["pkg", "pkg.utils", "pkg.utils.helper"])
+
+    def test_imports_syntax_error(self):
+        (self.root / "pkg" / "broken.py").write_text("import (")
+        self.assertEqual(self.graph.imports(self.root / "pkg" / "broken.py"), [])
+
+    def test_closure(self):
+        closure = self.graph.closure(self.root / "pkg" / "main.py")
+        self.assertTrue({"pkg.main", "pkg.cli", "pkg.commands.run", "pkg.utils", "argparse"} <= closure)
+        self.assertNotIn("pkg.other", closure)
+
+        closure = self.graph.closure(self.root / "pkg" / "main.py", ["pkg.other"])
+        self.assertIn("json", closure)
+
+    def test_closure_external_source(self):
+        script = self.root / "script.py"
+        script.write_text("import pkg.other\n")
+        graph = ImportGraph([self.root / "pkg"])
+        self.assertIn("pkg.other", ImportGraph([self.root]).closure(script))
+        self.assertNotIn("json", graph.closure(script))
+
+    def test_cache(self):
+        data = json.loads(self.cache_path.read_text())
+        self.assertEqual(data["version"], ImportGraph.CACHE_VERSION)
+        self.assertIn(str(self.root / "pkg" / "main.py"), data["files"])
+
+        graph = ImportGraph([self.root], self.cache_path)
+        with patch.object(ImportGraph, "_parse") as mock_parse:
+            graph.update()
+            mock_parse.assert_not_called()
+
+            (self.root / "pkg" / "other.py").write_text("import os, sys\n")
+            mock_parse.return_value = {"os", "sys"}
+            graph.update()
+            mock_parse.assert_called_once_with(self.root / "pkg" / "other.py")
+
+    def test_cache_removed_files(self):
+        (self.root / "pkg" / "other.py").unlink()
+        self.graph.update()
+        data = json.loads(self.cache_path.read_text())
+        self.assertNotIn(str(self.root / "pkg" / "other.py"), data["files"])
+
+
+class TestAffectedTargets(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        for name, content in {
+            "pkg/__init__.py": "",
+            "pkg/main.py": "from pkg import utils\n",
+            "pkg/utils.py": "",
+            "pkg/other.py": "",
+            "pkg/plugins/extra.py": "",
+        }.items():
+            (self.root / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / name).write_text(content)
+
+        self.poetry = MagicMock()
+        self.poetry.pyproject_path = self.root / "pyproject.toml"
+
+        self.patch_base_module_path = patch("poetry_pyinstaller_plugin.utils.get_base_modules_path")
+        self.mock_base_module_path = self.patch_base_module_path.start()
+        self.mock_base_module_path.return_value = [self.root]
+
+        self.main = self._target("main", "pkg/main.py")
+        self.other = self._target("other", "pkg/other.py", watch_paths=[self.root / "data"])
+        self.plugins = self._target("plugins", "pkg/other.py", collect={"submodules": ["pkg.plugins"]})
+        self.targets = [self.main, self.other, self.plugins]
+
+    def tearDown(self):
+        self.patch_base_module_path.stop()
+        self.tmp.cleanup()
+
+    def _target(self, prog, source, watch_paths=None, hidden_import=None, collect=None):
+        target = MagicMock()
+        target.prog = prog
+        target.source = self.root / source
+        target.watch_paths = [self.root / source, *(watch_paths or [])]
+        target.hidden_import = hidden_import
+        target.collect_config = collect or {}
+        return target
+
+    def affected(self, *paths):
+        changes = {self.root / path for path in paths}
+        return [t.prog for t in get_affected_targets(self.poetry, self.targets, changes)]
+
+    def test_project_files(self):
+        self.assertEqual(self.affected("pyproject.toml"), ["main", "other", "plugins"])
+        self.assertEqual(self.affected("poetry.lock"), ["main", "other", "plugins"])
+
+    def test_owned_paths(self):
+        self.assertEqual(self.affected("data/file.txt"), ["other"])
+
+    def test_import_closure(self):
+        self.assertEqual(self.affected("pkg/utils.py"), ["main"])
+        self.assertEqual(self.affected("pkg/__init__.py"), ["main", "other", "plugins"])
+        self.assertEqual(self.affected("README.md"), [])
+
+    def test_collected_modules(self):
+        self.assertEqual(self.affected("pkg/plugins/extra.py"), ["plugins"])
+
+    def test_hidden_imports(self):
+        self.main.hidden_import = "pkg.other"
+        self.assertEqual(self.affected("pkg/other.py"), ["main", "other", "plugins"])
+
+    def test_deleted_module(self):
+        (self.root / "pkg" / "utils.py").unlink()
+        self.assertEqual(self.affected("pkg/utils.py"), ["main"])
+
+    def test_cache_written(self):
+        self.affected("pkg/utils.py")
+        self.assertTrue((self.root / "build" / ".cache" / "import-graph.json").exists())
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from poetry_pyinstaller_plugin.importtime import (get_config_only_modules,
+                                                  iter_nodes,
+                                                  parse_importtime, rank)
+
+OUTPUT = """\
+[PYI-123:DEBUG] unrelated bootloader output
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | encodings
+import time:        50 |         50 |     urllib3.util
+import time:       200 |        250 |   urllib3
+import time:        80 |         80 |   idna
+import time:      1000 |       1330 | requests
+import time:       700 |        700 | my_plugin
+import time:       900 |        900 | my_plugin.extra
+"""
+
+
+class TestImportTime(TestCase):
+
+    def test_parse(self):
+        roots = parse_importtime(OUTPUT)
+        self.assertEqual([root.name for root in roots], ["encodings", "requests", "my_plugin", "my_plugin.extra"])
+
+        encodings, requests = roots[:2]
+        self.assertEqual([child.name for child in encodings.children], ["_io"])
+        self.assertEqual([child.name for child in requests.children], ["urllib3", "idna"])
+        self.assertEqual(requests.children[0].children[0].name, "urllib3.util")
+        self.assertEqual((requests.self_us, requests.cumulative_us), (1000, 1330))
+        self.assertEqual(len(list(iter_nodes(roots))), 8)
+
+        self.assertEqual(requests.to_dict()["children"][0], {
+            "name": "urllib3", "self": 200, "cumulative": 250,
+            "children": [{"name": "urllib3.util", "self": 50, "cumulative": 50, "children": []}],
+        })
+
+    def test_parse_no_output(self):
+        self.assertEqual(parse_importtime("Hello world!\n"), [])
+
+    def test_rank(self):
+        roots = parse_importtime(OUTPUT)
+        self.assertEqual([node.name for node in rank(roots, 3)], ["requests", "my_plugin.extra", "my_plugin"])
+        self.assertEqual([node.name for node in rank(roots, 2, key="self_us")], ["requests", "my_plugin.extra"])
+
+    def test_config_only_modules(self):
+        roots = parse_importtime(OUTPUT)
+        closure = {"requests", "urllib3", "urllib3.util", "idna"}
+        modules = get_config_only_modules(roots, closure, ["idna", "my_plugin"], ["my_plugin"])
+        self.assertEqual([node.name for node in modules], ["my_plugin", "my_plugin.extra"])
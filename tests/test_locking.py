@@ -0,0 +1,90 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from poetry_pyinstaller_plugin.locking import FileLock, publish
+
+
+class TestFileLock(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lock(self):
+        path = self.root / ".locks" / "tool.lock"
+        events = []
+
+        def hold(name):
+            with FileLock(path):
+                events.append(f"enter {name}")
+                time.sleep(0.05)
+                events.append(f"exit {name}")
+
+        threads = [threading.Thread(target=hold, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(path.exists())
+        self.assertEqual([event.split()[0] for event in events], ["enter", "exit", "enter", "exit"])
+        self.assertEqual(events[0].split()[1], events[1].split()[1])
+
+    def test_release_unlocked(self):
+        lock = FileLock(self.root / "tool.lock")
+        lock.release()
+        with lock:
+            pass
+        lock.release()
+
+
+class TestPublish(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.scratch = self.root / "scratch"
+        self.dist = self.root / "dist"
+        self.scratch.mkdir()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def create_dir(self, name, *files):
+        path = self.scratch / name
+        path.mkdir()
+        for file in files:
+            (path / file).write_text(file)
+        return path
+
+    def test_publish_new(self):
+        publish(self.create_dir("tool", "a"), self.dist / "tool")
+        self.assertEqual((self.dist / "tool" / "a").read_text(), "a")
+        self.assertEqual(list(self.scratch.iterdir()), [])
+
+    def test_publish_replace_dir(self):
+        publish(self.create_dir("tool", "a", "b"), self.dist / "tool")
+        publish(self.create_dir("tool", "c"), self.dist / "tool")
+        self.assertEqual([p.name for p in (self.dist / "tool").iterdir()], ["c"])
+        self.assertEqual([p.name for p in self.dist.iterdir()], ["tool"])
+
+    def test_publish_replace_file(self):
+        self.dist.mkdir()
+        (self.dist / "tool").write_text("old")
+        (self.scratch / "tool").write_text("new")
+        publish(self.scratch / "tool", self.dist / "tool")
+        self.assertEqual((self.dist / "tool").read_text(), "new")
+
+        # onefile target turned into onedir target, and back
+        publish(self.create_dir("tool", "a"), self.dist / "tool")
+        self.assertTrue((self.dist / "tool" / "a").exists())
+        (self.scratch / "tool").write_text("file")
+        publish(self.scratch / "tool", self.dist / "tool")
+        self.assertEqual((self.dist / "tool").read_text(), "file")
+        self.assertEqual([p.name for p in self.dist.iterdir()], ["tool"])
@@ -1,11 +1,25 @@
-from unittest import TestCase
-from unittest.mock import MagicMock
+import json
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipIf
+from unittest.mock import MagicMock, patch
 
 from poetry.console.application import Application
+from poetry.factory import Factory
 
 from poetry_pyinstaller_plugin import __version__
+from poetry_pyinstaller_plugin.config import ConfigError
+from poetry_pyinstaller_plugin.environment import INSTALL_ARGS
+from poetry_pyinstaller_plugin.events import EventStream
 from poetry_pyinstaller_plugin.plugin import (PyInstallerBuildCommand,
-                                              PyInstallerShowCommand)
+                                              PyInstallerConfigCommand,
+                                              PyInstallerPlanCommand,
+                                              PyInstallerProfileImportsCommand,
+                                              PyInstallerShowCommand,
+                                              PyInstallerWatchCommand)
+from poetry_pyinstaller_plugin.smoke import SmokeConfig
+from poetry_pyinstaller_plugin.workspace import load_project
 
 
 class TestPyInstallerShowCommand(TestCase):
@@ -25,9 +39,674 @@ class TestPyInstallerBuildCommand(TestCase):
     def test_handle_no_build(self):
         io = MagicMock()
         io.is_debug = MagicMock(return_value=False)
+        io.input.has_option.return_value = False
         app = Application()
         command = PyInstallerBuildCommand(app)
         command._io = io
         return_code = command.handle()
         self.assertEqual(return_code, 0)
         io.write_line.assert_called_with(f'<fg=yellow;options=bold>No targets definition found, nothing to build with pyinstaller.</>')
+
+    @patch("poetry_pyinstaller_plugin.plugin.PyInstallerBuildCommand._create_venv")
+    def test_handle_no_events(self, mock_venv):
+        mock_venv.return_value.version_info = (3, 12)
+        io = MagicMock()
+        io.is_debug = MagicMock(return_value=False)
+        io.input.has_option.return_value = False
+        command = PyInstallerBuildCommand(Application())
+        command._io = io
+        command.event_stream = MagicMock(wraps=command.event_stream)
+
+        # Without '--events', no stream is opened
+        with (tempfile.TemporaryDirectory() as tmp,
+              patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=Path(tmp)),
+              patch("poetry_pyinstaller_plugin.plugin.EventStream.open") as mock_open):
+            self.assertEqual(command.handle(), 0)
+        mock_open.assert_not_called()
+        command.event_stream.assert_called_once()
+        self.assertIsNone(command.events)
+
+
+class TestPyInstallerPlanCommand(TestCase):
+
+    def setUp(self):
+        self.patchers = [
+            patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux"),
+            patch("poetry_pyinstaller_plugin.plugin.PreHook"),
+            patch("poetry_pyinstaller_plugin.plugin.PostHook"),
+        ]
+        _, self.mock_pre_hook, self.mock_post_hook = [patcher.start() for patcher in self.patchers]
+        self.mock_pre_hook.from_spec.return_value.is_cached.return_value = False
+
+        self.options = {"json": False, "output": None, "changed-since": None}
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+        self.io.input.option.side_effect = lambda name: self.options[name]
+
+        app = MagicMock()
+        app.poetry = Factory().create_poetry(cwd=Path("test_project"))
+        app._io = self.io
+        self.command = PyInstallerPlanCommand(app)
+        self.command.pre_build_hook.name = "hooks.pyinstaller:pre_build"
+        self.command.post_build_hook.name = "hooks.pyinstaller:post_build"
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_get_plan(self):
+        plan = self.command.get_plan()
+        dist_path = Path("dist", "pyinstaller", "manylinux").resolve()
+
+        self.assertEqual(plan["platform"], "manylinux")
+        self.assertEqual(plan["pre-build"], "hooks.pyinstaller:pre_build")
+        self.assertEqual(plan["post-build"], "hooks.pyinstaller:post_build")
+        self.assertEqual([t["name"] for t in plan["targets"]], ["my-tool", "my-tool-2", "my-tool-3-0.1.0"])
+
+        target = plan["targets"][1]
+        self.assertEqual(target["type"], "onedir")
+        self.assertIsNone(target["skipped"])
+        self.assertEqual(target["output"], str(dist_path / "my-tool-2"))
+        self.assertEqual(target["executable"], str(dist_path / "my-tool-2" / "my-tool-2"))
+        self.assertIsNone(target["archive"])
+        source = str(Path("test_project", "test_package", "main.py").resolve())
+        self.assertEqual(target["command"][:3], ["pyinstaller", source, "--onedir"])
+        self.assertEqual((target["cached"], target["cached-binaries"]), ([], None))
+        self.assertEqual((plan["prepared"], plan["cached"], plan["bytecode"]), (False, [], None))
+
+        target = plan["targets"][2]
+        self.assertEqual(target["skipped"], "on prerelease only")
+        self.assertEqual(target["output"], str(dist_path / "my-tool-3-0.1.0"))
+        self.assertEqual(target["archive"], str(dist_path / "my-tool-3-0.1.0.tar.gz"))
+        self.assertIsNone(target["pre-build"])
+        self.assertEqual(target["post-build"], "hooks.pyinstaller:sign")
+
+    @patch("poetry_pyinstaller_plugin.plugin.get_commands", return_value={"strip": ["strip"]})
+    @patch("poetry_pyinstaller_plugin.plugin.ReadyMarker")
+    def test_get_plan_cached(self, mock_marker, _):
+        tool, tool_2 = self.command.targets[:2]
+        tool_2.pre_build = "hooks.pyinstaller:generate"
+        tool_2.optimize_binaries = True
+        mock_marker.from_poetry.return_value.is_valid.return_value = False
+        self.mock_pre_hook.from_spec.return_value.is_cached.return_value = True
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp, "binaries")
+            manifest = tool_2.get_binaries_manifest_path(cache_path)
+            manifest.parent.mkdir(parents=True)
+            manifest.write_text(json.dumps({"keys": ["a" * 64, "b" * 64]}))
+            (cache_path / ("a" * 64)).touch()
+            with patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=Path(tmp)):
+                plan = self.command.get_plan()
+
+        # Memoized pre-build hooks are skipped, binaries of last build are served from cache
+        self.assertEqual(plan["cached"], ["pre-build"])
+        self.assertEqual(plan["targets"][0]["cached"], [])
+        self.assertEqual(plan["targets"][1]["cached"], ["pre-build"])
+        self.assertEqual(plan["targets"][1]["cached-binaries"], {"cached": 1, "total": 2})
+        self.assertIsNone(plan["targets"][0]["cached-binaries"])
+
+        # Prepared environments skip install, certificates & pre-build hooks
+        mock_marker.from_poetry.return_value.is_valid.return_value = True
+        self.mock_pre_hook.from_spec.return_value.is_cached.return_value = False
+        plan = self.command.get_plan()
+        self.assertTrue(plan["prepared"])
+        self.assertEqual(plan["cached"], ["pre-build"])
+        self.assertEqual(plan["targets"][1]["cached"], ["install", "certificates", "pre-build"])
+        self.assertEqual(plan["targets"][2]["cached"], [])
+
+    @patch("poetry_pyinstaller_plugin.plugin.precompile", return_value={"compiled": 3, "cached": 40, "failed": 0})
+    @patch("poetry_pyinstaller_plugin.plugin.Environment")
+    def test_get_plan_bytecode(self, mock_environment, mock_precompile):
+        mock_environment.side_effect = lambda poetry, io, install_args, config: MagicMock(lock_hash=str(install_args))
+        venv = MagicMock(path="/project/.venv", paths={"purelib": "/project/.venv/lib/site-packages"})
+        self.command.get_environment = MagicMock(return_value=venv)
+        self.command.log = MagicMock()
+        self.command.config.values["precompile"] = True
+        try:
+            with (tempfile.TemporaryDirectory() as tmp,
+                  patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=Path(tmp))):
+                # Environments not precompiled yet
+                not_precompiled = {"environment": None, "cached": 0, "stale": None}
+                self.assertEqual(self.command.get_plan()["bytecode"], [not_precompiled])
+
+                # Plan is predicted from manifest of last build, environments are not inspected
+                self.command.precompile_bytecode(self.command.targets)
+                self.command.get_environment.reset_mock()
+                mock_precompile.reset_mock()
+                precompiled = {"environment": str(Path("/project/.venv")), "cached": 43, "stale": 0}
+                self.assertEqual(self.command.get_plan()["bytecode"], [precompiled])
+                self.command.get_environment.assert_not_called()
+                mock_precompile.assert_not_called()
+
+                # New optimization levels are compiled for all modules
+                self.command.targets[0].python_options = ["O"]
+                self.assertEqual(self.command.get_plan()["bytecode"], [not_precompiled])
+        finally:
+            self.command.config.values["precompile"] = False
+
+    def test_get_plan_changed_since(self):
+        self.options["changed-since"] = "HEAD"
+        self.command.get_affected_targets = MagicMock(return_value=[self.command.targets[0]])
+        plan = self.command.get_plan()
+
+        self.command.get_affected_targets.assert_called_with("HEAD")
+        self.assertIsNone(plan["targets"][0]["skipped"])
+        self.assertEqual(plan["targets"][1]["skipped"], "not affected since HEAD")
+
+    def test_get_bundled_wheels(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ["pkg-0.1.0-py3-none-any.whl", "pkg-0.1.0-cp312-cp312-manylinux.whl", "pkg-0.1.0.tar.gz"]:
+                Path(tmp, name).touch()
+            tool, tool_2 = self.command.targets[:2]
+            tool.bundle = tool_2.bundle = True
+            tool_2.bundle_wheels = ["*.whl"]
+
+            wheels = self.command.get_bundled_wheels(Path(tmp))
+            self.assertEqual({wheel: [t.prog for t in targets] for wheel, targets in wheels.items()}, {
+                "pkg-0.1.0-cp312-cp312-manylinux.whl": ["my-tool-2"],
+                "pkg-0.1.0-py3-none-any.whl": ["my-tool", "my-tool-2"],
+            })
+
+    def test_check_config(self):
+        self.command.check_config([("", self.command.config, self.command.targets)])
+        self.io.write_line.assert_any_call(
+            "<fg=yellow;options=bold>Warning: targets.my-tool-3.noupx: unknown option, ignored</>")
+
+        # Paths of 'my-tool-3' are checked once it is built on this version
+        self.command.targets[2].when = None
+        with self.assertRaises(ConfigError) as exc:
+            self.command.check_config([("api: ", self.command.config, self.command.targets)])
+        self.assertEqual(len(exc.exception.problems), 5)
+        self.assertEqual(exc.exception.problems[0], "api: targets.my-tool-3.icon: 'icon.ico' not found in test_project")
+
+    def test_get_target_hook(self):
+        tool_2, tool_3 = self.command.targets[1:]
+        self.assertIsNone(self.command.get_target_hook(tool_2, "pre"))
+        self.assertIsNone(self.command.get_target_hook(tool_3, "pre"))
+
+        hook = self.command.get_target_hook(tool_3, "post")
+        self.assertIs(hook, self.mock_post_hook.from_spec.return_value)
+        self.mock_post_hook.from_spec.assert_called_with(self.command._app, "hooks.pyinstaller:sign", target=tool_3,
+                                                         poetry=None)
+        self.assertEqual(self.command.executed_hooks, [hook])
+
+    @patch("poetry_pyinstaller_plugin.plugin.Environment")
+    @patch("poetry_pyinstaller_plugin.plugin.Scheduler")
+    def test_build_targets_hooks(self, mock_scheduler, _):
+        events = []
+        mock_scheduler.from_poetry.return_value.run.side_effect = lambda targets, build: [build(t) for t in targets]
+
+        def build(target):
+            events.append(f"build {target.prog}")
+            target.duration = 1.0
+
+        tool_2, tool_3 = self.command.targets[1:]
+        tool_2.pre_build = "hooks.pyinstaller:generate"
+        tool_3.when = None
+        self.mock_pre_hook.from_spec.return_value._exec.side_effect = lambda venv: events.append("pre-build")
+        self.mock_post_hook.from_spec.return_value._exec.side_effect = lambda venv: events.append("post-build")
+        tool_3.create_archive = MagicMock(side_effect=lambda: events.append("archive"))
+        tool_3.smoke = SmokeConfig()
+        tool_3.smoke_test = MagicMock(side_effect=lambda: events.append("smoke"))
+
+        self.command.build_targets([tool_2, tool_3], build)
+        self.assertEqual(events[:4], ["pre-build", "build my-tool-2", "build my-tool-3-0.1.0", "post-build"])
+        # Executable is smoke tested & archived once signed or patched by post-build hook
+        self.assertEqual(sorted(events[4:]), ["archive", "smoke"])
+        self.mock_pre_hook.from_spec.assert_called_with(self.command._app, "hooks.pyinstaller:generate", target=tool_2,
+                                                        poetry=None)
+
+        # Pre-build hooks of prepared targets are not run again
+        events.clear()
+        tool_2.prepared = True
+        self.command.build_targets([tool_2], build)
+        self.assertEqual(events, ["build my-tool-2"])
+
+    def test_event_stream(self):
+        self.options.update({"events": None, "projects": None})
+        with self.command.event_stream() as events:
+            self.assertIsNone(events)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            self.options["events"] = str(Path(tmp, "events.jsonl"))
+            with self.command.event_stream() as events:
+                self.assertIs(self.command.events, events)
+            with self.assertRaises(RuntimeError):
+                with self.command.event_stream():
+                    raise RuntimeError("boom")
+            self.assertIsNone(self.command.events)
+
+            events = [json.loads(line) for line in Path(tmp, "events.jsonl").read_text().splitlines()]
+            self.assertEqual([event["event"] for event in events], ["build-started", "build-finished"] * 2)
+            self.assertEqual((events[0]["project"], events[0]["platform"]), ("test-package", "manylinux"))
+            self.assertEqual((events[1]["status"], events[3]["status"]), ("success", "failed"))
+            self.assertEqual(events[3]["error"], "RuntimeError: boom")
+            self.assertNotIn("error", events[1])
+
+    @skipIf(sys.platform == "win32", "Simulated executables are shell scripts")
+    def test_build_targets_simulated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            targets = self.command.targets[:2]
+            for target in targets:
+                target.backend = "simulated"
+                target.work_path = Path(tmp, "build")
+                target.archive = "tar.gz"
+                target.smoke = SmokeConfig(runs=1)
+
+            def build(target):
+                target.build(self.command._app.poetry, self.command, install=False, dist_path=Path(tmp, "dist"))
+
+            self.command.events = EventStream.open(str(Path(tmp, "events.jsonl")))
+            with patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=Path(tmp, "cache")):
+                self.command.build_targets(targets, build)
+            self.command.events.close()
+
+            self.assertTrue(Path(tmp, "dist", "my-tool.tar.gz.sha256").exists())
+            self.assertTrue(Path(tmp, "dist", "my-tool-2.tar.gz").exists())
+            history = json.loads(Path(tmp, "cache", "build-history.json").read_text())
+            self.assertEqual(sorted(history["targets"]), ["manylinux/my-tool", "manylinux/my-tool-2"])
+
+            events = [json.loads(line) for line in Path(tmp, "events.jsonl").read_text().splitlines()]
+            self.assertEqual([event["target"] for event in events[:2]], ["my-tool", "my-tool-2"])
+            self.assertEqual({event["event"] for event in events[:2]}, {"target-queued"})
+            for target in targets:
+                names = [event["event"] for event in events if event["target"] == target.prog]
+                self.assertLess(names.index("target-started"), names.index("target-finished"))
+                self.assertIn("target-archived", names)
+                self.assertIn("target-smoke-tested", names)
+
+    def test_create_delta(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dist_path = Path(tmp, "dist", "pyinstaller", "manylinux")
+            tool = self.command.targets[0]
+            tool.dist_path = dist_path
+            tool.type = "onefile"
+            tool.resources_config = {"data": "."}
+            tool.resources_mode = "pack"
+            dist_path.mkdir(parents=True)
+            tool.output_path.write_bytes(b"executable")
+            tool.resources_path.write_bytes(b"PYIRPACK resources")
+            Path(tmp, "base").mkdir()
+            Path(tmp, "base", "my-tool").write_bytes(b"executable")
+
+            # Resources published next to 'onefile' executables are part of delta
+            self.options["output"] = str(Path(tmp, "dist"))
+            self.command.log = MagicMock()
+            manifest = self.command.create_delta([tool], Path(tmp, "base"))
+            self.assertEqual(sorted(manifest["files"]), ["my-tool", "my-tool.pack"])
+            self.assertEqual(manifest["files"]["my-tool.pack"]["patch"], "patches/my-tool.pack.patch")
+            self.assertNotIn("patch", manifest["files"]["my-tool"])
+
+    @skipIf(sys.platform == "win32", "Simulated executables are shell scripts")
+    def test_build_workspace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp).resolve()
+            projects = []
+            for name in ["api", "worker"]:
+                (root / name).mkdir()
+                (root / name / "pyproject.toml").write_text(
+                    f'[project]\nname = "{name}"\nversion = "0.1.0"\n\n'
+                    f'[tool.poetry-pyinstaller-plugin.targets]\ncli = {{ source = "main.py", backend = "simulated" }}\n'
+                )
+                projects.append(load_project(root, root / name, self.io))
+            for project in projects:
+                for target in project.targets:
+                    self.command.workspace[id(target)] = project
+
+            with patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=root / "cache"):
+                self.command.build_workspace(projects)
+
+            for name in ["api", "worker"]:
+                self.assertTrue((root / name / "dist" / "pyinstaller" / "manylinux" / "cli" / "cli").exists())
+            history = json.loads((root / "cache" / "build-history.json").read_text())
+            self.assertEqual(sorted(history["targets"]), ["manylinux/api/cli", "manylinux/worker/cli"])
+
+            self.command.log = MagicMock()
+            pool = MagicMock(created=1, reused=1)
+            self.command.log_workspace_summary(projects, pool, 2.0)
+            self.command.log.assert_any_call("  - <c1>api</c1> <info>1</info> target(s) built <debug>(0.0s)</debug>")
+            self.command.log.assert_called_with("Built <info>2</info> target(s) of <info>2</info> project(s) in 2.0s "
+                                                "<debug>(1 environment(s) created, 1 reused)</debug>")
+
+    def create_workspace(self, root, names):
+        projects = []
+        for name in names:
+            (root / name).mkdir()
+            (root / name / "main.py").touch()
+            (root / name / "pyproject.toml").write_text(
+                f'[project]\nname = "{name}"\nversion = "0.1.0"\n\n'
+                f'[tool.poetry-pyinstaller-plugin.targets]\ncli = "main.py"\n'
+                f'gui = {{ source = "main.py", groups = ["main"] }}\n'
+            )
+            projects.append(load_project(root, root / name, self.io))
+        return projects
+
+    @patch("poetry_pyinstaller_plugin.plugin.EnvironmentPool")
+    @patch("poetry_pyinstaller_plugin.plugin.Environment")
+    def test_prepare_workspace(self, mock_environment, mock_pool):
+        with tempfile.TemporaryDirectory() as tmp:
+            api, worker = self.create_workspace(Path(tmp), ["api", "worker"])
+        api.prepared = True
+
+        pool = self.command.prepare_workspace([api, worker])
+
+        # Prepared environments are used as is, others are provisioned by pool
+        self.assertEqual(mock_environment.call_count, 2)
+        self.assertEqual(api.environments, {target.install_args: mock_environment.return_value.get.return_value
+                                            for target in api.targets})
+        self.assertTrue(all(target.prepared for target in api.targets))
+        self.assertFalse(any(target.prepared for target in worker.targets))
+        self.assertEqual([call.args for call in pool.get.call_args_list],
+                         [(worker, target.install_args) for target in worker.targets])
+
+    def test_precompile_workspace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            api, worker = self.create_workspace(Path(tmp), ["api", "worker"])
+        self.command.precompile_bytecode = MagicMock()
+
+        self.command.precompile_workspace([api, worker])
+        self.command.precompile_bytecode.assert_not_called()
+
+        # Option is read from configuration of each project, never from root project
+        worker.config.values["precompile"] = True
+        self.command.precompile_workspace([api, worker])
+        self.command.precompile_bytecode.assert_called_once_with(worker.targets)
+
+    def test_get_project_environment(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            api, = self.create_workspace(Path(tmp), ["api"])
+        pool = MagicMock()
+
+        # Hooks run in an environment of project's targets, default one is created only when none exists
+        self.assertEqual(self.command.get_project_environment(api, pool), pool.get.return_value)
+        pool.get.assert_called_with(api, INSTALL_ARGS)
+        api.environments = {("--only", "main", "--all-extras"): "dedicated"}
+        self.assertEqual(self.command.get_project_environment(api, pool), "dedicated")
+        api.environments[INSTALL_ARGS] = "default"
+        self.assertEqual(self.command.get_project_environment(api, pool), "default")
+        pool.get.assert_called_once()
+
+    @patch("poetry_pyinstaller_plugin.plugin.get_affected_targets")
+    @patch("poetry_pyinstaller_plugin.utils.get_changed_files", return_value={Path("/api/gui.py")})
+    def test_filter_affected_targets(self, mock_changed_files, mock_affected_targets):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp).resolve()
+            api, = self.create_workspace(root, ["api"])
+        cli, gui = api.targets
+        mock_affected_targets.return_value = [gui]
+        self.command.events = MagicMock()
+
+        self.assertEqual(self.command.filter_affected_targets("HEAD~1", api), [gui])
+
+        # Changes are listed in project, unaffected targets reported as skipped
+        mock_changed_files.assert_called_with(root / "api", "HEAD~1")
+        mock_affected_targets.assert_called_with(api.poetry, [cli, gui], {Path("/api/gui.py")})
+        self.command.events.emit.assert_called_once()
+        self.assertEqual(self.command.events.emit.call_args.args[0], "target-skipped")
+        self.assertEqual(self.command.events.emit.call_args.kwargs["target"], "cli")
+        self.command.events = None
+
+    def test_get_environment(self):
+        tool = self.command.targets[0]
+        project = MagicMock(environments={tool.install_args: "shared"})
+        self.command.workspace[id(tool)] = project
+        self.assertEqual(self.command.get_environment(tool), "shared")
+
+        tool_3 = self.command.targets[2]
+        self.command.workspace[id(tool_3)] = project
+        self.command.get_target_hook(tool_3, "post")
+        self.mock_post_hook.from_spec.assert_called_with(self.command._app, "hooks.pyinstaller:sign", target=tool_3,
+                                                         poetry=project.poetry)
+
+    @patch("poetry_pyinstaller_plugin.plugin.precompile", return_value={"compiled": 3, "cached": 5, "failed": 0})
+    @patch("poetry_pyinstaller_plugin.plugin.Environment")
+    def test_precompile_bytecode(self, mock_environment, mock_precompile):
+        mock_environment.return_value.lock_hash = "lock"
+        tool, tool_2, tool_3 = self.command.targets
+        tool_2.python_options = ["OO"]
+        tool_2.backend = "simulated"
+        venv = MagicMock(path="/venv", paths={"purelib": "/venv/site-packages"})
+        self.command.get_environment = MagicMock(return_value=venv)
+        self.command.log = MagicMock()
+
+        with (tempfile.TemporaryDirectory() as tmp,
+              patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=Path(tmp))):
+            self.command.precompile_bytecode([tool_2, tool_3])
+            mock_precompile.assert_not_called()
+
+            tool.python_options = ["O"]
+            self.command.precompile_bytecode([tool, tool_2, tool_3])
+
+            roots = [Path("/venv/site-packages"), Path("test_project")]
+            mock_precompile.assert_called_once_with(venv, sorted(roots), [0, 1], Path(tmp, "precompile.py"))
+            self.assertTrue(self.command.log.call_args.args[0].startswith(
+                "  - Compiled <info>3</info> module(s) <debug>(5 unchanged, 0 failed, "))
+
+            # Precompiled environments are recorded for plan
+            entry = json.loads(Path(tmp, "bytecode.json").read_text())["lock"]
+            self.assertEqual((entry["environment"], entry["levels"], entry["modules"]), (str(Path("/venv")), [0, 1], 8))
+            self.assertEqual(sorted(entry["sources"]), [str(Path("test_project", "test_package", name).resolve())
+                                                        for name in ["__init__.py", "main.py"]])
+
+        # Bytecode is fed to PyInstaller builds only
+        self.assertEqual([target.precompiled for target in (tool, tool_2, tool_3)], [True, False, False])
+
+    def test_log_work_dir_summary(self):
+        self.command.log = MagicMock()
+        tool, tool_2, tool_3 = self.command.targets
+        self.command.log_work_dir_summary([tool, tool_2])
+        self.command.log.assert_not_called()
+
+        for target in self.command.targets:
+            target.work_dir, target.duration, target.work_size = "/dev/shm", 10.0, 1024 ** 2
+        tool.work_dir_used, tool.io_saved = Path("/dev/shm"), 4.25
+        tool_2.work_dir_used = Path("/dev/shm")
+        self.command.log_work_dir_summary(self.command.targets)
+        self.command.log.assert_any_call("Work dir summary")
+        self.command.log.assert_any_call("  - <c1>my-tool</c1> built in /dev/shm, <info>4.2s</info> I/O time saved "
+                                         "<debug>(1.0 MiB of intermediates)</debug>")
+        self.command.log.assert_any_call("  - <c1>my-tool-2</c1> built in /dev/shm "
+                                         "<debug>(1.0 MiB of intermediates, no build on disk to compare with)</debug>")
+        self.command.log.assert_called_with("  - <c1>my-tool-3-0.1.0</c1> built on disk "
+                                            "<debug>(1.0 MiB of intermediates)</debug>")
+
+    def test_log_hooks_summary(self):
+        self.command.log = MagicMock()
+        self.command.log_hooks_summary()
+        self.command.log.assert_not_called()
+
+        hook = MagicMock(duration=1.5, result="signed", description="post-build hook", cached=False)
+        cached = MagicMock(duration=None, description="pre-build hook", cached=True)
+        self.command.executed_hooks = [cached, hook, MagicMock(duration=None, cached=False)]
+        self.command.log_hooks_summary()
+        self.command.log.assert_any_call("Hooks summary")
+        self.command.log.assert_any_call("  - pre-build hook <debug>(cached)</debug>")
+        self.command.log.assert_called_with("  - post-build hook <debug>(1.50s, returned 'signed')</debug>")
+
+    def test_handle(self):
+        self.assertEqual(self.command.handle(), 0)
+        self.io.write_line.assert_any_call("  - <c1>my-tool-2</c1> <debug>(onedir)</debug>")
+        self.io.write_line.assert_any_call(
+            "  - <c1>my-tool-3-0.1.0</c1> <warning>skipped (on prerelease only)</warning>")
+
+    def test_handle_json(self):
+        self.options["json"] = True
+        self.assertEqual(self.command.handle(), 0)
+        output = self.io.write_line.call_args.args[0]
+        self.assertEqual(json.loads(output), json.loads(json.dumps(self.command.get_plan())))
+
+
+class TestPyInstallerConfigCommand(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patchers = [
+            patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux"),
+            patch("poetry_pyinstaller_plugin.plugin.PreHook"),
+            patch("poetry_pyinstaller_plugin.plugin.PostHook"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+        self.options = {"json": False}
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+        self.io.input.option.side_effect = lambda name: self.options[name]
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmp.cleanup()
+
+    def create_command(self, path: Path) -> PyInstallerConfigCommand:
+        app = MagicMock()
+        app.poetry = Factory().create_poetry(cwd=path)
+        app._io = self.io
+        return PyInstallerConfigCommand(app)
+
+    def test_get_config(self):
+        config = self.create_command(Path("test_project")).get_config()
+        self.assertEqual(config["plugin"]["pre-build"], "hooks.pyinstaller:pre_build")
+        self.assertNotIn("targets", config["plugin"])
+        self.assertEqual([target["name"] for target in config["targets"]], ["my-tool", "my-tool-2", "my-tool-3"])
+        self.assertEqual([target["skipped"] for target in config["targets"]], [False, False, True])
+
+        tool_3 = config["targets"][2]
+        self.assertEqual((tool_3["options"]["type"], tool_3["origins"]["type"]), ("onefile", "target"))
+        self.assertEqual((tool_3["options"]["backend"], tool_3["origins"]["backend"]), ("pyinstaller", "default"))
+        self.assertEqual(len(config["warnings"]), 2)
+        self.assertEqual(config["errors"], [])
+
+    def test_handle(self):
+        command = self.create_command(Path("test_project"))
+        self.assertEqual(command.handle(), 0)
+        self.io.write_line.assert_any_call("  - <c1>my-tool-3</c1> <warning>(skipped on this version)</warning>")
+        self.io.write_line.assert_any_call('      type = "onefile" <debug>(target)</debug>')
+        self.io.write_line.assert_called_with("Configuration valid, <info>3</info> target(s)")
+
+        self.options["json"] = True
+        self.assertEqual(command.handle(), 0)
+        output = self.io.write_line.call_args.args[0]
+        self.assertEqual(json.loads(output), json.loads(json.dumps(command.get_config())))
+
+    def test_handle_invalid(self):
+        project = Path(self.tmp.name)
+        (project / "pyproject.toml").write_text(
+            '[project]\nname = "app"\nversion = "0.1.0"\n\n'
+            '[tool.poetry-pyinstaller-plugin.targets]\n'
+            'cli = { source = "cli.py", type = "onebig", strip = "yes" }\n'
+        )
+        command = self.create_command(project)
+        self.assertEqual(command.targets, [])
+        self.assertEqual(command.handle(), 1)
+        self.io.write_line.assert_any_call("<error>targets.cli.type: 'onebig' not in ['onefile', 'onedir']</error>")
+        self.io.write_line.assert_called_with("<error>Invalid configuration, 3 problem(s) found.</error>")
+
+
+class TestPyInstallerProfileImportsCommand(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patchers = [
+            patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux"),
+            patch("poetry_pyinstaller_plugin.utils.get_cache_path", return_value=Path(self.tmp.name)),
+            patch("poetry_pyinstaller_plugin.plugin.PreHook"),
+            patch("poetry_pyinstaller_plugin.plugin.PostHook"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+        self.options = {"limit": "2"}
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+        self.io.input.option.side_effect = lambda name: self.options[name]
+
+        app = MagicMock()
+        app.poetry = Factory().create_poetry(cwd=Path("test_project"))
+        app._io = self.io
+        self.command = PyInstallerProfileImportsCommand(app)
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmp.cleanup()
+
+    def test_get_target(self):
+        self.assertEqual(self.command.get_target("my-tool-2").prog, "my-tool-2")
+        with self.assertRaises(ValueError):
+            self.command.get_target("unknown")
+
+    def test_get_profile(self):
+        target = self.command.get_target("my-tool-2")
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |   _io\n"
+            "import time:       300 |        400 | encodings\n"
+            "import time:      1000 |       1000 | test_project\n"
+        )
+        profile = self.command.get_profile(target, output)
+        self.assertEqual((profile["target"], profile["modules"], profile["total"]), ("my-tool-2", 3, 1400))
+        self.assertEqual([node["name"] for node in profile["cumulative"]], ["test_project", "encodings"])
+        self.assertEqual([node["name"] for node in profile["self"]], ["test_project", "encodings"])
+        self.assertEqual(profile["tree"][0]["children"][0]["name"], "_io")
+
+        with self.assertRaises(RuntimeError):
+            self.command.get_profile(target, "Hello world!")
+
+
+class TestPyInstallerWatchCommand(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.project = Path(self.tmp.name).resolve()
+        (self.project / "src" / "app").mkdir(parents=True)
+        for name in ("src/app/__init__.py", "cli.py", "gui.py"):
+            (self.project / name).touch()
+        self.write_pyproject("cli.py")
+
+        self.patchers = [
+            patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux"),
+            patch("poetry_pyinstaller_plugin.plugin.PreHook"),
+            patch("poetry_pyinstaller_plugin.plugin.PostHook"),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+        self.options = {"poll": True}
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+        self.io.input.option.side_effect = lambda name: self.options[name]
+
+        self.app = MagicMock()
+        self.app.poetry = Factory().create_poetry(cwd=self.project)
+        self.app._io = self.io
+        self.command = PyInstallerWatchCommand(self.app)
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.tmp.cleanup()
+
+    def write_pyproject(self, source: str):
+        (self.project / "pyproject.toml").write_text(
+            '[project]\nname = "app"\nversion = "0.1.0"\n\n'
+            f'[tool.poetry-pyinstaller-plugin.targets]\ncli = "{source}"\n'
+        )
+
+    def test_reload(self):
+        self.command._watch()
+        watcher = self.command.watcher
+        self.assertEqual(watcher.roots, {self.project / "src"})
+        self.assertIn(self.project / "cli.py", watcher.files)
+
+        # Watcher is re-created from paths of reloaded targets, keeping detection time of changes
+        self.write_pyproject("gui.py")
+        self.app.reset_poetry.side_effect = lambda: setattr(self.app, "poetry", Factory().create_poetry(cwd=self.project))
+        watcher.detected_at = 42.0
+        self.command._reload()
+
+        self.assertIsNot(self.command.watcher, watcher)
+        self.assertIn(self.project / "gui.py", self.command.watcher.files)
+        self.assertNotIn(self.project / "cli.py", self.command.watcher.files)
+        self.assertEqual(self.command.watcher.detected_at, 42.0)
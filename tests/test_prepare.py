@@ -0,0 +1,81 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from poetry_pyinstaller_plugin.prepare import ReadyMarker
+
+
+class TestReadyMarker(TestCase):
+
+    def setUp(self):
+        self.patch_platform = patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux")
+        self.patch_platform.start()
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "pyproject.toml").write_text("[project]\nname = 'pkg'\n")
+        (self.root / "poetry.lock").write_text("# lock v1\n")
+        (self.root / "certificate.crt").write_text("certificate v1\n")
+        self.env = self.root / ".venv"
+        self.env.mkdir()
+        (self.env / "pyvenv.cfg").touch()
+
+        self.poetry = MagicMock()
+        self.poetry.pyproject_path = self.root / "pyproject.toml"
+        self.targets = [
+            MagicMock(install_args=("--all-extras", "--all-groups"), certificates=[]),
+            MagicMock(install_args=("--only", "main"), certificates=["certificate.crt"]),
+        ]
+        for index, target in enumerate(self.targets):
+            target.name = f"my-tool-{index}"
+        self.marker = ReadyMarker.from_poetry(self.poetry)
+
+    def tearDown(self):
+        self.patch_platform.stop()
+        self.tmp.cleanup()
+
+    def test_path(self):
+        self.assertEqual(self.marker.path, (self.root / "build" / ".cache" / "ready-manylinux.json").resolve())
+
+    def test_write(self):
+        self.assertFalse(self.marker.is_valid(self.targets))
+        self.marker.write(self.targets, [self.env, self.env])
+        self.assertTrue(self.marker.is_valid(self.targets))
+
+        data = json.loads(self.marker.path.read_text())
+        self.assertEqual(data["environments"], [str(self.env)])
+        self.assertEqual(data["targets"], ["my-tool-0", "my-tool-1"])
+        self.assertEqual(data["fingerprint"], self.marker.fingerprint(self.targets))
+
+    def test_invalidated(self):
+        self.marker.write(self.targets, [self.env])
+
+        (self.root / "poetry.lock").write_text("# lock v2\n")
+        self.assertFalse(self.marker.is_valid(self.targets))
+        self.marker.write(self.targets, [self.env])
+
+        (self.root / "certificate.crt").write_text("certificate v2\n")
+        self.assertFalse(self.marker.is_valid(self.targets))
+        self.marker.write(self.targets, [self.env])
+
+        self.targets[0].install_args = ("--only", "main")
+        self.assertFalse(self.marker.is_valid(self.targets))
+        self.marker.write(self.targets, [self.env])
+
+        (self.env / "pyvenv.cfg").unlink()
+        self.assertFalse(self.marker.is_valid(self.targets))
+
+    def test_invalid_content(self):
+        self.marker.path.parent.mkdir(parents=True)
+        self.marker.path.write_text("not json")
+        self.assertFalse(self.marker.is_valid(self.targets))
+        self.marker.path.write_text(json.dumps({"version": 0}))
+        self.assertFalse(self.marker.is_valid(self.targets))
+
+    def test_clear(self):
+        self.marker.clear()
+        self.marker.write(self.targets, [self.env])
+        self.marker.clear()
+        self.assertFalse(self.marker.path.exists())
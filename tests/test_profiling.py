@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+from unittest import TestCase
+
+from poetry_pyinstaller_plugin.profiling import (PROFILE_WRAPPER,
+                                                 get_hook_timings,
+                                                 get_hotspots)
+
+# Minimal stand-in of PyInstaller entry point, executing hooks like PyInstaller does
+FAKE_PYINSTALLER = textwrap.dedent("""
+import runpy, time
+
+def analysis():
+    time.sleep(0.05)
+
+def run(args):
+    analysis()
+    for hook in (arg for arg in args if not arg.startswith("--")):
+        runpy.run_path(hook)["hook"](None)
+    if "--fail" in args:
+        raise SystemExit(2)
+""")
+
+HOOK = textwrap.dedent("""
+import time
+time.sleep({module})
+
+def hook(api):
+    time.sleep({hook})
+""")
+
+
+class TestProfiling(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "PyInstaller").mkdir()
+        (self.root / "PyInstaller" / "__init__.py").write_text("")
+        (self.root / "PyInstaller" / "__main__.py").write_text(FAKE_PYINSTALLER)
+        (self.root / "hook-fast.py").write_text(HOOK.format(module=0.0, hook=0.01))
+        (self.root / "hook-slow.py").write_text(HOOK.format(module=0.05, hook=0.05))
+        self.rss_path = self.root / "rss"
+        self.profile_path = self.root / "pyinstaller.prof"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_wrapper(self, *args):
+        env = dict(os.environ, PYTHONPATH=str(self.root))
+        return subprocess.run([sys.executable, "-c", PROFILE_WRAPPER, self.rss_path, self.profile_path,
+                               str(self.root / "hook-fast.py"), str(self.root / "hook-slow.py"), *args], env=env)
+
+    def test_profile(self):
+        self.assertEqual(self.run_wrapper().returncode, 0)
+        if sys.platform != "win32":
+            self.assertGreater(int(self.rss_path.read_text()), 0)
+
+        hotspots = get_hotspots(self.profile_path, limit=20)
+        functions = [hotspot["function"] for hotspot in hotspots]
+        self.assertIn("analysis", functions)
+        self.assertNotIn("run", functions)
+        self.assertGreaterEqual(hotspots[functions.index("analysis")]["cumulative"], 0.05)
+        self.assertEqual(hotspots[functions.index("analysis")]["location"], "__main__.py:4")
+
+        hooks = get_hook_timings(self.profile_path)
+        self.assertEqual([hook["hook"] for hook in hooks], ["slow", "fast"])
+        self.assertGreaterEqual(hooks[0]["time"], 0.1)
+        self.assertEqual(hooks[0]["path"], str(self.root / "hook-slow.py"))
+
+    def test_profile_failure(self):
+        self.assertEqual(self.run_wrapper("--fail").returncode, 2)
+        self.assertTrue(self.profile_path.exists())
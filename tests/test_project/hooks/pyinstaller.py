@@ -0,0 +1,13 @@
+from poetry_pyinstaller_plugin import PluginHook
+
+
+def pre_build(hook: PluginHook):
+    hook.log("pre-build")
+
+
+def post_build(hook: PluginHook):
+    hook.log("post-build")
+
+
+def sign(hook: PluginHook):
+    hook.log(f"signing {hook.target.prog}")
@@ -0,0 +1,96 @@
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from poetry_pyinstaller_plugin.resources import (PACK_ALIGNMENT, PACK_HEADER,
+                                                 collect_resources,
+                                                 copy_resources,
+                                                 get_runtime_hook, write_pack)
+
+
+class TestResources(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.project = self.root / "project"
+        (self.project / "data" / "lang").mkdir(parents=True)
+        (self.project / "data" / "model.bin").write_bytes(b"\x00\x01" * 5000)
+        (self.project / "data" / "empty.bin").touch()
+        (self.project / "data" / "lang" / "en.json").write_text('{"hello": "Hello"}')
+        (self.project / "data" / "lang" / "fr.json").write_text('{"hello": "Bonjour"}')
+        self.config = {"data/*.bin": "models", "data/lang": "lang", "data/lang/en.json": "."}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        sys.modules.pop("pyinstaller_resources", None)
+
+    def test_collect_resources(self):
+        resources = collect_resources(self.project, self.config)
+        self.assertEqual(resources, {
+            "en.json": self.project / "data" / "lang" / "en.json",
+            "lang/en.json": self.project / "data" / "lang" / "en.json",
+            "lang/fr.json": self.project / "data" / "lang" / "fr.json",
+            "models/empty.bin": self.project / "data" / "empty.bin",
+            "models/model.bin": self.project / "data" / "model.bin",
+        })
+
+        (self.project / "data" / "other").mkdir()
+        (self.project / "data" / "other" / "en.json").touch()
+        with self.assertRaises(ValueError):
+            collect_resources(self.project, {"data/lang/en.json": ".", "data/other": "."})
+        self.assertEqual(collect_resources(self.project, {"missing/*.bin": "."}), {})
+
+    def install_hook(self, name, packed):
+        executable = self.root / "dist" / "my-tool"
+        with patch.object(sys, "executable", str(executable)):
+            exec(compile(get_runtime_hook(name, packed), "pyi_rth_resources.py", "exec"), {})
+        return sys.modules["pyinstaller_resources"]
+
+    def check_module(self, module):
+        self.assertEqual(module.names(), ["en.json", "lang/en.json", "lang/fr.json", "models/empty.bin",
+                                          "models/model.bin"])
+        view = module.get("models/model.bin")
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(bytes(view), b"\x00\x01" * 5000)
+        self.assertIs(module.get("models/model.bin"), view)
+        self.assertEqual(bytes(module.get("lang/fr.json")), b'{"hello": "Bonjour"}')
+        self.assertEqual(bytes(module.get("models/empty.bin")), b"")
+        with self.assertRaises(KeyError):
+            module.get("models/missing.bin")
+
+    def test_files(self):
+        resources = collect_resources(self.project, self.config)
+        size = copy_resources(resources, self.root / "dist" / "my-tool.resources")
+        self.assertEqual(size, 10000 + 18 * 2 + 20)
+
+        module = self.install_hook("my-tool.resources", False)
+        self.assertEqual(module.location, str(self.root / "dist" / "my-tool.resources"))
+        self.check_module(module)
+        self.assertEqual(module.path("lang/en.json"),
+                         str(self.root / "dist" / "my-tool.resources" / "lang" / "en.json"))
+        with self.assertRaises(KeyError):
+            module.path("../my-tool")
+
+    def test_pack(self):
+        resources = collect_resources(self.project, self.config)
+        pack = self.root / "dist" / "my-tool.pack"
+        size = write_pack(resources, pack)
+        self.assertEqual(size, pack.stat().st_size)
+        self.assertEqual(size % PACK_ALIGNMENT, 0)
+
+        _, index_size, offset = PACK_HEADER.unpack_from(pack.read_bytes())
+        self.assertEqual(offset % PACK_ALIGNMENT, 0)
+
+        module = self.install_hook("my-tool.pack", True)
+        self.check_module(module)
+        with self.assertRaises(KeyError):
+            module.path("lang/en.json")
+
+        # Nothing is read until a resource is accessed
+        pack.write_bytes(b"corrupted")
+        module = self.install_hook("my-tool.pack", True)
+        with self.assertRaises(RuntimeError):
+            module.names()
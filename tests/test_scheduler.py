@@ -0,0 +1,173 @@
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from poetry_pyinstaller_plugin.config import PluginConfig
+from poetry_pyinstaller_plugin.scheduler import (DEFAULT_DURATION,
+                                                 DEFAULT_PEAK_RSS,
+                                                 BuildHistory, Scheduler)
+
+GiB = 1024 ** 3
+
+
+def _target(name, duration=None, peak_rss=None):
+    target = MagicMock()
+    target.name = target.prog = name
+    target.platform = "manylinux"
+    target.duration = duration
+    target.peak_rss = peak_rss
+    target.workspace = None
+    target.work_dir = target.work_size = target.work_dir_used = None
+    return target
+
+
+class TestBuildHistory(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / ".cache" / "build-history.json"
+        self.history = BuildHistory(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_estimate_unseen(self):
+        self.assertEqual(self.history.estimate(_target("tool")), (DEFAULT_DURATION, DEFAULT_PEAK_RSS))
+
+    def test_record_work_dir(self):
+        target = _target("tool", duration=30.0)
+        target.work_dir, target.work_size = "/dev/shm", 400 * 1024 ** 2
+        self.history.record(target)
+        self.assertEqual(self.history.disk_duration(target), 30.0)
+        self.assertEqual(self.history.estimate_work_size(target), 400 * 1024 ** 2)
+
+        # Builds in work dir don't replace reference build on disk
+        target.duration, target.work_dir_used = 20.0, Path("/dev/shm")
+        self.history.record(target)
+        self.assertEqual(self.history.disk_duration(target), 30.0)
+        self.assertEqual(self.history.estimate(target)[0], 20.0)
+        self.assertIsNone(self.history.disk_duration(_target("other")))
+
+    def test_key_workspace(self):
+        target = _target("tool")
+        self.assertEqual(BuildHistory.key(target), "manylinux/tool")
+        target.workspace = "services/api"
+        self.assertEqual(BuildHistory.key(target), "manylinux/services/api/tool")
+
+    def test_record(self):
+        self.history.record(_target("tool", duration=12.3456, peak_rss=2 * GiB))
+        self.assertEqual(self.history.estimate(_target("tool")), (12.346, 2 * GiB))
+
+        # Skipped targets are not recorded
+        self.history.record(_target("skipped"))
+        self.assertNotIn("manylinux/skipped", self.history.entries)
+
+    def test_save(self):
+        self.history.record(_target("tool", duration=10.0, peak_rss=GiB))
+        self.history.save()
+
+        data = json.loads(self.path.read_text())
+        self.assertEqual(data["version"], BuildHistory.VERSION)
+        self.assertEqual(data["targets"], {"manylinux/tool": {"duration": 10.0, "peak-rss": GiB}})
+        self.assertEqual(BuildHistory(self.path).estimate(_target("tool")), (10.0, GiB))
+
+    def test_load_invalid(self):
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("{")
+        self.assertEqual(BuildHistory(self.path).entries, {})
+
+
+class TestScheduler(TestCase):
+
+    def setUp(self):
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+        self.history = BuildHistory()
+        self.history.entries = {
+            "manylinux/small": {"duration": 5.0, "peak-rss": GiB},
+            "manylinux/torch": {"duration": 300.0, "peak-rss": 7 * GiB},
+            "manylinux/numpy": {"duration": 120.0, "peak-rss": 6 * GiB},
+        }
+        self.targets = [_target("small"), _target("torch"), _target("numpy"), _target("unseen")]
+
+    def test_from_poetry(self):
+        poetry = MagicMock()
+        poetry.pyproject_path = Path("pyproject.toml")
+        config = PluginConfig.from_data({"memory-limit": "8G"}, Path("."))
+        scheduler = Scheduler.from_poetry(poetry, self.io, config)
+        self.assertEqual((scheduler.memory_limit, scheduler.history.path.name), (8 * GiB, "build-history.json"))
+
+        config = PluginConfig.from_data({}, Path("."))
+        self.assertEqual(Scheduler.from_poetry(poetry, self.io, config).jobs, 1)
+
+    def test_order(self):
+        scheduler = Scheduler(self.io, self.history)
+        self.assertEqual([t.prog for t in scheduler.order(self.targets)], ["torch", "numpy", "unseen", "small"])
+
+    def test_run_serial(self):
+        scheduler = Scheduler(self.io, self.history)
+        self.assertEqual(scheduler.jobs, 1)
+
+        built = []
+        scheduler.run(self.targets, lambda target: built.append(target.prog))
+        self.assertEqual(built, ["torch", "numpy", "unseen", "small"])
+
+    def test_run_work_dir(self):
+        self.history.entries["manylinux/torch"].update({"disk-duration": 330.0, "work-size": 2 * GiB})
+        torch = self.targets[1]
+        estimates = []
+
+        def build(target):
+            estimates.append(target.work_size_estimate)
+            target.duration, target.work_dir_used = 280.0, Path("/dev/shm")
+
+        Scheduler(self.io, self.history).run([torch], build)
+        self.assertEqual(estimates, [2 * GiB])
+        self.assertEqual(torch.io_saved, 50.0)
+
+    def test_run_memory_limit(self):
+        scheduler = Scheduler(self.io, self.history, memory_limit=9 * GiB, jobs=4)
+        lock = threading.Lock()
+        running, peaks = {}, []
+
+        def build(target):
+            with lock:
+                running[target.prog] = self.history.estimate(target)[1]
+                peaks.append(sum(running.values()))
+            time.sleep(0.05)
+            with lock:
+                del running[target.prog]
+            target.duration = 1.0
+
+        scheduler.run(self.targets, build)
+
+        self.assertLessEqual(max(peaks), 9 * GiB)
+        self.assertEqual(len(peaks), 4)
+        for target in self.targets:
+            self.assertEqual(self.history.estimate(target)[0], 1.0)
+
+    def test_run_target_over_limit(self):
+        scheduler = Scheduler(self.io, self.history, memory_limit=4 * GiB, jobs=4)
+        scheduler.warning = MagicMock()
+        built = []
+        scheduler.run(self.targets, lambda target: built.append(target.prog))
+
+        self.assertEqual(sorted(built), ["numpy", "small", "torch", "unseen"])
+        scheduler.warning.assert_called()
+
+    def test_run_error(self):
+        scheduler = Scheduler(self.io, self.history, memory_limit=2 * GiB, jobs=2)
+        built = []
+
+        def build(target):
+            if target.prog == "torch":
+                raise RuntimeError("build failed")
+            built.append(target.prog)
+
+        with self.assertRaisesRegex(RuntimeError, "build failed"):
+            scheduler.run(self.targets, build)
+        self.assertNotIn("small", built)
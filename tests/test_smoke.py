@@ -0,0 +1,77 @@
+import stat
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipIf
+
+from poetry_pyinstaller_plugin.smoke import (SmokeConfig, SmokeResult,
+                                             check_smoke_result,
+                                             run_smoke_test)
+
+
+class TestSmokeConfig(TestCase):
+
+    def test_from_config(self):
+        self.assertIsNone(SmokeConfig.from_config(None))
+        self.assertIsNone(SmokeConfig.from_config(False))
+        self.assertEqual(SmokeConfig.from_config(True), SmokeConfig())
+
+        config = SmokeConfig.from_config({"args": ["--version"], "exit-code": 2, "cold-budget": 1.5})
+        self.assertEqual(config, SmokeConfig(args=["--version"], exit_code=2, cold_budget=1.5))
+
+    def test_from_config_unknown(self):
+        with self.assertRaises(ValueError) as exc:
+            SmokeConfig.from_config({"arguments": ["--version"]})
+        self.assertIn("'arguments'", exc.exception.args[0])
+
+
+class TestSmokeResult(TestCase):
+
+    def test_latency(self):
+        result = SmokeResult(0, "", [0.5, 0.1, 0.3, 0.2])
+        self.assertEqual(result.cold, 0.5)
+        self.assertEqual(result.warm, 0.2)
+        self.assertIsNone(SmokeResult(0, "", [0.5]).warm)
+
+    def test_check(self):
+        result = SmokeResult(0, "Hello world !", [0.5, 0.1, 0.2])
+        check_smoke_result("my-tool", SmokeConfig(budget=0.2, cold_budget=1.0), result)
+
+        with self.assertRaisesRegex(RuntimeError, "over budget of 0.1s"):
+            check_smoke_result("my-tool", SmokeConfig(budget=0.1), result)
+
+        with self.assertRaisesRegex(RuntimeError, "Cold startup of my-tool took 0.500s"):
+            check_smoke_result("my-tool", SmokeConfig(cold_budget=0.4), result)
+
+        with self.assertRaisesRegex(RuntimeError, "exited with code 0 \\(expected 1\\):\nHello world !"):
+            check_smoke_result("my-tool", SmokeConfig(exit_code=1), result)
+
+
+@skipIf(sys.platform == "win32", "requires executable script")
+class TestRunSmokeTest(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.executable = Path(self.tmp.name) / "my-tool"
+        self.executable.write_text(
+            f"#!{sys.executable}\nimport sys\nprint(sys.argv[1:])\nsys.exit(len(sys.argv) - 1)\n")
+        self.executable.chmod(self.executable.stat().st_mode | stat.S_IEXEC)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run(self):
+        result = run_smoke_test(self.executable, SmokeConfig(args=["--version"], exit_code=1, runs=3))
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(result.output, "['--version']\n")
+        self.assertEqual(len(result.timings), 3)
+
+    def test_run_unexpected_exit_code(self):
+        result = run_smoke_test(self.executable, SmokeConfig(args=["--version"], runs=3))
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(len(result.timings), 1)
+
+    def test_run_timeout(self):
+        self.executable.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(5)\n")
+        with self.assertRaisesRegex(RuntimeError, "timed out"):
+            run_smoke_test(self.executable, SmokeConfig(timeout=0.2))
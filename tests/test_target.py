@@ -1,13 +1,25 @@
 import logging
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
 from pathlib import Path
 from unittest import TestCase
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 from poetry.core.version.pep440 import PEP440Version
 from poetry.factory import Factory
 
-from poetry_pyinstaller_plugin import Target
+from poetry_pyinstaller_plugin import Target, utils
+from poetry_pyinstaller_plugin.backends import SimulatedBackend
+from poetry_pyinstaller_plugin.bytecode import (CODE_CACHE_SCRIPT,
+                                                PYINSTALLER_SCRIPT)
+from poetry_pyinstaller_plugin.config import ConfigError
+from poetry_pyinstaller_plugin.profiling import PROFILE_WRAPPER
+from poetry_pyinstaller_plugin.smoke import SmokeConfig, SmokeResult
+from poetry_pyinstaller_plugin.target import PEAK_RSS_WRAPPER
 
 
 class TestUtilityFunctions(TestCase):
@@ -43,14 +55,6 @@ class TestUtilityFunctions(TestCase):
         self.assertIsNotNone(self.target._global_config)
         self.assertIsNotNone(self.target._global_config.lookup("tool.poetry-pyinstaller-plugin.targets.my-tool"))
 
-    def test__plugin_config(self):
-        self.assertEqual(self.target._plugin_config,
-                         self.target._global_config.get_section("tool.poetry-pyinstaller-plugin"))
-
-    def test__target_config(self):
-        self.assertEqual(self.target._target_config,
-                         self.target._global_config.get_section("tool.poetry-pyinstaller-plugin.targets.my-tool-2"))
-
     def test_prog(self):
         self.assertEqual(self.target.prog, "my-tool-2")
 
@@ -70,6 +74,11 @@ class TestUtilityFunctions(TestCase):
     def test_default_type(self):
         self.assertEqual(self.target.type, "onedir")
 
+    def test_default_backend(self):
+        self.assertEqual(self.target.backend, "pyinstaller")
+        self.target.dist_path = Path("dist")
+        self.assertEqual(self.target.build_command, self.target.pyinstaller_command)
+
     def test_default_bundle(self):
         self.assertEqual(self.target.bundle, False)
 
@@ -128,6 +137,9 @@ class TestUtilityFunctions(TestCase):
     def test_default_runtime_hooks(self):
         self.assertEqual(self.target.runtime_hooks, [])
 
+    def test_default_python_options(self):
+        self.assertEqual(self.target.python_options, [])
+
     def test_default_copy_metadata_config(self):
         self.assertEqual(self.target.copy_metadata_config, [])
 
@@ -137,6 +149,83 @@ class TestUtilityFunctions(TestCase):
     def test_default_package_config(self):
         self.assertEqual(self.target.package_config, dict())
 
+    def test_default_groups(self):
+        self.assertEqual(self.target.groups, None)
+
+    def test_default_extras(self):
+        self.assertEqual(self.target.extras, None)
+
+    def test_default_archive(self):
+        self.assertEqual(self.target.archive, None)
+
+    def test_default_optimize_binaries(self):
+        self.assertEqual(self.target.optimize_binaries, False)
+        self.assertEqual(self.target.upx_exclude, [])
+
+    def test_default_profile(self):
+        self.assertEqual(self.target.profile, False)
+
+    def test_default_prepared(self):
+        self.assertEqual(self.target.prepared, False)
+
+    def test_default_workspace(self):
+        self.assertIsNone(self.target.workspace)
+
+    def test_resolve_path(self):
+        self.assertEqual(self.target.resolve_path("icon.ico"), Path("icon.ico").resolve())
+
+        # Workspace builds are not run from target's project
+        self.target.workspace = "test_project"
+        self.target.dist_path = Path("dist").resolve()
+        self.assertEqual(self.target.resolve_path("icon.ico"), Path("test_project", "icon.ico").resolve())
+        command = self.target.pyinstaller_command
+        self.assertEqual(command[command.index("--add-data") + 1], f"{Path('test_project', 'README.md').resolve()}:.")
+
+    def test_default_hooks(self):
+        # Plugin level hooks are not inherited by targets
+        self.assertIsNone(self.target.pre_build)
+        self.assertIsNone(self.target.post_build)
+
+        self.target = Target("my-tool-3", self.poetry, self.io)
+        self.assertEqual(self.target.post_build, "hooks.pyinstaller:sign")
+
+    def test_default_smoke(self):
+        self.assertEqual(self.target.smoke, None)
+
+    def test_smoke_test(self):
+        self.target.smoke = SmokeConfig(budget=1.0)
+        self.target.dist_path = Path("dist")
+        self.target.log = MagicMock()
+        with patch("poetry_pyinstaller_plugin.target.run_smoke_test") as mock_run:
+            mock_run.return_value = SmokeResult(0, "", [0.5, 0.25, 0.25])
+            self.target.smoke_test()
+            mock_run.assert_called_with(Path("dist", "my-tool-2", "my-tool-2"), self.target.smoke)
+            self.target.log.assert_called_with(
+                "  - Smoke tested <c1>my-tool-2</c1> <debug>(exit code 0, cold 0.500s, warm 0.250s)</debug>")
+
+            mock_run.return_value = SmokeResult(0, "", [2.0])
+            with self.assertRaises(RuntimeError):
+                self.target.smoke_test()
+
+    def test_default_bundle_wheels(self):
+        self.assertEqual(self.target.bundle_wheels, ["*-py3-none-any.whl"])
+
+    def test_default_contents_directory(self):
+        self.assertEqual(self.target.contents_directory, None)
+        self.assertEqual(self.target.contents_directory_name, "_my-tool-2_internal")
+
+        # Bundled targets share contents directory in wheels
+        self.target.bundle = True
+        self.assertEqual(self.target.contents_directory_name, "_internal")
+        self.target.contents_directory = "_my_internal"
+        self.assertEqual(self.target.contents_directory_name, "_my_internal")
+
+    def test_property_install_args(self):
+        self.assertEqual(self.target.install_args, ("--all-extras", "--all-groups"))
+
+        self.target = Target("my-tool-3", self.poetry, self.io)
+        self.assertEqual(self.target.install_args, ("--only", "main,build", "--extras", "cli"))
+
     def test_property_pyinstaller_command_simple(self):
         expected = [
             'pyinstaller',
@@ -253,22 +342,108 @@ class TestUtilityFunctions(TestCase):
         self.assertEqual(args, ["--debug=all", "--log-level=DEBUG"])
 
     def test_validate(self):
-        with self.assertRaises(ValueError) as exc:
-            self.target.type = "not_a_type"
-            self.target.validate()
+        # Values of options are checked by plugin configuration when target compiles its own
+        section = self.poetry.pyproject.data["tool"]["poetry-pyinstaller-plugin"]["targets"]["my-tool-2"]
+        for option, value, error in [
+            ("type", "not_a_type", "targets.my-tool-2.type: 'not_a_type' not in ['onefile', 'onedir']"),
+            ("when", "sunshine", "targets.my-tool-2.when: 'sunshine' not in ['release', 'prerelease']"),
+            ("archive", "rar", "targets.my-tool-2.archive: 'rar' not in ['tar.gz', 'tar.xz', 'tar.zst', 'zip']"),
+            ("backend", "py2exe", "targets.my-tool-2.backend: 'py2exe' not in ['pyinstaller', 'nuitka', 'simulated']"),
+        ]:
+            section[option] = value
+            try:
+                with self.assertRaises(ConfigError) as exc:
+                    Target("my-tool-2", self.poetry, self.io)
+            finally:
+                del section[option]
+            self.assertEqual(exc.exception.problems, [error])
+
+    def test_property_archive_path(self):
+        self.target.dist_path = Path("dist")
+        self.assertIsNone(self.target.archive_path)
 
-        self.assertIn(
-            "ValueError: Unsupported distribution type for target 'my-tool-2', 'not_a_type' not in ['onefile', 'onedir'].",
-            " ".join(exc.exception.args))
+        self.target.archive = "tar.gz"
+        self.assertEqual(self.target.archive_path, Path("dist", "my-tool-2.tar.gz"))
 
-        with self.assertRaises(ValueError) as exc:
+    def test_create_archive(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.dist_path = Path(tmp)
             self.target.type = "onefile"
-            self.target.when = "sunshine"
-            self.target.validate()
+            self.target.archive = "zip"
+            self.target.executable_path.write_text("binary")
+            self.target.log = MagicMock()
 
-        self.assertIn(
-            "ValueError: Unsupported value for field 'when' for target 'my-tool-2', 'sunshine' not in ['release', 'prerelease'].",
-            " ".join(exc.exception.args))
+            checksum = self.target.create_archive()
+            self.assertEqual(len(checksum), 64)
+            self.assertTrue(Path(tmp, "my-tool-2.zip.sha256").exists())
+            self.target.log.assert_any_call("  - Archiving <c1>my-tool-2</c1> <debug>(zip)</debug>")
+
+    def test_property_contents_directory(self):
+        self.target.dist_path = Path("dist")
+        self.target.contents_directory = "_internal"
+        command = self.target.pyinstaller_command
+        self.assertEqual(command[command.index("--contents-directory") + 1], "_internal")
+
+    def test_property_python_options(self):
+        self.target.dist_path = Path("dist")
+        self.target.python_options = ["X importtime", "u"]
+        command = self.target.pyinstaller_command
+        index = command.index("--python-option")
+        self.assertEqual(command[index:index + 4], ["--python-option", "X importtime", "--python-option", "u"])
+
+    def test_property_pyinstaller_command_optimize_binaries(self):
+        self.target.dist_path = Path("dist")
+        self.target.strip = True
+        self.target.upx_exclude = ["vcruntime140.dll"]
+        command = self.target.pyinstaller_command
+        self.assertIn("--strip", command)
+        self.assertEqual(command[command.index("--upx-exclude") + 1], "vcruntime140.dll")
+
+        self.target.optimize_binaries = True
+        self.assertTrue(self.target.post_process_binaries)
+        command = self.target.pyinstaller_command
+        self.assertNotIn("--strip", command)
+        self.assertNotIn("--upx-exclude", command)
+        self.assertIn("--noupx", command)
+
+        self.target.type = "onefile"
+        self.assertFalse(self.target.post_process_binaries)
+        self.assertIn("--strip", self.target.pyinstaller_command)
+
+    def test_property_output_path(self):
+        self.target.dist_path = Path("dist")
+        self.assertEqual(self.target.output_path, Path("dist", "my-tool-2"))
+        self.assertEqual(self.target.executable_path, Path("dist", "my-tool-2", "my-tool-2"))
+
+        self.target.type = "onefile"
+        self.assertEqual(self.target.output_path, Path("dist", "my-tool-2"))
+        self.assertEqual(self.target.executable_path, Path("dist", "my-tool-2"))
+
+        self.target.platform = "win_amd64"
+        self.assertEqual(self.target.output_path, Path("dist", "my-tool-2.exe"))
+
+    def test_resolve_dist_path(self):
+        command = MagicMock()
+        command.option.return_value = None
+        self.assertEqual(self.target.resolve_dist_path(command), Path("dist", "pyinstaller", "manylinux").resolve())
+        self.assertEqual(self.target.dist_path, Path("dist", "pyinstaller", "manylinux").resolve())
+
+    def test_property_watch_paths(self):
+        project_path = Path("test_project").resolve()
+        self.assertEqual(self.target.watch_paths, [
+            project_path / "test_package" / "main.py",
+            project_path / "README.md",
+        ])
+
+        self.target = Target("my-tool-3", self.poetry, self.io)
+        self.assertEqual(self.target.watch_paths, [
+            project_path / "test_package" / "main.py",
+            project_path / "hooks" / "my_hook.py",
+            project_path / "certificate.crt",
+            project_path / "file.txt",
+            project_path / "file.txt",
+            project_path / "icon.ico",
+        ])
 
     def test_property_skip(self):
         self.assertFalse(self.target.skip)
@@ -294,11 +469,253 @@ class TestUtilityFunctions(TestCase):
         mock_log = MagicMock()
         self.target.log = mock_log
 
-        self.target.build(self.poetry, command)
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp)
+            self.target.build(self.poetry, command)
 
         mock_log.assert_any_call('  - Building <c1>my-tool-2</c1>')
         mock_log.assert_any_call('  - Built <success>my-tool-2</success>')
 
+    def test_build_prepared(self):
+        self.target.log = MagicMock()
+        self.target._install_dependencies = MagicMock()
+        self.target._deploy_certificates = MagicMock()
+        self.target._run_pyinstaller = MagicMock()
+        self.target.work_path = Path(tmp := tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+
+        self.target.prepared = True
+        self.target.build(self.poetry, MagicMock())
+        self.target._install_dependencies.assert_not_called()
+        self.target._deploy_certificates.assert_not_called()
+        self.target._run_pyinstaller.assert_called()
+
+        self.target.prepared = False
+        self.target.build(self.poetry, MagicMock())
+        self.target._install_dependencies.assert_called()
+        self.target._deploy_certificates.assert_called()
+
+    def test_build_publish(self):
+        self.target.log = MagicMock()
+        self.target.backend = "simulated"
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp, "build")
+            dist_path = Path(tmp, "dist")
+            (dist_path / "my-tool-2").mkdir(parents=True)
+            (dist_path / "my-tool-2" / "stale").touch()
+
+            simulated_build = SimulatedBackend.build
+
+            def build(target, venv):
+                # Backend writes to per-build scratch folder, not to dist path
+                self.assertEqual(target.build_dist_path, target.scratch_path / "dist")
+                self.assertIn(str(target.scratch_path / "specs"), target.pyinstaller_command)
+                self.assertTrue(target.work_lock.path.exists())
+                simulated_build(SimulatedBackend(), target, venv)
+
+            with patch("poetry_pyinstaller_plugin.backends.SimulatedBackend.build", side_effect=build):
+                self.target.build(self.poetry, MagicMock(), dist_path=dist_path)
+
+            self.assertIsNone(self.target.scratch_path)
+            self.assertEqual(list(Path(tmp, "build", ".scratch").iterdir()), [])
+            self.assertTrue(self.target.executable_path.exists())
+            self.assertFalse((self.target.output_path / "stale").exists())
+            self.assertEqual(sorted(p.name for p in dist_path.iterdir()), [".locks", "my-tool-2"])
+
+    def test_build_events(self):
+        self.target.log = MagicMock()
+        self.target.warning = MagicMock()
+        self.target.backend = "simulated"
+        self.target.events = MagicMock()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp, "build")
+            self.target.build(self.poetry, MagicMock(), dist_path=Path(tmp, "dist"))
+
+            events = [(c.args[0], c.kwargs.get("phase")) for c in self.target.events.emit.call_args_list]
+            self.assertEqual(events, [("target-started", None), ("target-phase", "build"),
+                                      ("target-phase", "publish"), ("target-finished", None)])
+            finished = self.target.events.emit.call_args.kwargs
+            self.assertEqual(finished["target"], "my-tool-2")
+            self.assertEqual(finished["output"], self.target.output_path)
+            self.assertEqual(finished["output_size"], utils.get_tree_size(self.target.output_path))
+
+            # Failed builds report their error
+            self.target.events.reset_mock()
+            with patch("poetry_pyinstaller_plugin.backends.SimulatedBackend.build", side_effect=RuntimeError("boom")):
+                with self.assertRaises(RuntimeError):
+                    self.target.build(self.poetry, MagicMock(), dist_path=Path(tmp, "dist"))
+            self.target.events.emit.assert_called_with("target-failed", target="my-tool-2", workspace=None,
+                                                       duration=ANY, error="RuntimeError: boom")
+
+        self.target.when = "prerelease"
+        self.target.build(self.poetry, MagicMock())
+        self.target.events.emit.assert_called_with("target-skipped", target="my-tool-2", workspace=None,
+                                                   reason="on prerelease only")
+
+    def test_build_resources(self):
+        self.target.log = MagicMock()
+        self.target.backend = "simulated"
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp, "build")
+            self.target.project_path = Path(tmp, "project")
+            (self.target.project_path / "data").mkdir(parents=True)
+            (self.target.project_path / "data" / "model.bin").write_bytes(b"model")
+            self.target.resources_config = {"data": "models"}
+            dist_path = Path(tmp, "dist")
+
+            def build(target, venv):
+                hook = target.resources_hook_path.read_text()
+                resources = "os.path.join(os.path.dirname(sys.executable), 'my-tool-2.resources')"
+                self.assertIn(f"_install({resources}, False)", hook)
+                self.assertIn(str(target.resources_hook_path), target.pyinstaller_command)
+
+            with patch("poetry_pyinstaller_plugin.backends.SimulatedBackend.build", side_effect=build):
+                self.target.build(self.poetry, MagicMock(), dist_path=dist_path)
+            self.assertEqual(self.target.resources_path, dist_path / "my-tool-2" / "my-tool-2.resources")
+            self.assertEqual((self.target.resources_path / "models" / "model.bin").read_bytes(), b"model")
+
+            # Resources of 'onefile' targets are published & archived next to executable
+            self.target.type = "onefile"
+            self.target.resources_mode = "pack"
+            self.target.archive = "zip"
+            self.target.build(self.poetry, MagicMock(), dist_path=dist_path)
+            self.assertEqual(self.target.resources_path, dist_path / "my-tool-2.pack")
+            self.assertTrue(self.target.resources_path.read_bytes().startswith(b"PYIRPACK"))
+            self.target.create_archive()
+            with zipfile.ZipFile(self.target.archive_path) as archive:
+                self.assertEqual(archive.namelist(), ["my-tool-2", "my-tool-2.pack"])
+
+            self.assertEqual(self.target.wheel_resources(Path(tmp)),
+                             [Path(tmp, "pyinstaller", "manylinux", "my-tool-2.pack")])
+            self.target.resources_config = {}
+            self.assertEqual(self.target.wheel_resources(Path(tmp)), [])
+            self.assertNotIn("--runtime-hook", self.target.pyinstaller_command)
+
+    def test_build_package(self):
+        self.target.log = MagicMock()
+        self.target.backend = "simulated"
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp, "build")
+            Path(tmp, "docs").mkdir()
+            Path(tmp, "docs", "index.md").write_text("docs")
+            Path(tmp, "LICENSE").write_text("license")
+            self.target.package_config = {str(Path(tmp, "docs")): "docs", str(Path(tmp, "LICENSE")): "LICENSE.txt"}
+            dist_path = Path(tmp, "dist")
+
+            # Packaged files are copied within output folder of 'onedir' targets
+            self.target.build(self.poetry, MagicMock(), dist_path=dist_path)
+            self.assertEqual((dist_path / "my-tool-2" / "docs" / "index.md").read_text(), "docs")
+            self.assertEqual((dist_path / "my-tool-2" / "LICENSE.txt").read_text(), "license")
+            self.assertEqual(self.target.extra_outputs, [])
+
+            # and published & archived next to executable of 'onefile' targets
+            self.target.type = "onefile"
+            self.target.archive = "zip"
+            self.target.build(self.poetry, MagicMock(), dist_path=dist_path)
+            self.assertEqual(self.target.extra_outputs, [dist_path / "LICENSE.txt", dist_path / "docs"])
+            self.assertEqual((dist_path / "docs" / "index.md").read_text(), "docs")
+            self.target.create_archive()
+            with zipfile.ZipFile(self.target.archive_path) as archive:
+                self.assertEqual(sorted(archive.namelist()), ["LICENSE.txt", "docs/index.md", "my-tool-2"])
+
+    def test_validate_resources(self):
+        self.target.resources_config = {"data": "."}
+        self.target.bundle = True
+        self.target.validate()
+        self.target.type = "onefile"
+        with self.assertRaises(ValueError):
+            self.target.validate()
+        self.target.resources_mode = "pack"
+        self.target.validate()
+
+    def test_optimize_level(self):
+        self.assertEqual(self.target.optimize_level, 0)
+        self.target.python_options = ["u", "O"]
+        self.assertEqual(self.target.optimize_level, 1)
+        self.target.python_options = ["OO", "X importtime"]
+        self.assertEqual(self.target.optimize_level, 2)
+
+    def test_default_work_dir(self):
+        self.assertIsNone(self.target.work_dir)
+        self.assertIsNone(self.target.work_dir_size)
+        self.assertEqual(self.target.build_work_path, self.target.work_path)
+
+        section = self.poetry.pyproject.data["tool"]["poetry-pyinstaller-plugin"]
+        section["work-dir-size"] = "512M"
+        self.assertEqual(Target("my-tool-2", self.poetry, self.io).work_dir_size, 512 * 1024 ** 2)
+        del section["work-dir-size"]
+
+    def _work_dir_backend(self, fail=None):
+        backend = MagicMock()
+        workpaths = []
+
+        def build(target, venv):
+            command = target.pyinstaller_command
+            workpaths.append(Path(command[command.index("--workpath") + 1]))
+            (target.build_work_path / target.prog).mkdir(parents=True, exist_ok=True)
+            (target.build_work_path / target.prog / "base_library.zip").write_bytes(b"0" * 1024)
+            if fail and len(workpaths) == 1:
+                raise fail
+
+        backend.build.side_effect = build
+        return backend, workpaths
+
+    def test_build_in_work_dir(self):
+        self.target.warning = MagicMock()
+        self.target.dist_path = Path("dist").resolve()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp, "build")
+            self.target.work_dir = str(Path(tmp, "shm"))
+            Path(tmp, "shm").mkdir()
+            backend, workpaths = self._work_dir_backend()
+
+            self.target._build_in_work_dir(backend, None)
+            self.assertEqual(workpaths[0].parent, Path(tmp, "shm"))
+            self.assertEqual(self.target.work_dir_used, Path(tmp, "shm"))
+            self.assertEqual(self.target.work_size, 1024)
+            self.assertIsNone(self.target.external_work_path)
+            self.assertEqual(list(Path(tmp, "shm").iterdir()), [])
+
+            # Not enough space, built on disk
+            self.target.work_dir_used = None
+            self.target.work_dir_size = 1024 ** 5
+            self.target._build_in_work_dir(backend, None)
+            self.assertEqual(workpaths[1], self.target.work_path)
+            self.assertIsNone(self.target.work_dir_used)
+            self.assertEqual(self.target.work_size, 1024)
+            self.assertIn("Not enough space in work dir", self.target.warning.call_args.args[0])
+
+            # Missing work dir
+            self.target.work_dir = str(Path(tmp, "missing"))
+            self.target._build_in_work_dir(backend, None)
+            self.assertEqual(workpaths[2], self.target.work_path)
+            self.assertIn("unavailable", self.target.warning.call_args.args[0])
+
+    def test_build_in_work_dir_failure(self):
+        self.target.warning = MagicMock()
+        self.target.dist_path = Path("dist").resolve()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp, "build")
+            self.target.work_dir = str(Path(tmp, "shm"))
+            Path(tmp, "shm").mkdir()
+
+            # Failing build is not retried, intermediates are kept
+            backend, workpaths = self._work_dir_backend(fail=RuntimeError("failed"))
+            with self.assertRaises(RuntimeError):
+                self.target._build_in_work_dir(backend, None)
+            self.assertTrue((workpaths[0] / self.target.prog).exists())
+            self.assertIsNone(self.target.external_work_path)
+
+            # Work dir got full, build is retried on disk
+            backend, workpaths = self._work_dir_backend(fail=OSError("No space left on device"))
+            usage = [MagicMock(free=2 * 1024 ** 3), MagicMock(free=1024)]
+            with patch("poetry_pyinstaller_plugin.target.disk_usage", side_effect=usage):
+                self.target._build_in_work_dir(backend, None)
+            self.assertFalse(workpaths[0].exists())
+            self.assertEqual(workpaths[1], self.target.work_path)
+            self.assertIsNone(self.target.work_dir_used)
+            self.assertIn("is full", self.target.warning.call_args.args[0])
+
     def test_build_skipped(self):
         command = MagicMock()
         mock_log = MagicMock()
@@ -318,6 +735,10 @@ class TestUtilityFunctions(TestCase):
         mock_log.assert_any_call("<debug>run 'poetry install --all-extras --all-groups'</debug>")
         self.mock_venv.run.assert_called()
 
+        self.target.groups = ["main"]
+        self.target._install_dependencies(self.mock_venv)
+        mock_log.assert_any_call("<debug>run 'poetry sync --only main --all-extras'</debug>")
+
     def test__deploy_certificates(self):
         mock_log = MagicMock()
         self.target.log = mock_log
@@ -337,3 +758,54 @@ class TestUtilityFunctions(TestCase):
         self.target.dist_path = Path("dist")
         self.target._run_pyinstaller(self.mock_venv)
         self.mock_venv.run.assert_called()
+        self.assertIsNone(self.target.peak_rss)
+
+        # PyInstaller cache of target is not shared with concurrent builds, '--clean' only wipes its own
+        self.assertIn("--clean", self.target.pyinstaller_command)
+        env = self.mock_venv.run.call_args.kwargs["env"]
+        self.assertEqual(env["PYINSTALLER_CONFIG_DIR"], str(self.target.work_path / ".pyinstaller" / "my-tool-2"))
+
+    def test__run_pyinstaller_profile(self):
+        self.target.log = MagicMock()
+        self.mock_venv.run = MagicMock()
+        self.target.dist_path = Path("dist")
+        self.target.profile = True
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp)
+            self.assertEqual(self.target.profile_path, Path(tmp, "my-tool-2", "pyinstaller.prof"))
+            self.target._run_pyinstaller(self.mock_venv)
+            self.assertTrue(self.target.profile_path.parent.is_dir())
+
+        args = self.mock_venv.run.call_args.args
+        self.assertEqual(args[:3], ("python", "-c", PROFILE_WRAPPER))
+        self.assertEqual(args[4], str(self.target.profile_path))
+        self.assertEqual(args[5], str(self.target.source))
+
+    def test__run_pyinstaller_precompiled(self):
+        self.target.log = MagicMock()
+        self.mock_venv.run = MagicMock()
+        self.target.dist_path = Path("dist")
+        self.target.precompiled = True
+        self.target._run_pyinstaller(self.mock_venv)
+        args = self.mock_venv.run.call_args.args
+        self.assertEqual(args[4:7], ("python", "-c", PYINSTALLER_SCRIPT))
+        self.assertEqual(args[7], str(self.target.source))
+
+        self.target.profile = True
+        with tempfile.TemporaryDirectory() as tmp:
+            self.target.work_path = Path(tmp)
+            self.target._run_pyinstaller(self.mock_venv)
+        self.assertEqual(self.mock_venv.run.call_args.args[2], CODE_CACHE_SCRIPT + PROFILE_WRAPPER)
+
+    def test_peak_rss_wrapper(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rss_path = Path(tmp, "rss")
+            allocate = "bytearray(64 * 1024 ** 2)"
+            subprocess.run([sys.executable, "-c", PEAK_RSS_WRAPPER, rss_path, sys.executable, "-c", allocate],
+                           check=True)
+            if sys.platform != "win32":
+                self.assertGreater(int(rss_path.read_text()), 64 * 1024 ** 2)
+
+            out = subprocess.run([sys.executable, "-c", PEAK_RSS_WRAPPER, rss_path, sys.executable, "-c",
+                                  "raise SystemExit(3)"])
+            self.assertEqual(out.returncode, 3)
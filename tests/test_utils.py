@@ -1,4 +1,6 @@
 import os
+import subprocess
+import tempfile
 from pathlib import Path
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
@@ -9,7 +11,11 @@ from tomlkit import TOMLDocument, parse
 
 from poetry_pyinstaller_plugin.utils import (LoggingMixin, PyProjectConfig,
                                              get_base_modules_path,
-                                             get_output_path, get_platform)
+                                             get_cache_path, get_changed_files,
+                                             format_size, get_option,
+                                             get_output_path, get_platform,
+                                             get_tree_size, is_ignored,
+                                             parse_size)
 
 
 class TestLoggingMixin(TestCase):
@@ -105,6 +111,72 @@ class TestUtilityFunctions(TestCase):
         command.option.return_value = "custom"
         self.assertEqual(get_output_path(command), Path("custom").resolve())
 
+    def test_get_option(self):
+        command = MagicMock()
+        command.option.return_value = "HEAD~1"
+
+        command.io.input.has_option.return_value = True
+        self.assertEqual(get_option(command, "changed-since"), "HEAD~1")
+
+        command.io.input.has_option.return_value = False
+        self.assertEqual(get_option(command, "changed-since", "default"), "default")
+
+        command.io.input.has_option.return_value = True
+        command.option.return_value = ["services/*"]
+        self.assertEqual(get_option(command, "projects"), ["services/*"])
+
+    def test_get_cache_path(self):
+        poetry = Factory().create_poetry(cwd=Path("test_project"))
+        self.assertEqual(get_cache_path(poetry), Path("test_project", "build", ".cache").resolve())
+
+    def test_is_ignored(self):
+        self.assertTrue(is_ignored(Path("build", "linux", "file.txt")))
+        self.assertTrue(is_ignored(Path("package", "__pycache__", "main.cpython-312.pyc")))
+        self.assertTrue(is_ignored(Path("package", "main.py~")))
+        self.assertFalse(is_ignored(Path("package", "main.py")))
+
+    def test_get_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp).resolve()
+            git = ("git", "-c", "user.name=test", "-c", "user.email=test@localhost")
+            subprocess.run((*git, "init", "-q"), cwd=root, check=True)
+            (root / "committed.py").write_text("")
+            (root / "modified.py").write_text("")
+            subprocess.run((*git, "add", "."), cwd=root, check=True)
+            subprocess.run((*git, "commit", "-q", "-m", "init"), cwd=root, check=True)
+
+            (root / "modified.py").write_text("import os")
+            (root / "untracked.py").write_text("")
+
+            self.assertEqual(get_changed_files(root, "HEAD"), {root / "modified.py", root / "untracked.py"})
+
+            with self.assertRaises(RuntimeError):
+                get_changed_files(root, "does-not-exist")
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size(1024), 1024)
+        self.assertEqual(parse_size("1024"), 1024)
+        self.assertEqual(parse_size("512M"), 512 * 1024 ** 2)
+        self.assertEqual(parse_size("8G"), 8 * 1024 ** 3)
+        self.assertEqual(parse_size("1.5GiB"), int(1.5 * 1024 ** 3))
+        self.assertEqual(parse_size("16 gb"), 16 * 1024 ** 3)
+
+        with self.assertRaises(ValueError):
+            parse_size("lots")
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), "512 B")
+        self.assertEqual(format_size(1536), "1.5 KiB")
+        self.assertEqual(format_size(7 * 1024 ** 3), "7.0 GiB")
+
+    def test_get_tree_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "a").mkdir()
+            Path(tmp, "a", "base_library.zip").write_bytes(b"0" * 1000)
+            Path(tmp, "toc.txt").write_bytes(b"0" * 24)
+            self.assertEqual(get_tree_size(Path(tmp)), 1024)
+            self.assertEqual(get_tree_size(Path(tmp, "missing")), 0)
+
 
 class TestPyProjectConfig(TestCase):
 
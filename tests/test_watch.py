@@ -0,0 +1,85 @@
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+from poetry_pyinstaller_plugin.watch import (InotifyWatcher, PollingWatcher,
+                                             _Watcher, create_watcher)
+
+
+class TestFunctions(TestCase):
+
+    def test_create_watcher(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            watcher = create_watcher([Path(tmp)], polling=True)
+            self.assertIsInstance(watcher, PollingWatcher)
+            watcher.close()
+
+    def test_abstract_watcher(self):
+        with self.assertRaises(TypeError):
+            _Watcher([])
+
+
+class _MetaWatcher(TestCase):
+    watcher_class = None
+
+    def setUp(self):
+        if self.watcher_class is None:
+            self.skipTest(reason="Watcher class not set.")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        (self.root / "package").mkdir()
+        (self.root / "package" / "main.py").write_text("print('hello')")
+        (self.root / "pyproject.toml").write_text("")
+        self.watcher = self.watcher_class([self.root / "package", self.root / "pyproject.toml"])
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp.cleanup()
+
+    def test_roots_and_files(self):
+        self.assertEqual(self.watcher.roots, {self.root / "package"})
+        self.assertEqual(self.watcher.files, {self.root / "pyproject.toml"})
+
+    def test_poll_no_changes(self):
+        self.assertEqual(self.watcher.poll(0.1), set())
+
+    def test_poll_modified(self):
+        time.sleep(0.01)
+        (self.root / "package" / "main.py").write_text("print('hello world')")
+        self.assertIn(self.root / "package" / "main.py", self.watcher.poll(1.0))
+
+    def test_poll_file(self):
+        time.sleep(0.01)
+        (self.root / "pyproject.toml").write_text("[project]")
+        self.assertIn(self.root / "pyproject.toml", self.watcher.poll(1.0))
+
+    def test_poll_ignored(self):
+        (self.root / "README.md").write_text("not watched")
+        (self.root / "package" / "__pycache__").mkdir()
+        (self.root / "package" / "__pycache__" / "main.pyc").write_text("")
+        self.assertEqual(self.watcher.poll(0.2), set())
+
+    def test_wait_debounce(self):
+        def edit():
+            for i in range(3):
+                (self.root / "package" / f"module_{i}.py").write_text("")
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=edit)
+        thread.start()
+        changes = self.watcher.wait(0.6)
+        thread.join()
+
+        self.assertEqual({p.name for p in changes}, {"module_0.py", "module_1.py", "module_2.py"})
+
+
+class TestPollingWatcher(_MetaWatcher):
+    watcher_class = PollingWatcher
+
+
+@skipUnless(sys.platform.startswith("linux"), "inotify is only available on linux")
+class TestInotifyWatcher(_MetaWatcher):
+    watcher_class = InotifyWatcher
@@ -0,0 +1,75 @@
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import TestCase
+
+from poetry_pyinstaller_plugin.wheel import (add_to_wheel, bundle_wheel,
+                                             get_platform_wheel_name)
+
+
+class TestWheel(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.wheel = self.root / "test_package-0.1.0-py3-none-any.whl"
+        with zipfile.ZipFile(self.wheel, "w") as wheel_f:
+            wheel_f.writestr("test_package-0.1.0.dist-info/WHEEL", "Wheel-Version: 1.0")
+
+        self.onedir = self.root / "my-tool"
+        (self.onedir / "_internal").mkdir(parents=True)
+        (self.onedir / "my-tool").write_text("executable")
+        (self.onedir / "_internal" / "libpython.so").write_text("library")
+        self.onefile = self.root / "my-tool-2"
+        self.onefile.write_text("executable")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def names(self, wheel):
+        with zipfile.ZipFile(wheel) as wheel_f:
+            return sorted(wheel_f.namelist())
+
+    def test_get_platform_wheel_name(self):
+        self.assertEqual(get_platform_wheel_name("pkg-0.1.0-py3-none-any.whl", "manylinux_2_39_x86_64"),
+                         "pkg-0.1.0-py3-none-manylinux_2_39_x86_64.whl")
+        self.assertEqual(get_platform_wheel_name("pkg-0.1.0-cp312-cp312-win_amd64.whl", "win_amd64"),
+                         "pkg-0.1.0-cp312-cp312-win_amd64.whl")
+
+    def test_add_to_wheel(self):
+        self.assertEqual(add_to_wheel(self.wheel, [self.onedir, self.onefile]), 0)
+        self.assertEqual(self.names(self.wheel), [
+            "test_package-0.1.0.data/scripts/_internal/libpython.so",
+            "test_package-0.1.0.data/scripts/my-tool",
+            "test_package-0.1.0.data/scripts/my-tool-2",
+            "test_package-0.1.0.dist-info/WHEEL",
+        ])
+
+    def test_bundle_wheel(self):
+        name, saved = bundle_wheel(self.wheel, [self.onedir], "manylinux")
+
+        self.assertEqual((name, saved), ("test_package-0.1.0-py3-none-manylinux.whl", 0))
+        self.assertFalse(self.wheel.exists())
+        self.assertIn("test_package-0.1.0.data/scripts/my-tool", self.names(self.root / name))
+        self.assertEqual([p.name for p in self.root.iterdir() if p.name.startswith(".")], [])
+
+    def test_bundle_platform_wheel(self):
+        wheel = self.wheel.rename(self.root / "test_package-0.1.0-cp312-cp312-manylinux.whl")
+        name, _ = bundle_wheel(wheel, [self.onefile], "manylinux")
+
+        self.assertEqual(name, wheel.name)
+        self.assertIn("test_package-0.1.0.data/scripts/my-tool-2", self.names(wheel))
+
+    def test_bundle_wheel_error(self):
+        with self.assertRaises(RuntimeError):
+            bundle_wheel(self.wheel, [self.onedir, self._conflict()], "manylinux")
+
+        # Original wheel is left untouched
+        self.assertEqual(self.names(self.wheel), ["test_package-0.1.0.dist-info/WHEEL"])
+        self.assertEqual([p.name for p in self.root.iterdir() if p.name.startswith(".")], [])
+
+    def _conflict(self):
+        other = self.root / "other"
+        (other / "_internal").mkdir(parents=True)
+        (other / "_internal" / "libpython.so").write_text("other library")
+        return other
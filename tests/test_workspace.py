@@ -0,0 +1,98 @@
+import tempfile
+import textwrap
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from poetry_pyinstaller_plugin.config import ConfigError
+from poetry_pyinstaller_plugin.workspace import (EnvironmentPool,
+                                                 discover_projects,
+                                                 load_project)
+
+PYPROJECT = textwrap.dedent("""
+[project]
+name = "{name}"
+version = "0.1.0"
+
+[tool.poetry-pyinstaller-plugin.targets]
+{name} = {{ source = "main.py", backend = "simulated" }}
+""")
+
+
+class TestWorkspace(TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name).resolve()
+        self.patch_platform = patch("poetry_pyinstaller_plugin.utils.get_platform", return_value="manylinux")
+        self.patch_platform.start()
+
+        self.io = MagicMock()
+        self.io.is_debug = MagicMock(return_value=False)
+
+        for name in ["api", "worker", "web"]:
+            self.create_project(Path("services", name), name)
+        (self.root / "services" / "web" / "pyproject.toml").write_text('[project]\nname = "web"\n')
+        (self.root / "services" / "README.md").touch()
+        self.create_project(Path("tools", "cli"), "cli")
+
+    def tearDown(self):
+        self.patch_platform.stop()
+        self.tmp.cleanup()
+
+    def create_project(self, path: Path, name: str, lock: str = "# lock"):
+        project = self.root / path
+        project.mkdir(parents=True, exist_ok=True)
+        (project / "pyproject.toml").write_text(PYPROJECT.format(name=name))
+        (project / "poetry.lock").write_text(lock)
+        return project
+
+    def test_discover_projects(self):
+        services = self.root / "services"
+        self.assertEqual(discover_projects(self.root, ["services/*"]), [services / "api", services / "worker"])
+        self.assertEqual(discover_projects(self.root, ["*/*/pyproject.toml", "services/api"]), [
+            services / "api", services / "worker", self.root / "tools" / "cli",
+        ])
+        self.assertEqual(discover_projects(self.root, ["missing/*"]), [])
+
+    def test_load_project(self):
+        project = load_project(self.root, self.root / "services" / "api", self.io)
+        self.assertEqual(project.name, "services/api")
+        self.assertEqual(project.path, self.root / "services" / "api")
+        self.assertEqual(project.dist_path, self.root / "services" / "api" / "dist" / "pyinstaller" / "manylinux")
+        self.assertEqual([target.prog for target in project.targets], ["api"])
+        self.assertEqual(project.targets[0].workspace, "services/api")
+        self.assertEqual(project.targets[0].source, self.root / "services" / "api" / "main.py")
+
+        output = self.root / "out"
+        project = load_project(self.root, self.root / "services" / "api", self.io, output)
+        self.assertEqual(project.dist_path, output / "services" / "api" / "pyinstaller" / "manylinux")
+
+    def test_load_project_invalid(self):
+        path = self.create_project(Path("services", "api"), "api")
+        (path / "pyproject.toml").write_text(PYPROJECT.format(name="api").replace('"simulated"', '"unknown"'))
+        with self.assertRaises(ConfigError) as exc:
+            load_project(self.root, path, self.io)
+        self.assertEqual(exc.exception.problems, [
+            "services/api: targets.api.backend: 'unknown' not in ['pyinstaller', 'nuitka', 'simulated']"])
+
+    @patch("poetry_pyinstaller_plugin.workspace.Environment")
+    def test_environment_pool(self, mock_environment):
+        self.create_project(Path("services", "worker"), "worker", lock="# other lock")
+        api, cli, worker = [load_project(self.root, path, self.io) for path in discover_projects(
+            self.root, ["services/api", "tools/cli", "services/worker"])]
+
+        shared, other = MagicMock(), MagicMock()
+        mock_environment.return_value.create.side_effect = [shared, other]
+        lock_hashes = iter(["lock-a", "lock-a", "lock-b"])
+        type(mock_environment.return_value).lock_hash = property(lambda _: next(lock_hashes))
+
+        pool = EnvironmentPool(self.io)
+        self.assertIs(pool.get(api, ("--all-extras", "--all-groups")), shared)
+        self.assertIs(pool.get(api, ["--all-extras", "--all-groups"]), shared)
+        self.assertIs(pool.get(cli, ("--all-extras", "--all-groups")), shared)
+        self.assertIs(pool.get(worker, ("--all-extras", "--all-groups")), other)
+
+        self.assertEqual((pool.created, pool.reused), (2, 1))
+        shared.run.assert_called_once_with("poetry", "install", "--only-root", cwd=cli.path)
+        self.assertEqual(cli.environments, {("--all-extras", "--all-groups"): shared})